@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import json
 import logging
+from collections import OrderedDict
 from typing import Any, Optional, List
 
 from a2a.server.agent_execution import RequestContext
@@ -26,8 +29,10 @@ MIME_TYPE_KEY = "mimeType"
 A2UI_MIME_TYPE = "application/json+a2ui"
 
 A2UI_CLIENT_CAPABILITIES_KEY = "a2uiClientCapabilities"
+A2UI_CLIENT_CAPABILITIES_HASH_KEY = "a2uiClientCapabilitiesHash"
 SUPPORTED_CATALOG_IDS_KEY = "supportedCatalogIds"
 INLINE_CATALOGS_KEY = "inlineCatalogs"
+INLINE_CATALOGS_HASH_KEY = "inlineCatalogsHash"
 
 STANDARD_CATALOG_ID = "https://github.com/google/A2UI/blob/main/specification/v0_8/json/standard_catalog_definition.json"
 
@@ -83,17 +88,21 @@ def get_a2ui_datapart(part: Part) -> Optional[DataPart]:
 
 AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY = "supportedCatalogIds"
 AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY = "acceptsInlineCatalogs"
+AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY = "acceptsInlineCatalogsHash"
 
 
 def get_a2ui_agent_extension(
     accepts_inline_catalogs: bool = False,
     supported_catalog_ids: List[str] = [],
+    accepts_inline_catalogs_hash: bool = False,
 ) -> AgentExtension:
   """Creates the A2UI AgentExtension configuration.
 
   Args:
       accepts_inline_catalogs: Whether the agent accepts inline custom catalogs.
       supported_catalog_ids: All pre-defined catalogs the agent is known to support.
+      accepts_inline_catalogs_hash: Whether the agent remembers inline catalogs
+        so that later requests can reference them by hash.
 
   Returns:
       The configured A2UI AgentExtension.
@@ -107,6 +116,9 @@ def get_a2ui_agent_extension(
   if supported_catalog_ids:
     params[AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY] = supported_catalog_ids
 
+  if accepts_inline_catalogs_hash:
+    params[AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY] = True
+
   return AgentExtension(
       uri=A2UI_EXTENSION_URI,
       description="Provides agent driven UI using the A2UI JSON format.",
@@ -131,3 +143,112 @@ def try_activate_a2ui_extension(context: RequestContext) -> bool:
     context.add_activated_extension(A2UI_EXTENSION_URI)
     return True
   return False
+
+
+def get_inline_catalogs_hash(inline_catalogs: Any) -> str:
+  """Computes the hash clients use to reference previously sent inline catalogs.
+
+  The hash is the lowercase hex SHA-256 of the UTF-8 encoded canonical JSON of
+  the `inlineCatalogs` value: object keys sorted and no insignificant
+  whitespace.
+
+  Args:
+      inline_catalogs: The `inlineCatalogs` value, either parsed or as a JSON
+        string.
+
+  Returns:
+      The hash of the inline catalogs.
+  """
+  if isinstance(inline_catalogs, str):
+    inline_catalogs = json.loads(inline_catalogs)
+  return _get_canonical_json_hash(inline_catalogs)
+
+
+def get_client_capabilities_hash(client_capabilities: Any) -> str:
+  """Computes a stable hash of A2UI client capabilities.
+
+  Callers that forward capabilities, such as an orchestrator, send the hash in
+  `a2uiClientCapabilitiesHash` next to the raw capabilities, so receivers can
+  use it as a cache key without hashing the capabilities themselves. Like
+  `get_inline_catalogs_hash`, it is the SHA-256 of the canonical JSON.
+
+  Args:
+      client_capabilities: The `a2uiClientCapabilities` value.
+
+  Returns:
+      The hash of the client capabilities.
+  """
+  return _get_canonical_json_hash(client_capabilities)
+
+
+def _get_canonical_json_hash(value: Any) -> str:
+  canonical = json.dumps(
+      value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+  )
+  return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class UnknownInlineCatalogsHashError(ValueError):
+  """Raised when a client references inline catalogs the agent does not know."""
+
+  def __init__(self, inline_catalogs_hash: str):
+    super().__init__(
+        f"Unknown {INLINE_CATALOGS_HASH_KEY} {inline_catalogs_hash}. Resend the"
+        f" full catalogs in {INLINE_CATALOGS_KEY} of {A2UI_CLIENT_CAPABILITIES_KEY}."
+    )
+    self.inline_catalogs_hash = inline_catalogs_hash
+
+
+class InlineCatalogsStore:
+  """Remembers inline catalogs sent by clients, keyed by their hash.
+
+  Clients send their inline catalogs once and reference them with
+  `inlineCatalogsHash` afterwards. The store is an LRU bounded by the number of
+  distinct catalogs; clients whose hash was evicted are asked to resend.
+  """
+
+  def __init__(self, max_entries: int = 128):
+    """Initializes the InlineCatalogsStore.
+
+    Args:
+        max_entries: The maximum number of distinct inline catalogs to keep.
+    """
+    self._max_entries = max_entries
+    self._catalogs: OrderedDict[str, Any] = OrderedDict()
+
+  def put(self, inline_catalogs: Any) -> str:
+    """Stores inline catalogs and returns their hash.
+
+    Args:
+        inline_catalogs: The `inlineCatalogs` value, either parsed or as a JSON
+          string.
+
+    Returns:
+        The hash the client can use to reference the catalogs.
+    """
+    inline_catalogs_hash = get_inline_catalogs_hash(inline_catalogs)
+    self._catalogs[inline_catalogs_hash] = inline_catalogs
+    self._catalogs.move_to_end(inline_catalogs_hash)
+    while len(self._catalogs) > self._max_entries:
+      self._catalogs.popitem(last=False)
+    return inline_catalogs_hash
+
+  def get(self, inline_catalogs_hash: str) -> Any:
+    """Returns the inline catalogs stored under the hash.
+
+    Args:
+        inline_catalogs_hash: The hash sent by the client.
+
+    Returns:
+        The inline catalogs, as they were stored.
+
+    Raises:
+        UnknownInlineCatalogsHashError: If no catalogs are stored under the hash.
+    """
+    if inline_catalogs_hash not in self._catalogs:
+      raise UnknownInlineCatalogsHashError(inline_catalogs_hash)
+    self._catalogs.move_to_end(inline_catalogs_hash)
+    return self._catalogs[inline_catalogs_hash]
+
+  def __contains__(self, inline_catalogs_hash: str) -> bool:
+    return inline_catalogs_hash in self._catalogs
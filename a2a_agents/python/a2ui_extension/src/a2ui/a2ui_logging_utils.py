@@ -0,0 +1,150 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Utilities for logging large payloads (events, parts, requests) cheaply.
+
+Payloads are wrapped in `LazyPayload` and passed as logging arguments, so they
+are only serialized if the record is actually emitted:
+
+  logger.debug("Event from runner: %s", LazyPayload(event))
+
+Serialized payloads are truncated to `DEFAULT_MAX_PAYLOAD_LENGTH` characters
+unless the `A2UI_LOG_FULL_PAYLOADS` environment variable is set to `true`.
+Per-request sampling (`is_request_sampled`) is controlled by the
+`A2UI_LOG_SAMPLE_RATE` environment variable and defaults to logging every
+request.
+"""
+
+import json
+import os
+import zlib
+from typing import Any, Callable, Optional
+
+LOG_FULL_PAYLOADS_ENV_VAR = "A2UI_LOG_FULL_PAYLOADS"
+LOG_SAMPLE_RATE_ENV_VAR = "A2UI_LOG_SAMPLE_RATE"
+
+DEFAULT_MAX_PAYLOAD_LENGTH = 200
+
+
+def is_full_payload_logging_enabled() -> bool:
+  """Returns True if payloads should be logged without truncation."""
+  return os.getenv(LOG_FULL_PAYLOADS_ENV_VAR, "").lower() in ("1", "true")
+
+
+def get_log_sample_rate() -> float:
+  """Returns the configured fraction of requests to log, between 0 and 1."""
+  try:
+    sample_rate = float(os.getenv(LOG_SAMPLE_RATE_ENV_VAR, "1"))
+  except ValueError:
+    return 1.0
+  return min(max(sample_rate, 0.0), 1.0)
+
+
+def is_request_sampled(
+    request_id: Optional[str], sample_rate: Optional[float] = None
+) -> bool:
+  """Decides whether the detailed logs of a request should be emitted.
+
+  The decision is a deterministic function of the request id, so every log
+  line of a sampled request is kept and every line of an unsampled one is
+  dropped. Full payload logging always samples every request.
+
+  Args:
+      request_id: The id of the request, task or session being logged.
+      sample_rate: The fraction of requests to sample. Defaults to the value
+        of the `A2UI_LOG_SAMPLE_RATE` environment variable.
+
+  Returns:
+      True if the request should be logged, False otherwise.
+  """
+  if is_full_payload_logging_enabled():
+    return True
+  if sample_rate is None:
+    sample_rate = get_log_sample_rate()
+  if sample_rate >= 1.0:
+    return True
+  if sample_rate <= 0.0 or not request_id:
+    return False
+  bucket = zlib.crc32(request_id.encode("utf-8")) % 10_000
+  return bucket < sample_rate * 10_000
+
+
+def _json_serializer(payload: Any) -> str:
+  return json.dumps(payload, default=str)
+
+
+class LazyPayload:
+  """Defers serialization and truncation of a payload until it is logged."""
+
+  __slots__ = ("_payload", "_serializer", "_max_length")
+
+  def __init__(
+      self,
+      payload: Any,
+      serializer: Optional[Callable[[Any], str]] = None,
+      max_length: int = DEFAULT_MAX_PAYLOAD_LENGTH,
+  ):
+    """Initializes the LazyPayload.
+
+    Args:
+        payload: The object to log.
+        serializer: Converts the payload to a string. Defaults to `str`.
+        max_length: The maximum number of characters to log, unless full
+          payload logging is enabled.
+    """
+    self._payload = payload
+    self._serializer = serializer or str
+    self._max_length = max_length
+
+  def __str__(self) -> str:
+    text = self._serializer(self._payload)
+    if len(text) <= self._max_length or is_full_payload_logging_enabled():
+      return text
+    return f"{text[:self._max_length]}... ({len(text)} chars)"
+
+  __repr__ = __str__
+
+
+def lazy_json(
+    payload: Any, max_length: int = DEFAULT_MAX_PAYLOAD_LENGTH
+) -> LazyPayload:
+  """Wraps a JSON-serializable payload so it is only dumped when logged.
+
+  Args:
+      payload: The JSON-serializable object to log.
+      max_length: The maximum number of characters to log.
+
+  Returns:
+      A LazyPayload that serializes the payload with `json.dumps`.
+  """
+  return LazyPayload(payload, serializer=_json_serializer, max_length=max_length)
+
+
+def lazy_model_json(
+    model: Any, max_length: int = DEFAULT_MAX_PAYLOAD_LENGTH
+) -> LazyPayload:
+  """Wraps a pydantic model so it is only dumped when logged.
+
+  Args:
+      model: The pydantic model to log.
+      max_length: The maximum number of characters to log.
+
+  Returns:
+      A LazyPayload that serializes the model with `model_dump_json`.
+  """
+  return LazyPayload(
+      model,
+      serializer=lambda m: m.model_dump_json(exclude_none=True),
+      max_length=max_length,
+  )
@@ -0,0 +1,103 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Utilities for assembling system prompts that are friendly to prompt caching.
+
+LLM providers cache prompts by prefix, so everything that is identical across
+turns and deployments (instructions, the A2UI schema, examples) must come
+first, followed by deployment specific values (e.g. base URLs) and finally by
+per-turn context. `StablePrefixPrompt` enforces that order and exposes a hash
+of the stable prefix that can be logged to verify that it does not change.
+"""
+
+import hashlib
+import os
+from typing import Any, Optional, Sequence
+
+SECTION_SEPARATOR = "\n\n"
+
+LITELLM_CONTEXT_CACHING_ENV_VAR = "LITELLM_CONTEXT_CACHING"
+
+
+class StablePrefixPrompt:
+  """A system prompt made of a stable prefix and per-turn sections."""
+
+  def __init__(
+      self,
+      static_sections: Sequence[str],
+      deployment_sections: Sequence[str] = (),
+  ):
+    """Initializes the StablePrefixPrompt.
+
+    Args:
+        static_sections: Sections that are identical for every deployment and
+          turn, such as instructions, schemas and examples.
+        deployment_sections: Sections that only change between deployments,
+          such as base URLs.
+    """
+    self._prefix = SECTION_SEPARATOR.join(
+        section for section in (*static_sections, *deployment_sections) if section
+    )
+    self._prefix_hash = hashlib.sha256(self._prefix.encode("utf-8")).hexdigest()
+
+  @property
+  def prefix(self) -> str:
+    """The static and deployment sections, in that order."""
+    return self._prefix
+
+  @property
+  def prefix_hash(self) -> str:
+    """A SHA-256 hex digest of the prefix, stable across turns and restarts."""
+    return self._prefix_hash
+
+  def render(self, turn_sections: Sequence[str] = ()) -> str:
+    """Returns the full prompt with the per-turn sections after the prefix.
+
+    Args:
+        turn_sections: Sections that change from turn to turn.
+
+    Returns:
+        The assembled system prompt.
+    """
+    turn_sections = [section for section in turn_sections if section]
+    if not turn_sections:
+      return self._prefix
+    return SECTION_SEPARATOR.join((self._prefix, *turn_sections))
+
+
+def get_litellm_context_caching_args(
+    enabled: Optional[bool] = None,
+) -> dict[str, Any]:
+  """Returns LiteLlm arguments that register the system prompt as cached content.
+
+  LiteLLM translates `cache_control` markers into the provider's explicit
+  context caching API (e.g. Gemini cached contents or Anthropic cache
+  breakpoints), so the stable system prompt is only processed once.
+
+  Args:
+      enabled: Whether to enable context caching. Defaults to the value of the
+        `LITELLM_CONTEXT_CACHING` environment variable being `TRUE`.
+
+  Returns:
+      Keyword arguments to pass to the `LiteLlm` constructor.
+  """
+  if enabled is None:
+    enabled = os.getenv(LITELLM_CONTEXT_CACHING_ENV_VAR) == "TRUE"
+  if not enabled:
+    return {}
+  return {
+      "cache_control_injection_points": [
+          {"location": "message", "role": "system"}
+      ]
+  }
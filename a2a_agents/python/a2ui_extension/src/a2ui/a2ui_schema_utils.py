@@ -14,8 +14,12 @@
 
 """Utilities for A2UI Schema manipulation."""
 
+import hashlib
+import json
 from typing import Any
 
+import jsonschema
+
 
 def wrap_as_json_array(a2ui_schema: dict[str, Any]) -> dict[str, Any]:
   """Wraps the A2UI schema in an array object to support multiple parts.
@@ -32,3 +36,44 @@ def wrap_as_json_array(a2ui_schema: dict[str, Any]) -> dict[str, Any]:
   if not a2ui_schema:
     raise ValueError("A2UI schema is empty")
   return {"type": "array", "items": a2ui_schema}
+
+
+def create_a2ui_validator(
+    a2ui_schema: dict[str, Any],
+) -> jsonschema.protocols.Validator:
+  """Compiles a validator for lists of A2UI messages.
+
+  Compiling the schema once and reusing the validator avoids rebuilding it
+  for every validated payload, which `jsonschema.validate` does.
+
+  Args:
+      a2ui_schema: The A2UI schema of a single message.
+
+  Returns:
+      A validator for the wrapped A2UI schema.
+
+  Raises:
+      ValueError: If the A2UI schema is empty.
+      jsonschema.SchemaError: If the A2UI schema is invalid.
+  """
+  wrapped_schema = wrap_as_json_array(a2ui_schema)
+  validator_cls = jsonschema.validators.validator_for(wrapped_schema)
+  validator_cls.check_schema(wrapped_schema)
+  return validator_cls(wrapped_schema)
+
+
+def get_schema_fingerprint(a2ui_schema: dict[str, Any]) -> str:
+  """Returns a stable fingerprint of the A2UI schema.
+
+  The schema is serialized canonically (sorted keys, no whitespace) so that
+  equal schemas always produce the same fingerprint, which makes it usable as
+  a cache key for anything derived from the schema.
+
+  Args:
+      a2ui_schema: The A2UI schema to fingerprint.
+
+  Returns:
+      A SHA-256 hex digest of the canonical schema.
+  """
+  canonical = json.dumps(a2ui_schema, sort_keys=True, separators=(",", ":"))
+  return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -49,6 +49,17 @@ Usage Examples:
       return await fetch_schema(ctx)
 
     toolset = SendA2uiToClientToolset(a2ui_enabled=check_enabled, a2ui_schema=get_schema)
+
+    # Schemas that change per session can come with precompiled validators,
+    # so that tool calls do not compile the schema again.
+    def get_validator(ctx: ReadonlyContext) -> jsonschema.protocols.Validator:
+      return VALIDATORS[ctx.state["schema_id"]]
+
+    toolset = SendA2uiToClientToolset(
+        a2ui_enabled=check_enabled,
+        a2ui_schema=get_schema,
+        a2ui_validator=get_validator,
+    )
     ```
 
   2. Integration with Agent:
@@ -86,6 +97,8 @@ import jsonschema
 
 from a2a import types as a2a_types
 from a2ui.a2ui_extension import create_a2ui_part
+from a2ui.a2ui_logging_utils import LazyPayload
+from a2ui.a2ui_schema_utils import create_a2ui_validator
 from a2ui.a2ui_schema_utils import wrap_as_json_array
 from google.adk.a2a.converters import part_converter
 from google.adk.agents.readonly_context import ReadonlyContext
@@ -104,6 +117,13 @@ A2uiEnabledProvider: TypeAlias = Callable[
 A2uiSchemaProvider: TypeAlias = Callable[
     [ReadonlyContext], Union[dict[str, Any], Awaitable[dict[str, Any]]]
 ]
+A2uiValidatorProvider: TypeAlias = Callable[
+    [ReadonlyContext],
+    Union[
+        Optional[jsonschema.protocols.Validator],
+        Awaitable[Optional[jsonschema.protocols.Validator]],
+    ],
+]
 
 
 @experimental
@@ -114,10 +134,22 @@ class SendA2uiToClientToolset(base_toolset.BaseToolset):
       self,
       a2ui_enabled: Union[bool, A2uiEnabledProvider],
       a2ui_schema: Union[dict[str, Any], A2uiSchemaProvider],
+      a2ui_validator: Optional[A2uiValidatorProvider] = None,
   ):
+    """Initializes the SendA2uiToClientToolset.
+
+    Args:
+        a2ui_enabled: Whether A2UI is enabled, or a provider of it.
+        a2ui_schema: The A2UI schema, or a provider of it.
+        a2ui_validator: An optional provider of a precompiled validator for
+          the provided schema, see `create_a2ui_validator`. Without it, the
+          validator of a provided schema is compiled on every tool call.
+    """
     super().__init__()
     self._a2ui_enabled = a2ui_enabled
-    self._ui_tools = [self._SendA2uiJsonToClientTool(a2ui_schema)]
+    self._ui_tools = [
+        self._SendA2uiJsonToClientTool(a2ui_schema, a2ui_validator)
+    ]
 
   async def _resolve_a2ui_enabled(self, ctx: ReadonlyContext) -> bool:
     """The resolved self.a2ui_enabled field to construct instruction for this agent.
@@ -164,8 +196,15 @@ class SendA2uiToClientToolset(base_toolset.BaseToolset):
     A2UI_JSON_ARG_NAME = "a2ui_json"
     TOOL_ERROR_KEY = "error"
 
-    def __init__(self, a2ui_schema: Union[dict[str, Any], A2uiSchemaProvider]):
+    def __init__(
+        self,
+        a2ui_schema: Union[dict[str, Any], A2uiSchemaProvider],
+        a2ui_validator: Optional[A2uiValidatorProvider] = None,
+    ):
       self._a2ui_schema = a2ui_schema
+      self._a2ui_validator = a2ui_validator
+      # Validator of a fixed schema, compiled on first use.
+      self._schema_validator: Optional[jsonschema.protocols.Validator] = None
       super().__init__(
           name=self.TOOL_NAME,
           description=(
@@ -224,6 +263,31 @@ class SendA2uiToClientToolset(base_toolset.BaseToolset):
       a2ui_schema = await self._resolve_a2ui_schema(ctx)
       return wrap_as_json_array(a2ui_schema)
 
+    async def get_a2ui_validator(
+        self, ctx: ReadonlyContext
+    ) -> jsonschema.protocols.Validator:
+      """Retrieves the validator for lists of A2UI messages.
+
+      Args:
+          ctx: The ReadonlyContext for resolving the validator.
+
+      Returns:
+          The provided precompiled validator if there is one, otherwise a
+          validator compiled from the A2UI schema.
+      """
+      if self._a2ui_validator is not None:
+        validator = self._a2ui_validator(ctx)
+        if inspect.isawaitable(validator):
+          validator = await validator
+        if validator is not None:
+          return validator
+
+      if isinstance(self._a2ui_schema, dict):
+        if self._schema_validator is None:
+          self._schema_validator = create_a2ui_validator(self._a2ui_schema)
+        return self._schema_validator
+      return create_a2ui_validator(await self._resolve_a2ui_schema(ctx))
+
     async def process_llm_request(
         self, *, tool_context: ToolContext, llm_request: LlmRequest
     ) -> None:
@@ -261,8 +325,8 @@ class SendA2uiToClientToolset(base_toolset.BaseToolset):
           )
           a2ui_json_payload = [a2ui_json_payload]
 
-        a2ui_schema = await self.get_a2ui_schema(tool_context)
-        jsonschema.validate(instance=a2ui_json_payload, schema=a2ui_schema)
+        a2ui_validator = await self.get_a2ui_validator(tool_context)
+        a2ui_validator.validate(a2ui_json_payload)
 
         logger.info(
             f"Validated call to tool {self.TOOL_NAME} with {self.A2UI_JSON_ARG_NAME}"
@@ -327,5 +391,5 @@ def convert_send_a2ui_to_client_genai_part_to_a2a_part(
   # Use default part converter for other types (images, etc)
   converted_part = part_converter.convert_genai_part_to_a2a_part(part)
 
-  logger.info(f"Returning converted part: {converted_part}")
+  logger.debug("Returning converted part: %s", LazyPayload(converted_part))
   return [converted_part] if converted_part else []
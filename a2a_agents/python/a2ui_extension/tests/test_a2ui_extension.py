@@ -19,6 +19,8 @@ from a2ui import a2ui_extension
 from a2ui.a2ui_extension import AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY, AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY
 from unittest.mock import MagicMock
 
+import pytest
+
 
 def test_a2ui_part_serialization():
   a2ui_data = {
@@ -109,3 +111,61 @@ def test_try_activate_a2ui_extension_not_requested():
 
   assert not a2ui_extension.try_activate_a2ui_extension(context)
   context.add_activated_extension.assert_not_called()
+
+
+def test_get_a2ui_agent_extension_with_accepts_inline_catalogs_hash():
+  agent_extension = a2ui_extension.get_a2ui_agent_extension(
+      accepts_inline_catalogs=True, accepts_inline_catalogs_hash=True
+  )
+  assert (
+      agent_extension.params.get(
+          a2ui_extension.AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY
+      )
+      is True
+  )
+
+
+def test_get_inline_catalogs_hash():
+  catalogs = [{"components": {"Text": {}}, "catalogId": "custom"}]
+
+  assert a2ui_extension.get_inline_catalogs_hash(
+      catalogs
+  ) == a2ui_extension.get_inline_catalogs_hash(
+      '[{"catalogId": "custom", "components": {"Text": {}}}]'
+  )
+  assert a2ui_extension.get_inline_catalogs_hash(
+      catalogs
+  ) != a2ui_extension.get_inline_catalogs_hash([])
+
+
+def test_get_client_capabilities_hash():
+  capabilities = {
+      "supportedCatalogIds": [a2ui_extension.STANDARD_CATALOG_ID],
+      "inlineCatalogsHash": "abc",
+  }
+
+  assert a2ui_extension.get_client_capabilities_hash(
+      capabilities
+  ) == a2ui_extension.get_client_capabilities_hash(
+      dict(reversed(capabilities.items()))
+  )
+  assert a2ui_extension.get_client_capabilities_hash(
+      capabilities
+  ) != a2ui_extension.get_client_capabilities_hash(
+      {"supportedCatalogIds": [a2ui_extension.STANDARD_CATALOG_ID]}
+  )
+
+
+def test_inline_catalogs_store():
+  store = a2ui_extension.InlineCatalogsStore(max_entries=1)
+  first_hash = store.put([{"catalogId": "first"}])
+
+  assert store.get(first_hash) == [{"catalogId": "first"}]
+
+  second_hash = store.put([{"catalogId": "second"}])
+  assert second_hash in store
+  assert first_hash not in store
+  with pytest.raises(
+      a2ui_extension.UnknownInlineCatalogsHashError, match="Resend"
+  ):
+    store.get(first_hash)
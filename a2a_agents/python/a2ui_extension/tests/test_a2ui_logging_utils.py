@@ -0,0 +1,72 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from unittest.mock import MagicMock
+
+from a2ui import a2ui_logging_utils
+from a2ui.a2ui_logging_utils import LazyPayload, is_request_sampled, lazy_json
+
+
+def test_lazy_payload_not_serialized_when_filtered(caplog):
+  serializer = MagicMock(return_value="payload")
+  logger = logging.getLogger("test_lazy_payload")
+
+  with caplog.at_level(logging.INFO, logger="test_lazy_payload"):
+    logger.debug("payload: %s", LazyPayload({}, serializer=serializer))
+
+  serializer.assert_not_called()
+
+
+def test_lazy_payload_truncates(monkeypatch):
+  monkeypatch.delenv(a2ui_logging_utils.LOG_FULL_PAYLOADS_ENV_VAR, raising=False)
+
+  text = str(LazyPayload("x" * 50, max_length=10))
+
+  assert text == "xxxxxxxxxx... (50 chars)"
+  assert str(LazyPayload("short", max_length=10)) == "short"
+
+
+def test_lazy_payload_full_payload_switch(monkeypatch):
+  monkeypatch.setenv(a2ui_logging_utils.LOG_FULL_PAYLOADS_ENV_VAR, "true")
+
+  assert str(LazyPayload("x" * 50, max_length=10)) == "x" * 50
+
+
+def test_lazy_json():
+  assert str(lazy_json({"a": 1})) == '{"a": 1}'
+
+
+def test_is_request_sampled(monkeypatch):
+  monkeypatch.delenv(a2ui_logging_utils.LOG_FULL_PAYLOADS_ENV_VAR, raising=False)
+  monkeypatch.delenv(a2ui_logging_utils.LOG_SAMPLE_RATE_ENV_VAR, raising=False)
+
+  assert is_request_sampled("task-1")
+  assert not is_request_sampled("task-1", sample_rate=0.0)
+
+  # Sampling is deterministic per request id.
+  sampled = [is_request_sampled(f"task-{i}", sample_rate=0.5) for i in range(200)]
+  assert sampled == [
+      is_request_sampled(f"task-{i}", sample_rate=0.5) for i in range(200)
+  ]
+  assert 0 < sum(sampled) < 200
+
+
+def test_is_request_sampled_env(monkeypatch):
+  monkeypatch.delenv(a2ui_logging_utils.LOG_FULL_PAYLOADS_ENV_VAR, raising=False)
+  monkeypatch.setenv(a2ui_logging_utils.LOG_SAMPLE_RATE_ENV_VAR, "0")
+  assert not is_request_sampled("task-1")
+
+  monkeypatch.setenv(a2ui_logging_utils.LOG_FULL_PAYLOADS_ENV_VAR, "true")
+  assert is_request_sampled("task-1")
@@ -0,0 +1,60 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from a2ui import a2ui_prompt_utils
+from a2ui.a2ui_prompt_utils import StablePrefixPrompt, get_litellm_context_caching_args
+
+
+def test_stable_prefix_prompt_order():
+  prompt = StablePrefixPrompt(
+      static_sections=["instructions", "schema"],
+      deployment_sections=["base url"],
+  )
+
+  assert prompt.prefix == "instructions\n\nschema\n\nbase url"
+  assert prompt.render() == prompt.prefix
+  assert prompt.render(["turn"]) == "instructions\n\nschema\n\nbase url\n\nturn"
+
+
+def test_stable_prefix_prompt_hash():
+  prompt = StablePrefixPrompt(static_sections=["instructions"])
+
+  assert prompt.prefix_hash == StablePrefixPrompt(["instructions"]).prefix_hash
+  assert prompt.prefix_hash != StablePrefixPrompt(["other"]).prefix_hash
+
+  # Per-turn sections do not change the prefix hash.
+  prompt.render(["turn"])
+  assert prompt.prefix_hash == StablePrefixPrompt(["instructions"]).prefix_hash
+
+
+def test_stable_prefix_prompt_skips_empty_sections():
+  prompt = StablePrefixPrompt(static_sections=["instructions", ""])
+
+  assert prompt.prefix == "instructions"
+  assert prompt.render(["", "turn"]) == "instructions\n\nturn"
+
+
+def test_get_litellm_context_caching_args(monkeypatch):
+  assert get_litellm_context_caching_args(enabled=False) == {}
+  assert "cache_control_injection_points" in get_litellm_context_caching_args(
+      enabled=True
+  )
+
+  monkeypatch.setenv(a2ui_prompt_utils.LITELLM_CONTEXT_CACHING_ENV_VAR, "TRUE")
+  assert get_litellm_context_caching_args() == get_litellm_context_caching_args(
+      enabled=True
+  )
+
+  monkeypatch.delenv(a2ui_prompt_utils.LITELLM_CONTEXT_CACHING_ENV_VAR)
+  assert get_litellm_context_caching_args() == {}
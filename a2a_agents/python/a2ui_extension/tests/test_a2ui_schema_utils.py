@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import pytest
-from a2ui.a2ui_schema_utils import wrap_as_json_array
+from a2ui.a2ui_schema_utils import create_a2ui_validator, get_schema_fingerprint, wrap_as_json_array
 
 
 def test_wrap_as_json_array():
@@ -23,3 +23,23 @@ def test_wrap_as_json_array():
 
   with pytest.raises(ValueError):
     wrap_as_json_array({})
+
+
+def test_get_schema_fingerprint():
+  schema = {"type": "object", "properties": {"a": {"type": "string"}}}
+  reordered = {"properties": {"a": {"type": "string"}}, "type": "object"}
+
+  assert get_schema_fingerprint(schema) == get_schema_fingerprint(reordered)
+  assert get_schema_fingerprint(schema) != get_schema_fingerprint(
+      {"type": "array"}
+  )
+
+
+def test_create_a2ui_validator():
+  validator = create_a2ui_validator(
+      {"type": "object", "required": ["surfaceId"]}
+  )
+
+  assert validator.is_valid([{"surfaceId": "a"}])
+  assert not validator.is_valid([{}])
+  assert not validator.is_valid({"surfaceId": "a"})
@@ -19,6 +19,7 @@ import pytest
 
 from a2a import types as a2a_types
 from a2ui.a2ui_extension import create_a2ui_part
+from a2ui.a2ui_schema_utils import create_a2ui_validator
 
 from a2ui.send_a2ui_to_client_toolset import convert_send_a2ui_to_client_genai_part_to_a2a_part
 from a2ui.send_a2ui_to_client_toolset import SendA2uiToClientToolset
@@ -258,6 +259,63 @@ async def test_send_tool_run_async_schema_validation_fail():
   assert "'text' is a required property" in result["error"]
 
 
+@pytest.mark.asyncio
+async def test_send_tool_get_a2ui_validator_compiles_fixed_schema_once():
+  tool = SendA2uiToClientToolset._SendA2uiJsonToClientTool(TEST_A2UI_SCHEMA)
+  ctx = MagicMock(spec=ReadonlyContext)
+
+  validator = await tool.get_a2ui_validator(ctx)
+
+  assert await tool.get_a2ui_validator(ctx) is validator
+  assert validator.is_valid([{"type": "Text", "text": "Hello"}])
+
+
+@pytest.mark.asyncio
+async def test_send_tool_run_async_uses_provided_validator():
+  validator = create_a2ui_validator(TEST_A2UI_SCHEMA)
+  schema_mock = MagicMock(return_value=TEST_A2UI_SCHEMA)
+  validator_mock = MagicMock(return_value=validator)
+  tool = SendA2uiToClientToolset._SendA2uiJsonToClientTool(
+      schema_mock, validator_mock
+  )
+  tool_context_mock = MagicMock(spec=ToolContext)
+  tool_context_mock.actions = MagicMock(skip_summarization=False)
+
+  valid_a2ui = [{"type": "Text", "text": "Hello"}]
+  args = {
+      SendA2uiToClientToolset._SendA2uiJsonToClientTool.A2UI_JSON_ARG_NAME: (
+          json.dumps(valid_a2ui)
+      )
+  }
+  result = await tool.run_async(args=args, tool_context=tool_context_mock)
+
+  assert result == {
+      SendA2uiToClientToolset._SendA2uiJsonToClientTool.VALIDATED_A2UI_JSON_KEY: (
+          valid_a2ui
+      )
+  }
+  validator_mock.assert_called_once_with(tool_context_mock)
+  schema_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_send_tool_run_async_falls_back_to_schema_without_validator():
+  schema_mock = MagicMock(return_value=TEST_A2UI_SCHEMA)
+  tool = SendA2uiToClientToolset._SendA2uiJsonToClientTool(
+      schema_mock, MagicMock(return_value=None)
+  )
+  invalid_a2ui = [{"type": "Text"}]  # Missing 'text'
+  args = {
+      SendA2uiToClientToolset._SendA2uiJsonToClientTool.A2UI_JSON_ARG_NAME: (
+          json.dumps(invalid_a2ui)
+      )
+  }
+  result = await tool.run_async(args=args, tool_context=MagicMock())
+
+  assert "'text' is a required property" in result["error"]
+  schema_mock.assert_called_once()
+
+
 # endregion
 
 # region send_a2ui_to_client_part_converter Tests
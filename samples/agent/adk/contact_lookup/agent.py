@@ -19,6 +19,8 @@ from collections.abc import AsyncIterable
 from typing import Any
 
 import jsonschema
+from a2ui.a2ui_logging_utils import LazyPayload, is_request_sampled
+from a2ui.a2ui_prompt_utils import get_litellm_context_caching_args
 from a2ui_examples import CONTACT_UI_EXAMPLES
 
 # Corrected imports from our new/refactored files
@@ -89,7 +91,7 @@ class ContactAgent:
             instruction = get_text_prompt()
 
         return LlmAgent(
-            model=LiteLlm(model=LITELLM_MODEL),
+            model=LiteLlm(model=LITELLM_MODEL, **get_litellm_context_caching_args()),
             name="contact_agent",
             description="An agent that finds colleague contact info.",
             instruction=instruction,
@@ -134,6 +136,9 @@ class ContactAgent:
             }
             return
 
+        # Per-event payloads are only logged for sampled sessions.
+        log_details = is_request_sampled(session_id)
+
         while attempt <= max_retries:
             attempt += 1
             logger.info(
@@ -151,7 +156,8 @@ class ContactAgent:
                 session_id=session.id,
                 new_message=current_message,
             ):
-                logger.info(f"Event from runner: {event}")
+                if log_details:
+                    logger.debug("Event from runner: %s", LazyPayload(event))
                 if event.is_final_response():
                     if (
                         event.content
@@ -163,7 +169,6 @@ class ContactAgent:
                         )
                     break  # Got the final response, stop consuming events
                 else:
-                    logger.info(f"Intermediate event: {event}")
                     # Yield intermediate updates on every attempt
                     yield {
                         "is_task_complete": False,
@@ -255,7 +260,7 @@ class ContactAgent:
                 logger.info(
                     f"--- ContactAgent.stream: Response is valid. Sending final response (Attempt {attempt}). ---"
                 )
-                logger.info(f"Final response: {final_response_content}")
+                logger.debug("Final response: %s", LazyPayload(final_response_content))
                 yield {
                     "is_task_complete": True,
                     "content": final_response_content,
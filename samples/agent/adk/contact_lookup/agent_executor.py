@@ -34,6 +34,7 @@ from a2a.utils import (
 from a2a.utils.errors import ServerError
 from agent import ContactAgent
 from a2ui.a2ui_extension import create_a2ui_part, try_activate_a2ui_extension
+from a2ui.a2ui_logging_utils import LazyPayload, is_request_sampled
 
 logger = logging.getLogger(__name__)
 
@@ -83,14 +84,14 @@ class ContactAgentExecutor(AgentExecutor):
                         logger.info(f"  Part {i}: Found a2ui UI ClientEvent payload.")
                         ui_event_part = part.root.data["userAction"]
                     else:
-                        logger.info(f"  Part {i}: DataPart (data: {part.root.data})")
+                        logger.debug("  Part %d: DataPart (data: %s)", i, LazyPayload(part.root.data))
                 elif isinstance(part.root, TextPart):
-                    logger.info(f"  Part {i}: TextPart (text: {part.root.text})")
+                    logger.debug("  Part %d: TextPart (text: %s)", i, LazyPayload(part.root.text))
                 else:
                     logger.info(f"  Part {i}: Unknown part type ({type(part.root)})")
 
         if ui_event_part:
-            logger.info(f"Received a2ui ClientEvent: {ui_event_part}")
+            logger.debug("Received a2ui ClientEvent: %s", LazyPayload(ui_event_part))
             # Fix: Check both 'actionName' and 'name'
             action = ui_event_part.get("name")
             ctx = ui_event_part.get("context", {})
@@ -189,14 +190,15 @@ class ContactAgentExecutor(AgentExecutor):
                  final_parts = [Part(root=TextPart(text="OK."))]
 
 
-            logger.info("--- FINAL PARTS TO BE SENT ---")
-            for i, part in enumerate(final_parts):
-                logger.info(f"  - Part {i}: Type = {type(part.root)}")
-                if isinstance(part.root, TextPart):
-                    logger.info(f"    - Text: {part.root.text[:200]}...")
-                elif isinstance(part.root, DataPart):
-                    logger.info(f"    - Data: {str(part.root.data)[:200]}...")
-            logger.info("-----------------------------")
+            if logger.isEnabledFor(logging.DEBUG) and is_request_sampled(task.id):
+                logger.debug("--- FINAL PARTS TO BE SENT ---")
+                for i, part in enumerate(final_parts):
+                    logger.debug("  - Part %d: Type = %s", i, type(part.root))
+                    if isinstance(part.root, TextPart):
+                        logger.debug("    - Text: %s", LazyPayload(part.root.text))
+                    elif isinstance(part.root, DataPart):
+                        logger.debug("    - Data: %s", LazyPayload(part.root.data))
+                logger.debug("-----------------------------")
 
             await updater.update_status(
                 final_state,
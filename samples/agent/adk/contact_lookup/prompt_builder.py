@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from a2ui.a2ui_prompt_utils import StablePrefixPrompt
 from a2ui_examples import CONTACT_UI_EXAMPLES
 from a2ui_schema import A2UI_SCHEMA
 
@@ -38,24 +39,7 @@ AGENT_INSTRUCTION = """
 """
 
 
-def get_ui_prompt(base_url: str, examples: str) -> str:
-    """
-    Constructs the full prompt with UI instructions, rules, examples, and schema.
-
-    Args:
-        base_url: The base URL for resolving static assets like logos.
-        examples: A string containing the specific UI examples for the agent's task.
-
-    Returns:
-        A formatted string to be used as the system prompt for the LLM.
-    """
-
-    # --- THIS IS THE FIX ---
-    # We no longer call .format() on the examples, as it breaks the JSON.
-    formatted_examples = examples
-    # --- END FIX ---
-
-    return f"""
+UI_PROMPT_RULES = """
     You are a helpful contact lookup assistant. Your final output MUST be a a2ui UI JSON response.
 
     To generate the response, you MUST follow these rules:
@@ -80,15 +64,40 @@ def get_ui_prompt(base_url: str, examples: str) -> str:
         a.  You MUST use the `FOLLOW_SUCCESS_EXAMPLE` template.
         b.  This will render a new card with a "Successfully Followed" message.
         c.  Respond with a text confirmation like "You are now following this contact." along with the JSON.
+    -   The templates are provided after the A2UI JSON SCHEMA.
+    """
 
-    {formatted_examples}
-
+A2UI_SCHEMA_SECTION = f"""
     ---BEGIN A2UI JSON SCHEMA---
     {A2UI_SCHEMA}
     ---END A2UI JSON SCHEMA---
     """
 
 
+def get_ui_prompt(base_url: str, examples: str) -> str:
+    """
+    Constructs the full prompt with UI instructions, rules, schema, and examples.
+
+    Args:
+        base_url: The base URL for resolving static assets like logos.
+        examples: A string containing the specific UI examples for the agent's task.
+
+    Returns:
+        A formatted string to be used as the system prompt for the LLM.
+    """
+
+    # --- THIS IS THE FIX ---
+    # We no longer call .format() on the examples, as it breaks the JSON.
+    formatted_examples = examples
+    # --- END FIX ---
+
+    # The rules and schema come first so that every contact prompt shares the
+    # same cacheable prefix regardless of the examples passed in.
+    return StablePrefixPrompt(
+        static_sections=[UI_PROMPT_RULES, A2UI_SCHEMA_SECTION]
+    ).render([formatted_examples])
+
+
 def get_text_prompt() -> str:
     """
     Constructs the prompt for a text-only agent.
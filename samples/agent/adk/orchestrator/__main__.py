@@ -16,12 +16,23 @@ import logging
 import os
 import traceback
 import asyncio
+import contextlib
 import click
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore
 from agent import OrchestratorAgent
+from agent_card_loader import AgentCardLoader, DEFAULT_FETCH_TIMEOUT_SECONDS, DEFAULT_MAX_AGE_SECONDS
+from subagent_http_client import (
+    ConnectionMetrics,
+    create_subagent_httpx_client,
+    DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+)
+from replica_router import ReplicaRouter, DEFAULT_EJECTION_SECONDS, DEFAULT_FAILURE_THRESHOLD
 from agent_executor import OrchestratorAgentExecutor
+from subagent_route_manager import SubagentRouteManager
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 
@@ -39,7 +50,82 @@ class MissingAPIKeyError(Exception):
 @click.option("--host", default="localhost", type=str)
 @click.option("--port", default=10002, type=int)
 @click.option("--subagent_urls", multiple=True, type=str, required=True)
-def main(host, port, subagent_urls):
+@click.option(
+    "--card_cache_dir",
+    default=None,
+    type=str,
+    help="Directory to cache subagent cards in, so restarts do not wait on subagents.",
+)
+@click.option(
+    "--card_max_age",
+    default=DEFAULT_MAX_AGE_SECONDS,
+    type=float,
+    help="Seconds a cached subagent card is used before it is revalidated.",
+)
+@click.option(
+    "--card_fetch_timeout",
+    default=DEFAULT_FETCH_TIMEOUT_SECONDS,
+    type=float,
+    help="Timeout in seconds for fetching a single subagent card.",
+)
+@click.option(
+    "--subagent_max_connections",
+    default=DEFAULT_MAX_CONNECTIONS,
+    type=int,
+    help="Maximum number of open connections to subagents.",
+)
+@click.option(
+    "--subagent_max_keepalive_connections",
+    default=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    type=int,
+    help="Maximum number of idle connections to subagents kept open.",
+)
+@click.option(
+    "--subagent_keepalive_expiry",
+    default=DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+    type=float,
+    help="Seconds an idle connection to a subagent is kept open.",
+)
+@click.option(
+    "--subagent_http2",
+    is_flag=True,
+    default=False,
+    help="Use HTTP/2 with subagents that support it. Requires the h2 package.",
+)
+@click.option(
+    "--replica_failure_threshold",
+    default=DEFAULT_FAILURE_THRESHOLD,
+    type=int,
+    help="Consecutive failures after which a subagent replica is ejected.",
+)
+@click.option(
+    "--replica_ejection_seconds",
+    default=DEFAULT_EJECTION_SECONDS,
+    type=float,
+    help="Seconds an ejected subagent replica receives no requests.",
+)
+@click.option(
+    "--intent_router",
+    "intent_router_mode",
+    default="on",
+    type=click.Choice(["on", "shadow", "off"]),
+    help="Route confident free-text requests to subagents without an LLM call, only log its decisions, or disable it.",
+)
+def main(
+    host,
+    port,
+    subagent_urls,
+    card_cache_dir,
+    card_max_age,
+    card_fetch_timeout,
+    subagent_max_connections,
+    subagent_max_keepalive_connections,
+    subagent_keepalive_expiry,
+    subagent_http2,
+    replica_failure_threshold,
+    replica_ejection_seconds,
+    intent_router_mode,
+):
     try:
         # Check for API key only if Vertex AI is not configured
         if not os.getenv("GOOGLE_GENAI_USE_VERTEXAI") == "TRUE":
@@ -50,7 +136,32 @@ def main(host, port, subagent_urls):
 
         base_url = f"http://{host}:{port}"
         
-        orchestrator_agent, agent_card = asyncio.run(OrchestratorAgent.build_agent(base_url=base_url, subagent_urls=subagent_urls))
+        card_loader = AgentCardLoader(
+            cache_dir=card_cache_dir,
+            max_age_seconds=card_max_age,
+            fetch_timeout_seconds=card_fetch_timeout,
+        )
+        connection_metrics = ConnectionMetrics()
+        replica_router = ReplicaRouter(
+            failure_threshold=replica_failure_threshold,
+            ejection_seconds=replica_ejection_seconds,
+        )
+        subagent_httpx_client = create_subagent_httpx_client(
+            max_connections=subagent_max_connections,
+            max_keepalive_connections=subagent_max_keepalive_connections,
+            keepalive_expiry=subagent_keepalive_expiry,
+            http2=subagent_http2,
+            metrics=connection_metrics,
+            replica_router=replica_router,
+        )
+        orchestrator_agent, agent_card = asyncio.run(OrchestratorAgent.build_agent(
+            base_url=base_url,
+            subagent_urls=subagent_urls,
+            card_loader=card_loader,
+            httpx_client=subagent_httpx_client,
+            intent_router_mode=intent_router_mode,
+            replica_router=replica_router,
+        ))
         agent_executor = OrchestratorAgentExecutor(agent=orchestrator_agent)
 
         request_handler = DefaultRequestHandler(
@@ -62,7 +173,25 @@ def main(host, port, subagent_urls):
         )
         import uvicorn
 
-        app = server.build()
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            # Keep the cached subagent cards up to date for the next restart,
+            # and report subagents that were unavailable at startup once they
+            # are up, since they are only added on restart.
+            refresh_task = None
+            if card_cache_dir or card_loader.missing_urls:
+                refresh_task = asyncio.create_task(card_loader.refresh_periodically(subagent_urls))
+            yield
+            if refresh_task:
+                refresh_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await refresh_task
+            await subagent_httpx_client.aclose()
+            logger.info(f"Subagent connection metrics: {connection_metrics.snapshot()}")
+            logger.info(f"Subagent routing metrics: {SubagentRouteManager.get_metrics()}")
+            logger.info(f"Subagent replica metrics: {replica_router.get_metrics()}")
+
+        app = server.build(lifespan=lifespan)
 
         app.add_middleware(
             CORSMiddleware,
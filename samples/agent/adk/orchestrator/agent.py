@@ -15,12 +15,12 @@
 import json
 import logging
 import os
-from a2a.client import A2ACardResolver
 from a2a.extensions.common import HTTP_EXTENSION_HEADER
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.agents.llm_agent import LlmAgent
-from google.adk.agents.remote_a2a_agent import RemoteA2aAgent, DEFAULT_TIMEOUT
+from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 from google.adk.planners.built_in_planner import BuiltInPlanner
+from google.adk.tools.function_tool import FunctionTool
 from google.genai import types as genai_types
 import httpx
 import re
@@ -29,14 +29,21 @@ from google.adk.agents.callback_context import  CallbackContext
 from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
 from subagent_route_manager import SubagentRouteManager
-from typing import Any, override, List
+from agent_card_loader import AgentCardLoader
+from subagent_http_client import create_subagent_httpx_client
+from intent_router import IntentRouter
+from fan_out_agent import FanOutAgent
+from subagent_capability_filter import CLIENT_CAPABILITIES_HASH_STATE_KEY, SubagentCapabilityFilter
+from replica_router import ReplicaRouter, get_card_identity
+from typing import Any, override, List, Optional
 from a2a.types import TransportProtocol as A2ATransport
 
 from a2a.client.client import Consumer, Client
 from a2a.client.middleware import ClientCallContext, ClientCallInterceptor
 from a2a.client.client import ClientConfig as A2AClientConfig
 from a2a.client.client_factory import ClientFactory as A2AClientFactory
-from a2ui.a2ui_extension import is_a2ui_part, A2UI_CLIENT_CAPABILITIES_KEY, A2UI_EXTENSION_URI, AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY, AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY, get_a2ui_agent_extension
+from a2ui.a2ui_extension import is_a2ui_part, A2UI_CLIENT_CAPABILITIES_KEY, A2UI_CLIENT_CAPABILITIES_HASH_KEY, A2UI_EXTENSION_URI, AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY, AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY, AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY, get_a2ui_agent_extension
+from a2ui.a2ui_logging_utils import lazy_json
 from a2a.types import AgentCapabilities, AgentCard, AgentExtension
 
 logger = logging.getLogger(__name__)
@@ -51,21 +58,35 @@ class A2UIMetadataInterceptor(ClientCallInterceptor):
         agent_card: AgentCard | None,
         context: ClientCallContext | None,
     ) -> tuple[dict[str, Any], dict[str, Any]]:
-        """Enables the A2UI extension header and adds A2UI client capabilities to remote agent message metadata."""
-        logger.info("Intercepting client call to method: " + method_name + " and payload " + json.dumps(request_payload))
-                
+        """Enables the A2UI extension header and adds A2UI client capabilities to remote agent message metadata.
+
+        The capabilities are added by reference together with their hash, which
+        the executor computes once per request, so the cost of a call does not
+        grow with the size of the payload or of the capabilities.
+        """
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Intercepting client call to method: %s and payload %s", method_name, lazy_json(request_payload))
+
         if context and context.state and context.state.get("use_ui"):
-            # Add A2UI extension header
-            http_kwargs["headers"] = {HTTP_EXTENSION_HEADER: A2UI_EXTENSION_URI}
-            
-            # Add A2UI client capabilities (supported catalogs, etc) to message metadata
-            if (params := request_payload.get("params")) and (message := params.get("message")):            
-                client_capabilities = context.state.get("client_capabilities")                
-                if "metadata" not in message:
-                    message["metadata"] = {}
-                message["metadata"][A2UI_CLIENT_CAPABILITIES_KEY] = client_capabilities
-                logger.info(f"Added client capabilities to remote agent message metadata: {client_capabilities}")
-                        
+            # Add the A2UI extension header, keeping other headers and extensions
+            headers = http_kwargs["headers"] = dict(http_kwargs.get("headers") or {})
+            extensions = [uri.strip() for uri in headers.get(HTTP_EXTENSION_HEADER, "").split(",") if uri.strip()]
+            if A2UI_EXTENSION_URI not in extensions:
+                headers[HTTP_EXTENSION_HEADER] = ", ".join(extensions + [A2UI_EXTENSION_URI])
+
+            # Add A2UI client capabilities (supported catalogs, etc) to message metadata.
+            # Subagents that do not know the hash keep using the raw capabilities.
+            if (params := request_payload.get("params")) and (message := params.get("message")):
+                metadata = message.get("metadata")
+                if metadata is None:
+                    metadata = message["metadata"] = {}
+                metadata[A2UI_CLIENT_CAPABILITIES_KEY] = context.state.get("client_capabilities")
+                if client_capabilities_hash := context.state.get(CLIENT_CAPABILITIES_HASH_STATE_KEY):
+                    metadata[A2UI_CLIENT_CAPABILITIES_HASH_KEY] = client_capabilities_hash
+                if debug:
+                    logger.debug("Added client capabilities %s to remote agent message metadata", client_capabilities_hash)
+
         return request_payload, http_kwargs
 
 class A2AClientFactoryWithA2UIMetadata(A2AClientFactory):
@@ -93,11 +114,11 @@ class OrchestratorAgent:
         if (
             llm_request.contents
             and (last_content := llm_request.contents[-1]).parts
-            and (a2a_part := part_converters.convert_genai_part_to_a2a_part(last_content.parts[-1]))
-            and is_a2ui_part(a2a_part)
+            and (last_text := last_content.parts[-1].text)
+            and (a2a_part := part_converters.parse_a2ui_part(last_text))
             and (user_action := a2a_part.root.data.get("userAction"))
             and (surface_id := user_action.get("surfaceId"))
-            and (target_agent := await SubagentRouteManager.get_route_to_subagent_name(surface_id, callback_context.state))
+            and (target_agent := await SubagentRouteManager.get_route_to_subagent_name(surface_id, callback_context.session.id, callback_context.state))
         ):
             logger.info(f"Programmatically routing userAction for surfaceId '{surface_id}' to subagent '{target_agent}'")
             return LlmResponse(
@@ -116,86 +137,148 @@ class OrchestratorAgent:
         return None
 
     @classmethod
-    async def build_agent(cls, base_url: str, subagent_urls: List[str]) -> (LlmAgent, AgentCard):
-        """Builds the LLM agent for the orchestrator_agent agent."""
+    async def build_agent(
+        cls,
+        base_url: str,
+        subagent_urls: List[str],
+        card_loader: Optional[AgentCardLoader] = None,
+        httpx_client: Optional[httpx.AsyncClient] = None,
+        intent_router_mode: str = "on",
+        replica_router: Optional[ReplicaRouter] = None,
+    ) -> (LlmAgent, AgentCard):
+        """Builds the LLM agent for the orchestrator_agent agent.
+
+        All subagents share `httpx_client`, so connections to them are pooled
+        across requests. The caller owns the client and closes it on shutdown.
+
+        `intent_router_mode` controls the local intent router: "on" routes
+        confident free-text requests without an LLM call, "shadow" only logs
+        its decisions and agreement with the LLM, and "off" disables it.
+
+        Subagent URLs whose cards have the same name, version and skills are
+        replicas of one subagent. With a `replica_router` installed in
+        `httpx_client`, they become a single subagent whose calls are balanced
+        across the replicas; without one, only the first replica is used.
+        """
 
         subagents = []
+        subagent_cards = {}
         supported_catalog_ids = set()
         skills = []
         accepts_inline_catalogs = False
-        for subagent_url in subagent_urls:
-            async with httpx.AsyncClient() as httpx_client:
-                resolver = A2ACardResolver(
-                    httpx_client=httpx_client,
-                    base_url=subagent_url,
-                )
-                
-                subagent_card =  await resolver.get_agent_card()                
-                for extension in subagent_card.capabilities.extensions or []:
-                    if extension.uri == A2UI_EXTENSION_URI and extension.params:
-                        supported_catalog_ids.update(extension.params.get(AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY) or [])
-                        accepts_inline_catalogs |= bool(extension.params.get(AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY))
-                
-                skills.extend(subagent_card.skills)
-                
-                logger.info('Successfully fetched public agent card:' + subagent_card.model_dump_json(indent=2, exclude_none=True))
-                
-                # clean name for adk
-                clean_name = re.sub(r'[^0-9a-zA-Z_]+', '_', subagent_card.name)                
-                if clean_name == "":
-                    clean_name = "_"
-                if clean_name[0].isdigit():
-                    clean_name = f"_{clean_name}"
-                
-                # make remote agent
-                description = json.dumps({
-                    "id": clean_name,
-                    "name": subagent_card.name,
-                    "description": subagent_card.description,
-                    "skills": [
-                        {
-                            "name": skill.name, 
-                            "description": skill.description, 
-                            "examples": skill.examples, 
-                            "tags": skill.tags
-                        } for skill in subagent_card.skills
-                    ]
-                }, indent=2)
-                remote_a2a_agent = RemoteA2aAgent(
-                    clean_name, 
-                    subagent_card, 
-                    description=description, # This will be appended to system instructions
-                    a2a_part_converter=part_converters.convert_a2a_part_to_genai_part,
-                    genai_part_converter=part_converters.convert_genai_part_to_a2a_part,                      
-                    a2a_client_factory=A2AClientFactoryWithA2UIMetadata(
-                        config=A2AClientConfig(
-                            httpx_client=httpx.AsyncClient(
-                                timeout=httpx.Timeout(timeout=DEFAULT_TIMEOUT),
-                            ),
-                            streaming=False,
-                            polling=False,
-                            supported_transports=[A2ATransport.jsonrpc],
-                        )
+        # Clients may only send the hash of their inline catalogs if every
+        # subagent that accepts inline catalogs remembers them.
+        accepts_inline_catalogs_hash = True
+        httpx_client = httpx_client or create_subagent_httpx_client()
+        replica_cards: dict[tuple, List[AgentCard]] = {}
+        for card in await (card_loader or AgentCardLoader()).load_agent_cards(subagent_urls):
+            replica_cards.setdefault(get_card_identity(card), []).append(card)
+
+        for subagent_card, *other_replica_cards in replica_cards.values():
+            for extension in subagent_card.capabilities.extensions or []:
+                if extension.uri == A2UI_EXTENSION_URI and extension.params:
+                    supported_catalog_ids.update(extension.params.get(AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY) or [])
+                    if extension.params.get(AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY):
+                        accepts_inline_catalogs = True
+                        accepts_inline_catalogs_hash &= bool(extension.params.get(AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY))
+            
+            skills.extend(subagent_card.skills)
+            
+            logger.info('Loaded public agent card:' + subagent_card.model_dump_json(indent=2, exclude_none=True))
+            
+            # clean name for adk
+            clean_name = re.sub(r'[^0-9a-zA-Z_]+', '_', subagent_card.name)                
+            if clean_name == "":
+                clean_name = "_"
+            if clean_name[0].isdigit():
+                clean_name = f"_{clean_name}"
+
+            if other_replica_cards:
+                replica_urls = [card.url for card in [subagent_card, *other_replica_cards]]
+                if replica_router:
+                    replica_router.add_group(clean_name, replica_urls)
+                else:
+                    logger.warning(f"Subagent {clean_name} has replicas {replica_urls} but no replica router, using only the first")
+            
+            # make remote agent
+            description = json.dumps({
+                "id": clean_name,
+                "name": subagent_card.name,
+                "description": subagent_card.description,
+                "skills": [
+                    {
+                        "name": skill.name, 
+                        "description": skill.description, 
+                        "examples": skill.examples, 
+                        "tags": skill.tags
+                    } for skill in subagent_card.skills
+                ]
+            }, indent=2)
+            remote_a2a_agent = RemoteA2aAgent(
+                clean_name, 
+                subagent_card, 
+                description=description, # This will be appended to system instructions
+                a2a_part_converter=part_converters.convert_a2a_part_to_genai_part,
+                genai_part_converter=part_converters.convert_genai_part_to_a2a_part,                      
+                a2a_client_factory=A2AClientFactoryWithA2UIMetadata(
+                    config=A2AClientConfig(
+                        httpx_client=httpx_client,
+                        # Stream subagent responses so that their A2UI messages
+                        # are relayed to the client as soon as they are sent.
+                        streaming=True,
+                        polling=False,
+                        supported_transports=[A2ATransport.jsonrpc],
                     )
                 )
-                subagents.append(remote_a2a_agent)
-                
-                logger.info(f'Created remote agent with description: {description}')
+            )
+            subagents.append(remote_a2a_agent)
+            subagent_cards[clean_name] = subagent_card
+            
+            logger.info(f'Created remote agent with description: {description}')
+
+        # Requests that need several subagents are answered by all of them in
+        # parallel through the fan-out agent.
+        tools = []
+        instruction = "You are an orchestrator agent. Your sole responsibility is to analyze the incoming user request, determine the user's intent, and route the task to exactly one of your expert subagents"
+        fan_out = len(subagents) > 1
+        if fan_out:
+            fan_out_agent = FanOutAgent(subagents)
+            tools.append(FunctionTool(fan_out_agent.transfer_to_agents))
+            instruction += ". If the request needs more than one subagent, call transfer_to_agents with all of them instead"
+            subagents.append(fan_out_agent)
+
+        # Hide subagents whose UI the client cannot render before any routing decision.
+        capability_filter = SubagentCapabilityFilter(subagents, subagent_cards)
+        before_model_callbacks = [
+            cls.programmtically_route_user_action_to_subagent,
+            capability_filter.before_model_callback,
+        ]
+        after_model_callbacks = []
+        if intent_router_mode != "off":
+            intent_router = IntentRouter(
+                subagent_cards,
+                shadow=intent_router_mode == "shadow",
+                # Requests for several subagents are left to the LLM, which can fan out.
+                fan_out=fan_out,
+            )
+            before_model_callbacks.append(intent_router.before_model_callback)
+            after_model_callbacks.append(intent_router.after_model_callback)
 
         LITELLM_MODEL = os.getenv("LITELLM_MODEL", "gemini/gemini-2.5-flash")
         agent = LlmAgent(
             model=LiteLlm(model=LITELLM_MODEL),
             name="orchestrator_agent",
             description="An agent that orchestrates requests to multiple other agents",
-            instruction="You are an orchestrator agent. Your sole responsibility is to analyze the incoming user request, determine the user's intent, and route the task to exactly one of your expert subagents",
-            tools=[],
+            instruction=instruction,
+            tools=tools,
             planner=BuiltInPlanner(
                 thinking_config=genai_types.ThinkingConfig(
                     include_thoughts=True,
                 )
             ),
             sub_agents=subagents,
-            before_model_callback=cls.programmtically_route_user_action_to_subagent,
+            before_model_callback=before_model_callbacks,
+            after_model_callback=after_model_callbacks,
         )
 
         agent_card = AgentCard(
@@ -209,7 +292,8 @@ class OrchestratorAgent:
                 streaming=True,
                 extensions=[get_a2ui_agent_extension(
                     accepts_inline_catalogs=accepts_inline_catalogs,
-                    supported_catalog_ids=list(supported_catalog_ids))],
+                    supported_catalog_ids=list(supported_catalog_ids),
+                    accepts_inline_catalogs_hash=accepts_inline_catalogs and accepts_inline_catalogs_hash)],
             ),
             skills=skills,
         )
@@ -0,0 +1,242 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+from a2a.types import AgentCard
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FETCH_TIMEOUT_SECONDS = 10.0
+DEFAULT_MAX_AGE_SECONDS = 3600.0
+
+
+@dataclass
+class CachedAgentCard:
+    """An agent card with the metadata needed to revalidate it."""
+
+    url: str
+    card: AgentCard
+    fetched_at: float
+    etag: Optional[str] = None
+
+    def is_fresh(self, max_age_seconds: float) -> bool:
+        return time.time() - self.fetched_at < max_age_seconds
+
+
+class AgentCardLoader:
+    """Fetches subagent cards concurrently, with an optional on-disk cache.
+
+    Cards fetched less than `max_age_seconds` ago are served from the cache
+    without any network call, so a restart does not wait on subagents. Older
+    cards are revalidated with their ETag, and are still used if the subagent
+    does not answer within the timeout.
+
+    Subagents without any card at startup are left out until the orchestrator
+    restarts. `refresh` logs when one of them becomes available.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        fetch_timeout_seconds: float = DEFAULT_FETCH_TIMEOUT_SECONDS,
+    ):
+        """Initializes the AgentCardLoader.
+
+        Args:
+            cache_dir: The directory to cache cards in. Cards are not cached if None.
+            max_age_seconds: How long a cached card is used without revalidating it.
+            fetch_timeout_seconds: The timeout for fetching a single card.
+        """
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._max_age_seconds = max_age_seconds
+        self._fetch_timeout_seconds = fetch_timeout_seconds
+        self._missing_urls: set[str] = set()
+
+    @property
+    def missing_urls(self) -> frozenset[str]:
+        """The subagent URLs whose card could not be loaded at startup."""
+        return frozenset(self._missing_urls)
+
+    async def load_agent_cards(self, subagent_urls: List[str]) -> List[AgentCard]:
+        """Loads the cards of all subagents concurrently.
+
+        Subagents whose card can neither be fetched nor read from the cache are
+        skipped, so one unavailable subagent does not prevent startup.
+
+        Args:
+            subagent_urls: The base URLs of the subagents.
+
+        Returns:
+            The loaded cards, in the order of `subagent_urls`.
+
+        Raises:
+            ValueError: If no card could be loaded.
+        """
+        cached_cards = {url: self._read_cache(url) for url in subagent_urls}
+        stale_urls = [
+            url for url, cached in cached_cards.items()
+            if cached is None or not cached.is_fresh(self._max_age_seconds)
+        ]
+        logger.info(f"Loading {len(subagent_urls)} agent cards, {len(subagent_urls) - len(stale_urls)} from cache")
+
+        if stale_urls:
+            async with httpx.AsyncClient(timeout=self._fetch_timeout_seconds) as httpx_client:
+                results = await asyncio.gather(
+                    *(self._fetch(httpx_client, url, cached_cards[url]) for url in stale_urls),
+                    return_exceptions=True,
+                )
+            for url, result in zip(stale_urls, results):
+                if isinstance(result, BaseException):
+                    if cached_cards[url] is not None:
+                        logger.warning(f"Failed to fetch agent card from {url}, using cached card: {result!r}")
+                    else:
+                        logger.error(
+                            f"Failed to fetch agent card from {url}, skipping subagent until the orchestrator is restarted: {result!r}"
+                        )
+                        self._missing_urls.add(url)
+                    continue
+                cached_cards[url] = result
+
+        cards = [cached.card for cached in cached_cards.values() if cached is not None]
+        if not cards:
+            raise ValueError("Failed to load the agent card of any subagent")
+        return cards
+
+    async def refresh(self, subagent_urls: List[str]) -> None:
+        """Revalidates stale cached cards and fetches the missing ones.
+
+        Changed cards and subagents that were missing at startup are used from
+        the next restart on. Without a cache directory, only the missing cards
+        are fetched.
+
+        Args:
+            subagent_urls: The base URLs of the subagents.
+        """
+        if self._cache_dir is None:
+            subagent_urls = [url for url in subagent_urls if url in self._missing_urls]
+        cached_cards = {url: self._read_cache(url) for url in subagent_urls}
+        stale_urls = [
+            url for url, cached in cached_cards.items()
+            if cached is None or not cached.is_fresh(self._max_age_seconds)
+        ]
+        if not stale_urls:
+            return
+        async with httpx.AsyncClient(timeout=self._fetch_timeout_seconds) as httpx_client:
+            results = await asyncio.gather(
+                *(self._fetch(httpx_client, url, cached_cards[url]) for url in stale_urls),
+                return_exceptions=True,
+            )
+        for url, result in zip(stale_urls, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Failed to refresh agent card from {url}: {result!r}")
+            elif url in self._missing_urls:
+                self._missing_urls.discard(url)
+                logger.warning(
+                    f"Subagent {result.card.name} at {url} is available now, but was not at startup. "
+                    "Restart the orchestrator to route requests to it."
+                )
+
+    async def refresh_periodically(self, subagent_urls: List[str]) -> None:
+        """Refreshes the cached cards every `max_age_seconds` until cancelled.
+
+        Args:
+            subagent_urls: The base URLs of the subagents.
+        """
+        while True:
+            await self.refresh(subagent_urls)
+            await asyncio.sleep(self._max_age_seconds)
+
+    async def _fetch(
+        self,
+        httpx_client: httpx.AsyncClient,
+        url: str,
+        cached: Optional[CachedAgentCard],
+    ) -> CachedAgentCard:
+        """Fetches a card, revalidating the cached card with its ETag.
+
+        Args:
+            httpx_client: The client to fetch with.
+            url: The base URL of the subagent.
+            cached: The cached card, if any.
+
+        Returns:
+            The fetched or revalidated card.
+        """
+        headers = {"If-None-Match": cached.etag} if cached and cached.etag else {}
+        response = await asyncio.wait_for(
+            httpx_client.get(f"{url.rstrip('/')}{AGENT_CARD_WELL_KNOWN_PATH}", headers=headers),
+            timeout=self._fetch_timeout_seconds,
+        )
+
+        if response.status_code == httpx.codes.NOT_MODIFIED and cached is not None:
+            logger.info(f"Agent card from {url} is unchanged")
+            entry = CachedAgentCard(url=url, card=cached.card, fetched_at=time.time(), etag=cached.etag)
+        else:
+            response.raise_for_status()
+            card = AgentCard.model_validate(response.json())
+            if cached is not None and card != cached.card:
+                logger.info(f"Agent card from {url} changed")
+            logger.info(f"Successfully fetched agent card from {url}")
+            entry = CachedAgentCard(url=url, card=card, fetched_at=time.time(), etag=response.headers.get("etag"))
+
+        self._write_cache(entry)
+        return entry
+
+    def _get_cache_path(self, url: str) -> Path:
+        return self._cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()[:16]}.json"
+
+    def _read_cache(self, url: str) -> Optional[CachedAgentCard]:
+        """Reads a cached card, ignoring unreadable cache files."""
+        if self._cache_dir is None:
+            return None
+        try:
+            data = json.loads(self._get_cache_path(url).read_text())
+            return CachedAgentCard(
+                url=url,
+                card=AgentCard.model_validate(data["card"]),
+                fetched_at=data["fetched_at"],
+                etag=data.get("etag"),
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached agent card for {url}: {e}")
+            return None
+
+    def _write_cache(self, entry: CachedAgentCard) -> None:
+        """Writes a card to the cache atomically."""
+        if self._cache_dir is None:
+            return
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._get_cache_path(entry.url)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "url": entry.url,
+            "fetched_at": entry.fetched_at,
+            "etag": entry.etag,
+            "card": entry.card.model_dump(mode="json", exclude_none=True),
+        }))
+        os.replace(tmp_path, path)
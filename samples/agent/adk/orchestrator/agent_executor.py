@@ -12,15 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
 import logging
 import json
-from typing import List, Optional, override
+from typing import Any, Awaitable, Callable, List, Optional, override
 from google.adk.agents.invocation_context import new_invocation_context_id
 from google.adk.events.event_actions import EventActions
 
 from a2a.server.agent_execution import RequestContext
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 from google.adk.artifacts import InMemoryArtifactService
 from a2a.server.events.event_queue import EventQueue
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
@@ -31,13 +31,15 @@ from google.adk.a2a.executor.a2a_agent_executor import (
     A2aAgentExecutorConfig,
     A2aAgentExecutor,
 )
-from a2ui.a2ui_extension import is_a2ui_part, try_activate_a2ui_extension, A2UI_EXTENSION_URI, STANDARD_CATALOG_ID, SUPPORTED_CATALOG_IDS_KEY, A2UI_CLIENT_CAPABILITIES_KEY
+from a2ui.a2ui_extension import is_a2ui_part, try_activate_a2ui_extension, A2UI_EXTENSION_URI, STANDARD_CATALOG_ID, SUPPORTED_CATALOG_IDS_KEY, A2UI_CLIENT_CAPABILITIES_KEY, get_client_capabilities_hash
 from google.adk.a2a.converters import event_converter
 from a2a.server.events import Event as A2AEvent
+from a2a.types import TaskArtifactUpdateEvent, TaskStatusUpdateEvent
 from google.adk.events.event import Event
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.a2a.converters import part_converter
-from subagent_route_manager import SubagentRouteManager
+from subagent_route_manager import SubagentRouteWriter
+from subagent_capability_filter import CLIENT_CAPABILITIES_HASH_STATE_KEY
 
 from agent import OrchestratorAgent
 import part_converters
@@ -55,6 +57,26 @@ class OrchestratorAgentExecutor(A2aAgentExecutor):
             event_converter=self.convert_event_to_a2a_events_and_save_surface_id_to_subagent_name,
         )
 
+        # Card summaries of the subagents by name, parsed once and attached by
+        # reference to every event a subagent authors.
+        self._subagent_cards: dict[str, dict] = {}
+        for subagent in agent.sub_agents:
+            if not isinstance(subagent, RemoteA2aAgent):
+                continue
+            try:
+                self._subagent_cards[subagent.name] = json.loads(subagent.description)
+            except Exception:
+                logger.warning(f"Failed to parse agent description for {subagent.name}")
+
+        # Surface routes produced by each running task, persisted together
+        # before the task's final event is published.
+        self._route_writers: dict[str, SubagentRouteWriter] = {}
+
+        # A2UI messages streamed in working updates by the running call of
+        # each subagent, by task and subagent name. The final result of a
+        # streaming call repeats them, so they are dropped from it.
+        self._streamed_a2ui_messages: dict[tuple[str, str], List[dict[str, Any]]] = {}
+
         runner = Runner(
             app_name=agent.name,
             agent=agent,
@@ -65,9 +87,38 @@ class OrchestratorAgentExecutor(A2aAgentExecutor):
 
         super().__init__(runner=runner, config=config)
 
-    @classmethod
+    @override
+    async def execute(self, context: RequestContext, event_queue: EventQueue):
+        try:
+            await super().execute(context, event_queue)
+        finally:
+            # Routes of surfaces rendered before a failure are still valid.
+            await self._flush_routes(context.task_id)
+            self._route_writers.pop(context.task_id, None)
+            for key in [key for key in self._streamed_a2ui_messages if key[0] == context.task_id]:
+                del self._streamed_a2ui_messages[key]
+
+    @override
+    async def _handle_request(self, context: RequestContext, event_queue: EventQueue):
+        await super()._handle_request(
+            context,
+            _RouteFlushingEventQueue(event_queue, lambda: self._flush_routes(context.task_id)),
+        )
+
+    def _get_route_writer(self, task_id: str, invocation_context: InvocationContext) -> SubagentRouteWriter:
+        if (route_writer := self._route_writers.get(task_id)) is None:
+            route_writer = self._route_writers[task_id] = SubagentRouteWriter(
+                invocation_context.session_service,
+                invocation_context.session,
+            )
+        return route_writer
+
+    async def _flush_routes(self, task_id: str):
+        if route_writer := self._route_writers.get(task_id):
+            await route_writer.flush()
+
     def convert_event_to_a2a_events_and_save_surface_id_to_subagent_name(
-        cls,
+        self,
         event: Event,
         invocation_context: InvocationContext,
         task_id: Optional[str] = None,
@@ -82,38 +133,64 @@ class OrchestratorAgentExecutor(A2aAgentExecutor):
             part_converter,
         )
 
+        # Remote subagents mark every part of their working updates as thought.
+        streamed_key = (task_id, event.author)
+        is_working_update = bool(
+            event.author in self._subagent_cards
+            and event.content
+            and event.content.parts
+            and all(part.thought for part in event.content.parts)
+        )
+        streamed_a2ui_messages = [] if is_working_update else self._streamed_a2ui_messages.pop(streamed_key, [])
         for a2a_event in a2a_events:
-            # Try to populate subagent agent card if available.
-            subagent_card = None
-            if (active_subagent_name := event.author):
-                # We need to find the subagent by name
-                if (subagent := next((sub for sub in invocation_context.agent.sub_agents if sub.name == active_subagent_name), None)):
-                    try:
-                        subagent_card = json.loads(subagent.description)
-                    except Exception:
-                        logger.warning(f"Failed to parse agent description for {active_subagent_name}")
-            if subagent_card:
+            message = a2a_event.status.message
+            if message and message.parts:
+                if is_working_update:
+                    self._streamed_a2ui_messages.setdefault(streamed_key, []).extend(
+                        a2a_part.root.data for a2a_part in message.parts if is_a2ui_part(a2a_part)
+                    )
+                elif streamed_a2ui_messages:
+                    message.parts = self._drop_streamed_a2ui_parts(message.parts, streamed_a2ui_messages)
+
+            # Populate subagent agent card if available.
+            if subagent_card := self._subagent_cards.get(event.author):
                 if a2a_event.metadata is None:
                     a2a_event.metadata = {}
                 a2a_event.metadata["a2a_subagent"] = subagent_card
                         
-            for a2a_part in a2a_event.status.message.parts:
+            for a2a_part in message.parts if message else []:
+                if not is_a2ui_part(a2a_part):
+                    continue
                 if (
-                    is_a2ui_part(a2a_part)
-                    and (begin_rendering := a2a_part.root.data.get("beginRendering"))
+                    (begin_rendering := a2a_part.root.data.get("beginRendering"))
                     and (surface_id := begin_rendering.get("surfaceId"))
-                ):                    
-                    asyncio.run_coroutine_threadsafe(
-                        SubagentRouteManager.set_route_to_subagent_name(
-                            surface_id,
-                            event.author,
-                            invocation_context.session_service,
-                            invocation_context.session,
-                        ),
-                        asyncio.get_event_loop(),
-                    )
+                ):
+                    self._get_route_writer(task_id, invocation_context).add(surface_id, event.author)
+                elif (
+                    (delete_surface := a2a_part.root.data.get("deleteSurface"))
+                    and (surface_id := delete_surface.get("surfaceId"))
+                ):
+                    self._get_route_writer(task_id, invocation_context).delete(surface_id)
+
+        return [
+            a2a_event for a2a_event in a2a_events
+            if not a2a_event.status.message or a2a_event.status.message.parts
+        ]
+
+    @staticmethod
+    def _drop_streamed_a2ui_parts(a2a_parts: list, streamed_a2ui_messages: List[dict[str, Any]]) -> list:
+        """Drops the A2UI parts of a final result that repeat a streamed message.
 
-        return a2a_events
+        Each streamed message is matched at most once, so a message the
+        subagent really sent twice is still relayed twice.
+        """
+        kept_parts = []
+        for a2a_part in a2a_parts:
+            if is_a2ui_part(a2a_part) and a2a_part.root.data in streamed_a2ui_messages:
+                streamed_a2ui_messages.remove(a2a_part.root.data)
+            else:
+                kept_parts.append(a2a_part)
+        return kept_parts
 
     @override
     async def _prepare_session(
@@ -136,10 +213,32 @@ class OrchestratorAgentExecutor(A2aAgentExecutor):
                             state_delta={ 
                                 # These values are used to configure A2UI messages to remote agent calls         
                                 "use_ui": True,
-                                "client_capabilities": client_capabilities 
+                                "client_capabilities": client_capabilities,
+                                # Hashed once per request, so that results per client capabilities can be cached
+                                CLIENT_CAPABILITIES_HASH_STATE_KEY: get_client_capabilities_hash(client_capabilities),
                             }
                         ),
                     ),
                 )
             
-        return session
\ No newline at end of file
+        return session
+
+
+class _RouteFlushingEventQueue:
+    """Flushes the task's surface routes before its result is published.
+
+    This way the routes are persisted before the client can send a userAction
+    on one of the task's surfaces.
+    """
+
+    def __init__(self, event_queue: EventQueue, flush_routes: Callable[[], Awaitable[None]]):
+        self._event_queue = event_queue
+        self._flush_routes = flush_routes
+
+    async def enqueue_event(self, event: A2AEvent):
+        if isinstance(event, TaskArtifactUpdateEvent) or (isinstance(event, TaskStatusUpdateEvent) and event.final):
+            await self._flush_routes()
+        await self._event_queue.enqueue_event(event)
+
+    def __getattr__(self, name):
+        return getattr(self._event_queue, name)
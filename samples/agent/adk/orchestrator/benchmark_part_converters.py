@@ -0,0 +1,62 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks detecting A2UI parts in a history of mixed chat text and A2UI
+parts, with and without the candidate check of `parse_a2ui_part`.
+
+Run from this directory with `uv run benchmark_part_converters.py`.
+"""
+
+import timeit
+from typing import Optional
+
+import pydantic
+from a2a import types as a2a_types
+from a2ui.a2ui_extension import create_a2ui_part, is_a2ui_part
+from google.genai import types as genai_types
+
+from part_converters import convert_a2a_part_to_genai_part, parse_a2ui_part
+
+
+def parse_without_check(text: str) -> Optional[a2a_types.Part]:
+    try:
+        a2a_part = a2a_types.Part.model_validate_json(text)
+    except pydantic.ValidationError:
+        return None
+    return a2a_part if is_a2ui_part(a2a_part) else None
+
+
+def main():
+    a2ui_part = convert_a2a_part_to_genai_part(create_a2ui_part({
+        "surfaceUpdate": {
+            "surfaceId": "contact-card",
+            "components": [{"id": f"text-{i}", "component": {"Text": {"text": {"literalString": f"Line {i}"}}}} for i in range(50)],
+        }
+    }))
+    history = [
+        genai_types.Part(text="Show me chinese food restaurants in NYC"),
+        genai_types.Part(text="Here are the top restaurants I found. " * 20),
+        genai_types.Part(text='{"note": "JSON text that is not an A2UI part"}'),
+        a2ui_part,
+    ] * 25
+
+    text_history = [part for part in history if part is not a2ui_part]
+    for history_name, parts in (("mixed", history), ("text only", text_history)):
+        for name, parse in (("without check", parse_without_check), ("with check", parse_a2ui_part)):
+            seconds = min(timeit.repeat(lambda: [parse(part.text) for part in parts], number=100, repeat=5)) / 100
+            print(f"{history_name} history of {len(parts)} parts, {name}: {seconds * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, List, Optional, override
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types as genai_types
+from pydantic import PrivateAttr
+
+import part_converters
+from subagent_capability_filter import COMPATIBLE_SUBAGENT_NAMES_STATE_KEY
+
+logger = logging.getLogger(__name__)
+
+FAN_OUT_AGENT_NAME = "fan_out_agent"
+
+# State key of the subagents the next fan-out runs, set by transfer_to_agents.
+FAN_OUT_AGENT_NAMES_STATE_KEY = "temp:fan_out_agent_names"
+
+_DONE = object()
+
+
+class FanOutAgent(BaseAgent):
+    """Runs several subagents at the same time and merges their answers.
+
+    The orchestrator LLM calls `transfer_to_agents` with the subagents a
+    request needs, which transfers to this agent. Events of all subagents are
+    relayed as they arrive and keep their subagent as author, so their A2UI
+    messages reach the client immediately and their surfaces are routed to
+    the subagent that rendered them. The subagents' text answers are held
+    back and sent as one merged answer once the slowest subagent finishes.
+    """
+
+    _subagents: dict[str, BaseAgent] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, subagents: List[BaseAgent], **kwargs):
+        super().__init__(
+            name=FAN_OUT_AGENT_NAME,
+            description=(
+                "Runs several subagents in parallel. Do not transfer to this agent, "
+                "call transfer_to_agents with the subagents instead."
+            ),
+            **kwargs,
+        )
+        self._subagents = {subagent.name: subagent for subagent in subagents}
+
+    def transfer_to_agents(self, agent_names: List[str], tool_context: ToolContext) -> dict[str, Any]:
+        """Transfers the question to several subagents, which answer it in parallel.
+
+        Use this instead of transfer_to_agent when the request needs more than
+        one subagent, for example to show charts and look up a contact.
+
+        Args:
+          agent_names: The names of the subagents to transfer to.
+        """
+        available_names = tool_context.state.get(COMPATIBLE_SUBAGENT_NAMES_STATE_KEY) or list(self._subagents)
+        unknown_names = [name for name in agent_names if name not in self._subagents or name not in available_names]
+        if unknown_names or not agent_names:
+            return {
+                "error": f"Unknown subagents {unknown_names}, choose from "
+                f"{[name for name in self._subagents if name in available_names]}"
+            }
+
+        tool_context.state[FAN_OUT_AGENT_NAMES_STATE_KEY] = list(dict.fromkeys(agent_names))
+        tool_context.actions.transfer_to_agent = self.name
+        return {}
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        agent_names = ctx.session.state.get(FAN_OUT_AGENT_NAMES_STATE_KEY) or []
+        subagents = [self._subagents[name] for name in agent_names if name in self._subagents]
+        if not subagents:
+            yield self._create_text_event(ctx, "No subagents were selected to answer this request.")
+            return
+
+        logger.info(f"Fanning out to subagents {[subagent.name for subagent in subagents]}")
+
+        # Each subagent builds its request from the session events, so it gets
+        # a snapshot of them without the events of the other subagents.
+        subagent_ctx = ctx.model_copy(
+            update={"session": ctx.session.model_copy(update={"events": list(ctx.session.events)})}
+        )
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def run_subagent(subagent: BaseAgent):
+            try:
+                async for event in subagent.run_async(subagent_ctx):
+                    await queue.put(event)
+            except Exception as e:
+                logger.exception(f"Subagent {subagent.name} failed")
+                await queue.put(Event(
+                    author=subagent.name,
+                    error_message=str(e),
+                    invocation_id=ctx.invocation_id,
+                    branch=ctx.branch,
+                ))
+            finally:
+                await queue.put(_DONE)
+
+        answers: dict[str, List[str]] = {subagent.name: [] for subagent in subagents}
+        tasks = [asyncio.create_task(run_subagent(subagent)) for subagent in subagents]
+        try:
+            running = len(tasks)
+            while running:
+                event = await queue.get()
+                if event is _DONE:
+                    running -= 1
+                    continue
+                if event.error_message:
+                    answers[event.author].append(f"Failed to answer: {event.error_message}")
+                elif not event.partial and event.content and event.content.parts:
+                    self._take_text_answer(event, answers[event.author])
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        merged_answer = "\n\n".join(
+            f"**{name}**\n" + "\n".join(texts)
+            for name, texts in answers.items() if texts
+        )
+        if merged_answer:
+            yield self._create_text_event(ctx, merged_answer)
+
+    @staticmethod
+    def _take_text_answer(event: Event, answer: List[str]):
+        """Moves the text answer out of a subagent event, keeping its A2UI and other parts."""
+        kept_parts = []
+        for part in event.content.parts:
+            if part.text and not part.thought and not part_converters.parse_a2ui_part(part.text):
+                answer.append(part.text)
+            else:
+                kept_parts.append(part)
+        event.content = genai_types.Content(role=event.content.role, parts=kept_parts) if kept_parts else None
+
+    def _create_text_event(self, ctx: InvocationContext, text: str) -> Event:
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)]),
+        )
@@ -0,0 +1,270 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Collection, List, Optional
+
+from a2a.types import AgentCard
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types as genai_types
+
+import part_converters
+from subagent_capability_filter import COMPATIBLE_SUBAGENT_NAMES_STATE_KEY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SCORE = 1.0
+DEFAULT_MIN_MARGIN = 0.5
+METRICS_LOG_INTERVAL = 100
+
+# State key of the router's prediction for turns it leaves to the LLM, used to
+# measure how often the two agree.
+PREDICTION_STATE_KEY = "temp:intent_router_prediction"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or show the to what when where which who "
+    "with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into words, with stop words and plural s removed."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    """The subagent the router would pick for a request, and how sure it is."""
+
+    agent_name: Optional[str]
+    score: float
+    margin: float
+    confident: bool
+    # Whether the request also matches other subagents, e.g. "show my sales
+    # charts and contact the regional manager".
+    multi_intent: bool = False
+
+
+class IntentRouter:
+    """Routes free-text requests to subagents with BM25 over their agent cards.
+
+    Every subagent is a document made of its card's name, description and
+    skills. A request is routed without an LLM call when the best subagent
+    scores at least `min_score` and leads the runner-up by a relative margin
+    of at least `min_margin`. Other requests fall back to the LLM, and the
+    router's prediction is compared with the LLM's choice so that its
+    accuracy can be monitored.
+
+    When the orchestrator can fan out to several subagents, requests that
+    match a term of another subagent that the best one lacks are always left
+    to the LLM, which can call all of them.
+    """
+
+    def __init__(
+        self,
+        subagent_cards: dict[str, AgentCard],
+        min_score: float = DEFAULT_MIN_SCORE,
+        min_margin: float = DEFAULT_MIN_MARGIN,
+        shadow: bool = False,
+        fan_out: bool = False,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """Initializes the IntentRouter.
+
+        Args:
+            subagent_cards: The agent card of each subagent, by subagent name.
+            min_score: The minimum BM25 score to route without the LLM.
+            min_margin: The minimum relative lead over the runner-up to route
+              without the LLM.
+            shadow: Whether to only record decisions and always use the LLM.
+            fan_out: Whether the LLM can transfer to several subagents at once.
+            k1: The BM25 term frequency saturation.
+            b: The BM25 document length normalization.
+        """
+        self._min_score = min_score
+        self._min_margin = min_margin
+        self._shadow = shadow
+        self._fan_out = fan_out
+        self._k1 = k1
+        self._b = b
+
+        self._agent_names = list(subagent_cards)
+        self._term_frequencies = [Counter(self._get_card_tokens(card)) for card in subagent_cards.values()]
+        self._doc_lengths = [sum(tf.values()) for tf in self._term_frequencies]
+        self._avg_doc_length = sum(self._doc_lengths) / max(len(self._doc_lengths), 1)
+        document_frequencies = Counter(term for tf in self._term_frequencies for term in tf)
+        n_docs = len(self._term_frequencies)
+        self._idf = {
+            term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for term, df in document_frequencies.items()
+        }
+        self.metrics: Counter[str] = Counter()
+
+    @staticmethod
+    def _get_card_tokens(card: AgentCard) -> List[str]:
+        texts = [card.name, card.description or ""]
+        for skill in card.skills or []:
+            # Skill names and tags are the most specific signals, so they count twice.
+            texts.extend([skill.name, skill.name, skill.description or ""])
+            texts.extend(skill.examples or [])
+            texts.extend((skill.tags or []) * 2)
+        return [token for text in texts for token in tokenize(text)]
+
+    def route(self, text: str, agent_names: Optional[Collection[str]] = None) -> RoutingDecision:
+        """Scores every subagent for a request.
+
+        Args:
+            text: The user request.
+            agent_names: The subagents to choose from, all of them if None.
+
+        Returns:
+            The best subagent and whether the router is confident in it.
+        """
+        query = tokenize(text)
+        scores = {
+            i: self._score(query, i)
+            for i, name in enumerate(self._agent_names)
+            if agent_names is None or name in agent_names
+        }
+        if not scores:
+            return RoutingDecision(agent_name=None, score=0.0, margin=0.0, confident=False)
+
+        ranked = sorted(scores, key=scores.__getitem__, reverse=True)
+        best_score = scores[ranked[0]]
+        runner_up_score = scores[ranked[1]] if len(ranked) > 1 else 0.0
+        margin = (best_score - runner_up_score) / best_score if best_score > 0 else 0.0
+        # Terms shared with the best subagent, like "find", are no evidence of
+        # a second intent, only terms it does not know are.
+        best_terms = self._term_frequencies[ranked[0]]
+        multi_intent = self._fan_out and any(
+            term not in best_terms and term in self._term_frequencies[i]
+            for i in ranked[1:]
+            for term in query
+        )
+        return RoutingDecision(
+            agent_name=self._agent_names[ranked[0]] if best_score > 0 else None,
+            score=best_score,
+            margin=margin,
+            confident=best_score >= self._min_score and margin >= self._min_margin and not multi_intent,
+            multi_intent=multi_intent,
+        )
+
+    def _score(self, query: List[str], doc: int) -> float:
+        tf = self._term_frequencies[doc]
+        length_norm = self._k1 * (1 - self._b + self._b * self._doc_lengths[doc] / self._avg_doc_length)
+        return sum(
+            self._idf[term] * tf[term] * (self._k1 + 1) / (tf[term] + length_norm)
+            for term in query
+            if term in tf
+        )
+
+    def before_model_callback(
+        self,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+    ) -> Optional[LlmResponse]:
+        """Transfers confidently routed user requests without calling the LLM."""
+        text = self._get_user_request_text(callback_context, llm_request)
+        if not text:
+            return None
+
+        decision = self.route(text, callback_context.state.get(COMPATIBLE_SUBAGENT_NAMES_STATE_KEY))
+        logger.info(
+            f"Intent router picked '{decision.agent_name}' with score {decision.score:.2f} "
+            f"and margin {decision.margin:.2f}, confident={decision.confident}, multi_intent={decision.multi_intent}"
+        )
+        if not decision.confident or self._shadow:
+            self._record("llm_fallbacks")
+            if decision.multi_intent:
+                self.metrics["multi_intent_fallbacks"] += 1
+            if decision.agent_name:
+                callback_context.state[PREDICTION_STATE_KEY] = decision.agent_name
+            return None
+
+        self._record("local_routes")
+        return LlmResponse(
+            content=genai_types.Content(
+                role="model",
+                parts=[
+                    genai_types.Part(
+                        function_call=genai_types.FunctionCall(
+                            name="transfer_to_agent",
+                            args={"agent_name": decision.agent_name},
+                        )
+                    )
+                ],
+            )
+        )
+
+    def after_model_callback(
+        self,
+        callback_context: CallbackContext,
+        llm_response: LlmResponse,
+    ) -> Optional[LlmResponse]:
+        """Compares the LLM's transfer with the router's prediction."""
+        prediction = callback_context.state.get(PREDICTION_STATE_KEY)
+        if not prediction or not llm_response.content:
+            return None
+
+        for part in llm_response.content.parts or []:
+            if part.function_call and part.function_call.name == "transfer_to_agent":
+                callback_context.state[PREDICTION_STATE_KEY] = None
+                agreed = (part.function_call.args or {}).get("agent_name") == prediction
+                self._record("llm_agreements" if agreed else "llm_disagreements")
+                break
+        return None
+
+    @staticmethod
+    def _get_user_request_text(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[str]:
+        """Returns the text of the user's new message if the LLM is about to answer it."""
+        user_content = callback_context.user_content
+        if not user_content or not user_content.parts or not llm_request.contents:
+            return None
+        last_content = llm_request.contents[-1]
+        if last_content.role != "user" or last_content.parts != user_content.parts:
+            return None
+        text = " ".join(part.text for part in user_content.parts if part.text)
+        # userActions are routed by surface, not by intent.
+        if not text or part_converters.is_a2ui_part_candidate(text):
+            return None
+        return text
+
+    def _record(self, metric: str):
+        self.metrics[metric] += 1
+        decisions = self.metrics["local_routes"] + self.metrics["llm_fallbacks"]
+        if metric in ("local_routes", "llm_fallbacks") and decisions % METRICS_LOG_INTERVAL == 0:
+            logger.info(f"Intent router metrics: {self.get_metrics()}")
+
+    def get_metrics(self) -> dict[str, float]:
+        """Returns the decision counts and the agreement rate with the LLM."""
+        compared = self.metrics["llm_agreements"] + self.metrics["llm_disagreements"]
+        return {
+            **self.metrics,
+            "llm_agreement_rate": round(self.metrics["llm_agreements"] / compared, 3) if compared else None,
+        }
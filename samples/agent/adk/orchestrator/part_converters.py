@@ -19,7 +19,8 @@ from a2a import types as a2a_types
 from google.genai import types as genai_types
 
 from google.adk.a2a.converters import part_converter
-from a2ui.a2ui_extension import is_a2ui_part
+from a2ui.a2ui_extension import is_a2ui_part, A2UI_MIME_TYPE
+from a2ui.a2ui_logging_utils import lazy_model_json
 
 import pydantic
 
@@ -30,22 +31,36 @@ def convert_a2a_part_to_genai_part(
 ) -> Optional[genai_types.Part]:           
     if is_a2ui_part(a2a_part):                
         genai_part = genai_types.Part(text=a2a_part.model_dump_json())
-        logger.info(f'Converted A2UI part from A2A: {a2a_part.model_dump_json(exclude_none=True)} to GenAI: {genai_part.model_dump_json(exclude_none=True)}'[:200] + "...")    
+        logger.debug('Converted A2UI part from A2A: %s to GenAI: %s', lazy_model_json(a2a_part), lazy_model_json(genai_part))
         return genai_part
         
     return part_converter.convert_a2a_part_to_genai_part(a2a_part)
 
+def is_a2ui_part_candidate(text: str) -> bool:
+    """Cheaply checks whether text may be an A2UI part serialized by convert_a2a_part_to_genai_part.
+
+    Ordinary chat text fails on the first character or the substring search,
+    so only candidates pay for a full pydantic parse.
+    """
+    return text[:1] == "{" and A2UI_MIME_TYPE in text
+
+def parse_a2ui_part(text: str) -> Optional[a2a_types.Part]:
+    """Returns the A2UI part serialized in text, or None for any other text."""
+    if not is_a2ui_part_candidate(text):
+        return None
+    try:
+        a2a_part = a2a_types.Part.model_validate_json(text)
+    except pydantic.ValidationError:
+        # Expected for JSON text that is not an A2A part
+        return None
+    return a2a_part if is_a2ui_part(a2a_part) else None
+
 def convert_genai_part_to_a2a_part(    
     part: genai_types.Part,
 ) -> Optional[a2a_types.Part]:
-    if part.text:
-        try:
-            a2a_part = a2a_types.Part.model_validate_json(part.text)
-            if is_a2ui_part(a2a_part):           
-                logger.info(f'Converted A2UI part from GenAI: {part.model_dump_json(exclude_none=True)} to A2A: {a2a_part.model_dump_json(exclude_none=True)}'[:200] + "...")    
-                return a2a_part        
-        except pydantic.ValidationError:
-            # Expected for normal text input
-            pass
+    if part.text and (a2a_part := parse_a2ui_part(part.text)):
+        logger.debug('Converted A2UI part from GenAI: %s to A2A: %s', lazy_model_json(part), lazy_model_json(a2a_part))
+        return a2a_part
         
-    return part_converter.convert_genai_part_to_a2a_part(part)
\ No newline at end of file
+    return part_converter.convert_genai_part_to_a2a_part(part)
+
@@ -0,0 +1,310 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+import httpx
+from a2a.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_EJECTION_SECONDS = 30.0
+DEFAULT_EWMA_ALPHA = 0.3
+DEFAULT_MAX_STICKY_ENTRIES = 10000
+
+_ID_PATTERN = re.compile(rb'"(contextId|taskId|surfaceId)"\s*:\s*"([^"]+)"')
+# Bytes kept from the previous chunk of a response, so that ids split across
+# chunks are still found.
+_SCAN_OVERLAP_BYTES = 256
+
+
+def get_card_identity(card: AgentCard) -> tuple:
+    """Returns what replicas of the same subagent have in common in their cards."""
+    return (card.name, card.version, tuple(sorted(skill.id for skill in card.skills or [])))
+
+
+@dataclass
+class Replica:
+    """The load and health of one replica of a subagent."""
+
+    url: str
+    outstanding: int = 0
+    ewma_latency: float = 0.0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    ejections: int = 0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class ReplicaGroup:
+    """Replicas serving the same agent card, addressed by the first one's URL."""
+
+    def __init__(self, name: str, urls: List[str]):
+        self.name = name
+        self.replicas = [Replica(url=url.rstrip("/")) for url in urls]
+        self.canonical_url = self.replicas[0].url
+
+    def choose(self, exclude: tuple[Replica, ...] = ()) -> Replica:
+        """Picks the available replica with the fewest outstanding requests.
+
+        Ties are broken by EWMA latency. If every replica is ejected, the one
+        whose ejection ends first gets the request as a probe.
+        """
+        now = time.monotonic()
+        candidates = [replica for replica in self.replicas if replica not in exclude] or self.replicas
+        available = [replica for replica in candidates if replica.is_available(now)]
+        if not available:
+            return min(candidates, key=lambda replica: replica.ejected_until)
+        return min(available, key=lambda replica: (replica.outstanding, replica.ewma_latency))
+
+
+class _ObservedStream(httpx.AsyncByteStream):
+    """A response stream that reports its chunks and its end."""
+
+    def __init__(
+        self,
+        stream: httpx.AsyncByteStream,
+        on_chunk: Callable[[bytes], None],
+        on_close: Callable[[], None],
+    ):
+        self._stream = stream
+        self._on_chunk = on_chunk
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._on_chunk(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class ReplicaRouter(httpx.AsyncBaseTransport):
+    """An httpx transport that spreads subagent calls over replica groups.
+
+    Requests to a group's canonical URL are sent to the replica with the
+    fewest outstanding requests, then the lowest EWMA latency. Replicas are
+    checked passively: connection errors and 5xx responses count as failures,
+    and a replica is ejected for `ejection_seconds` after `failure_threshold`
+    consecutive failures, after which one request probes it again.
+
+    Conversations are sticky: the context ids seen in a replica's responses
+    pin later requests that carry them to the same replica, which holds the
+    session. Surface ids are the same in every conversation, so they are
+    scoped by the task that rendered them and only pin userActions sent
+    without a context id.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        ejection_seconds: float = DEFAULT_EJECTION_SECONDS,
+        ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+        max_sticky_entries: int = DEFAULT_MAX_STICKY_ENTRIES,
+    ):
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._failure_threshold = failure_threshold
+        self._ejection_seconds = ejection_seconds
+        self._ewma_alpha = ewma_alpha
+        self._max_sticky_entries = max_sticky_entries
+        self._groups: dict[str, ReplicaGroup] = {}
+        # Keyed by context id, or by (task id, surface id).
+        self._sticky_replicas: OrderedDict[str | tuple[str, str], Replica] = OrderedDict()
+        self.metrics: Counter[str] = Counter()
+
+    def set_transport(self, transport: httpx.AsyncBaseTransport):
+        """Sets the transport that sends the requests, e.g. a pooled AsyncHTTPTransport."""
+        self._transport = transport
+
+    def add_group(self, name: str, urls: List[str]) -> str:
+        """Registers the replicas of a subagent.
+
+        Args:
+            name: The name of the subagent.
+            urls: The JSON-RPC URLs of the replicas.
+
+        Returns:
+            The canonical URL that clients of the group should call.
+        """
+        group = ReplicaGroup(name, urls)
+        self._groups[group.canonical_url] = group
+        logger.info(f"Registered {len(urls)} replicas for subagent {name}: {urls}")
+        return group.canonical_url
+
+    def _get_group(self, url: str) -> Optional[ReplicaGroup]:
+        for canonical_url, group in self._groups.items():
+            if url == canonical_url or url.startswith(canonical_url + "/"):
+                return group
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        group = self._get_group(str(request.url))
+        if group is None:
+            return await self._transport.handle_async_request(request)
+
+        sticky_replica = self._get_sticky_replica(request, group)
+        replica = sticky_replica if sticky_replica and sticky_replica.is_available(time.monotonic()) else None
+        if sticky_replica and replica is None:
+            logger.warning(f"Sticky replica {sticky_replica.url} of {group.name} is ejected, rerouting")
+            self.metrics["sticky_reroutes"] += 1
+        elif replica:
+            self.metrics["sticky_hits"] += 1
+        replica = replica or group.choose()
+
+        original_url = str(request.url)
+        try:
+            return await self._send(request, group, replica, original_url)
+        except httpx.ConnectError:
+            # Nothing was sent, so the request can safely go to another replica.
+            if len(group.replicas) == 1:
+                raise
+            retry_replica = group.choose(exclude=(replica,))
+            logger.warning(f"Failed to connect to {replica.url}, retrying on {retry_replica.url}")
+            self.metrics["retries"] += 1
+            return await self._send(request, group, retry_replica, original_url)
+
+    async def _send(
+        self, request: httpx.Request, group: ReplicaGroup, replica: Replica, original_url: str
+    ) -> httpx.Response:
+        request.url = httpx.URL(replica.url + original_url[len(group.canonical_url):])
+        request.headers["Host"] = request.url.netloc.decode("ascii")
+
+        replica.outstanding += 1
+        replica.requests += 1
+        started = time.monotonic()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            replica.outstanding -= 1
+            self._record_failure(replica)
+            raise
+
+        latency = time.monotonic() - started
+        replica.ewma_latency = (
+            latency if not replica.ewma_latency
+            else self._ewma_alpha * latency + (1 - self._ewma_alpha) * replica.ewma_latency
+        )
+        if response.status_code >= 500:
+            self._record_failure(replica)
+        else:
+            replica.consecutive_failures = 0
+
+        tail = b""
+        task_id: Optional[str] = None
+
+        def on_chunk(chunk: bytes):
+            nonlocal tail, task_id
+            data = tail + chunk
+            for match in _ID_PATTERN.finditer(data):
+                value = match.group(2).decode("utf-8", "replace")
+                if match.group(1) == b"contextId":
+                    self._set_sticky_replica(value, replica)
+                elif match.group(1) == b"taskId":
+                    task_id = value
+                elif task_id:
+                    self._set_sticky_replica((task_id, value), replica)
+            tail = data[-_SCAN_OVERLAP_BYTES:]
+
+        def on_close():
+            replica.outstanding -= 1
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ObservedStream(response.stream, on_chunk, on_close),
+            extensions=response.extensions,
+        )
+
+    def _record_failure(self, replica: Replica):
+        replica.failures += 1
+        replica.consecutive_failures += 1
+        if replica.consecutive_failures >= self._failure_threshold:
+            replica.ejected_until = time.monotonic() + self._ejection_seconds
+            replica.ejections += 1
+            replica.consecutive_failures = 0
+            logger.warning(f"Ejected replica {replica.url} for {self._ejection_seconds}s after repeated failures")
+
+    def _get_sticky_replica(self, request: httpx.Request, group: ReplicaGroup) -> Optional[Replica]:
+        """Returns the replica that holds the context or surfaces of a request."""
+        try:
+            message = json.loads(request.content).get("params", {}).get("message", {})
+        except (httpx.RequestNotRead, ValueError, AttributeError):
+            return None
+
+        # Context ids are unique, surface ids only within a task, so surface
+        # ids are only used for requests without a context id.
+        if message.get("contextId"):
+            keys = [message["contextId"]]
+        elif message.get("taskId"):
+            keys = [
+                (message["taskId"], part["data"]["userAction"]["surfaceId"])
+                for part in message.get("parts", [])
+                if isinstance(part.get("data"), dict) and isinstance(part["data"].get("userAction"), dict)
+                and "surfaceId" in part["data"]["userAction"]
+            ]
+        else:
+            keys = []
+        for key in keys:
+            if (replica := self._sticky_replicas.get(key)) and replica in group.replicas:
+                self._sticky_replicas.move_to_end(key)
+                return replica
+        return None
+
+    def _set_sticky_replica(self, key: str | tuple[str, str], replica: Replica):
+        self._sticky_replicas[key] = replica
+        self._sticky_replicas.move_to_end(key)
+        while len(self._sticky_replicas) > self._max_sticky_entries:
+            self._sticky_replicas.popitem(last=False)
+
+    async def aclose(self):
+        if self._transport:
+            await self._transport.aclose()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Returns the load, health and stickiness counters of every replica."""
+        return {
+            **self.metrics,
+            "groups": {
+                group.name: [
+                    {
+                        "url": replica.url,
+                        "requests": replica.requests,
+                        "failures": replica.failures,
+                        "ejections": replica.ejections,
+                        "outstanding": replica.outstanding,
+                        "ewma_latency_ms": round(replica.ewma_latency * 1000, 1),
+                    }
+                    for replica in group.replicas
+                ]
+                for group in self._groups.values()
+            },
+        }
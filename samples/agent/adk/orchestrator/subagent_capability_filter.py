@@ -0,0 +1,209 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from a2a.types import AgentCard
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.flows.llm_flows.agent_transfer import _build_target_agents_instructions, _get_transfer_targets
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from a2ui.a2ui_extension import (
+    A2UI_EXTENSION_URI,
+    AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY,
+    AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY,
+    AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY,
+    INLINE_CATALOGS_HASH_KEY,
+    INLINE_CATALOGS_KEY,
+    STANDARD_CATALOG_ID,
+    SUPPORTED_CATALOG_IDS_KEY,
+    get_client_capabilities_hash,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CACHE_ENTRIES = 256
+TRANSFER_TO_AGENT_TOOL_NAME = "transfer_to_agent"
+
+# State keys of the client capabilities hash, set once per request by the
+# executor, and of the subagents compatible with the client in this turn.
+CLIENT_CAPABILITIES_HASH_STATE_KEY = "client_capabilities_hash"
+COMPATIBLE_SUBAGENT_NAMES_STATE_KEY = "temp:compatible_subagent_names"
+
+
+@dataclass(frozen=True)
+class _A2uiSupport:
+    """The catalogs a subagent can render to, from its agent card."""
+
+    catalog_ids: frozenset[str]
+    accepts_inline_catalogs: bool
+    accepts_inline_catalogs_hash: bool
+
+    @classmethod
+    def from_card(cls, card: AgentCard) -> Optional["_A2uiSupport"]:
+        for extension in card.capabilities.extensions or []:
+            if extension.uri == A2UI_EXTENSION_URI:
+                params = extension.params or {}
+                return cls(
+                    # Agents that do not list catalogs support the standard one.
+                    catalog_ids=frozenset(params.get(AGENT_EXTENSION_SUPPORTED_CATALOG_IDS_KEY) or [STANDARD_CATALOG_ID]),
+                    accepts_inline_catalogs=bool(params.get(AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY)),
+                    accepts_inline_catalogs_hash=bool(params.get(AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY)),
+                )
+        return None
+
+    def is_compatible(self, client_capabilities: dict[str, Any]) -> bool:
+        has_inline_catalogs = bool(client_capabilities.get(INLINE_CATALOGS_KEY))
+        has_inline_catalogs_hash = bool(client_capabilities.get(INLINE_CATALOGS_HASH_KEY))
+        client_catalog_ids = client_capabilities.get(SUPPORTED_CATALOG_IDS_KEY) or []
+        if not client_catalog_ids and not has_inline_catalogs and not has_inline_catalogs_hash:
+            client_catalog_ids = [STANDARD_CATALOG_ID]
+
+        return (
+            not self.catalog_ids.isdisjoint(client_catalog_ids)
+            or (self.accepts_inline_catalogs and has_inline_catalogs)
+            or (self.accepts_inline_catalogs_hash and has_inline_catalogs_hash)
+        )
+
+
+class SubagentCapabilityFilter:
+    """Hides subagents whose A2UI output the client cannot render.
+
+    A subagent is compatible with a client if they share a catalog, or if the
+    client sends inline catalogs the subagent accepts. Subagents without the
+    A2UI extension only answer with text and are always compatible. The
+    compatible subagents are computed once per distinct client capabilities
+    and cached by their hash.
+
+    As a before_model_callback, the filter removes incompatible subagents from
+    the transfer instructions and from the choices of `transfer_to_agent`.
+    It must run before callbacks that route on their own, which read the
+    compatible subagents from `COMPATIBLE_SUBAGENT_NAMES_STATE_KEY`.
+    """
+
+    def __init__(
+        self,
+        subagents: List[BaseAgent],
+        subagent_cards: dict[str, AgentCard],
+        max_cache_entries: int = DEFAULT_MAX_CACHE_ENTRIES,
+    ):
+        """Initializes the SubagentCapabilityFilter.
+
+        Args:
+            subagents: All subagents of the orchestrator.
+            subagent_cards: The agent card of each remote subagent, by name.
+              Subagents without a card are never hidden.
+            max_cache_entries: The maximum number of distinct client
+              capabilities to cache results for.
+        """
+        self._subagents = {subagent.name: subagent for subagent in subagents}
+        self._a2ui_support = {name: _A2uiSupport.from_card(card) for name, card in subagent_cards.items()}
+        self._max_cache_entries = max_cache_entries
+        self._cache: OrderedDict[str, frozenset[str]] = OrderedDict()
+        self.metrics: Counter[str] = Counter()
+
+    def get_compatible_subagent_names(
+        self, client_capabilities: dict[str, Any], client_capabilities_hash: Optional[str] = None
+    ) -> frozenset[str]:
+        """Returns the names of the subagents compatible with the client.
+
+        Args:
+            client_capabilities: The client's `a2uiClientCapabilities`.
+            client_capabilities_hash: The hash of the capabilities, computed if
+              not given.
+
+        Returns:
+            The compatible subagents, or all subagents if none is compatible.
+        """
+        client_capabilities_hash = client_capabilities_hash or get_client_capabilities_hash(client_capabilities)
+        if (compatible := self._cache.get(client_capabilities_hash)) is not None:
+            self._cache.move_to_end(client_capabilities_hash)
+            self.metrics["cache_hits"] += 1
+            return compatible
+
+        self.metrics["cache_misses"] += 1
+        compatible = frozenset(
+            name for name in self._subagents
+            if (support := self._a2ui_support.get(name)) is None or support.is_compatible(client_capabilities)
+        )
+        if not any(name in self._a2ui_support for name in compatible):
+            logger.warning(f"No subagent is compatible with client capabilities {client_capabilities}, keeping all")
+            compatible = frozenset(self._subagents)
+
+        self._cache[client_capabilities_hash] = compatible
+        while len(self._cache) > self._max_cache_entries:
+            self._cache.popitem(last=False)
+        return compatible
+
+    def before_model_callback(
+        self,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+    ) -> Optional[LlmResponse]:
+        """Removes subagents the client cannot render from the routing prompt."""
+        client_capabilities = callback_context.state.get("client_capabilities")
+        if not callback_context.state.get("use_ui") or not isinstance(client_capabilities, dict):
+            return None
+
+        compatible = self.get_compatible_subagent_names(
+            client_capabilities, callback_context.state.get(CLIENT_CAPABILITIES_HASH_STATE_KEY)
+        )
+        callback_context.state[COMPATIBLE_SUBAGENT_NAMES_STATE_KEY] = sorted(compatible)
+        hidden = [name for name in self._subagents if name not in compatible]
+        if hidden:
+            logger.info(f"Hiding subagents {hidden} that are incompatible with the client")
+            self.metrics["filtered_requests"] += 1
+            # Callbacks get no public handle on their agent.
+            self._remove_transfer_targets(callback_context._invocation_context.agent, llm_request, hidden)
+        return None
+
+    def _remove_transfer_targets(self, agent: LlmAgent, llm_request: LlmRequest, hidden: List[str]):
+        # The transfer instructions ADK added for all transfer targets are
+        # replaced by the ones it would build for the compatible targets only.
+        transfer_targets = _get_transfer_targets(agent)
+        transfer_instructions = _build_target_agents_instructions(TRANSFER_TO_AGENT_TOOL_NAME, agent, transfer_targets)
+        system_instruction = llm_request.config.system_instruction
+        if isinstance(system_instruction, str) and transfer_instructions in system_instruction:
+            llm_request.config.system_instruction = system_instruction.replace(
+                transfer_instructions,
+                _build_target_agents_instructions(
+                    TRANSFER_TO_AGENT_TOOL_NAME,
+                    agent,
+                    [target for target in transfer_targets if target.name not in hidden],
+                ),
+            )
+        else:
+            logger.warning("Transfer instructions not found, only removing hidden subagents from the transfer_to_agent choices")
+
+        for tool in llm_request.config.tools or []:
+            for declaration in getattr(tool, "function_declarations", None) or []:
+                if declaration.name != TRANSFER_TO_AGENT_TOOL_NAME:
+                    continue
+                if declaration.parameters and (agent_name_schema := declaration.parameters.properties.get("agent_name")):
+                    if agent_name_schema.enum:
+                        agent_name_schema.enum = [name for name in agent_name_schema.enum if name not in hidden]
+                if declaration.parameters_json_schema:
+                    agent_name_schema = declaration.parameters_json_schema.get("properties", {}).get("agent_name", {})
+                    if agent_name_schema.get("enum"):
+                        agent_name_schema["enum"] = [name for name in agent_name_schema["enum"] if name not in hidden]
+
+    def get_metrics(self) -> dict[str, int]:
+        """Returns the cache and filtering counters."""
+        return {**self.metrics, "cached_capabilities": len(self._cache)}
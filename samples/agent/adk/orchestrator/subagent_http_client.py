@@ -0,0 +1,124 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from collections import Counter
+from typing import Any
+
+import httpx
+from google.adk.agents.remote_a2a_agent import DEFAULT_TIMEOUT
+
+from replica_router import ReplicaRouter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+
+class ConnectionMetrics:
+    """Counts requests and newly opened connections per host.
+
+    Every request that is not preceded by a new TCP connection reused a
+    pooled one, so `reuse_ratio` shows how much connection churn remains.
+    """
+
+    def __init__(self):
+        self.requests: Counter[str] = Counter()
+        self.new_connections: Counter[str] = Counter()
+
+    async def on_request(self, request: httpx.Request) -> None:
+        """httpx request hook that traces the request's connection usage."""
+        host = request.url.host
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.started":
+                self.new_connections[host] += 1
+            elif event_name.endswith(".send_request_headers.started"):
+                self.requests[host] += 1
+
+        request.extensions["trace"] = trace
+
+    @property
+    def reuse_ratio(self) -> float:
+        """The fraction of requests sent over an already open connection."""
+        requests = sum(self.requests.values())
+        if not requests:
+            return 0.0
+        return max(0, requests - sum(self.new_connections.values())) / requests
+
+    def snapshot(self) -> dict[str, Any]:
+        """Returns the metrics as a JSON compatible dict."""
+        return {
+            "requests": sum(self.requests.values()),
+            "new_connections": sum(self.new_connections.values()),
+            "reuse_ratio": round(self.reuse_ratio, 3),
+            "hosts": {
+                host: {"requests": self.requests[host], "new_connections": self.new_connections[host]}
+                for host in self.requests
+            },
+        }
+
+
+def create_subagent_httpx_client(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+    http2: bool = False,
+    metrics: ConnectionMetrics | None = None,
+    replica_router: ReplicaRouter | None = None,
+) -> httpx.AsyncClient:
+    """Creates the HTTP client shared by all subagents.
+
+    httpx pools connections per host, so a single client keeps warm
+    connections to every subagent. The caller owns the client and must close
+    it with `aclose()` on shutdown.
+
+    Args:
+        max_connections: The maximum number of open connections.
+        max_keepalive_connections: The maximum number of idle connections kept open.
+        keepalive_expiry: Seconds an idle connection is kept open.
+        http2: Whether to use HTTP/2 with subagents that support it. Requires `h2`.
+        metrics: Metrics to record connection reuse in.
+        replica_router: A router to spread requests over subagent replicas.
+
+    Returns:
+        The HTTP client.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    try:
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    except ImportError:
+        logger.warning("HTTP/2 requires the h2 package, using HTTP/1.1 for subagents")
+        transport = httpx.AsyncHTTPTransport(limits=limits)
+    if replica_router is not None:
+        replica_router.set_transport(transport)
+        transport = replica_router
+
+    httpx_client = httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(timeout=DEFAULT_TIMEOUT),
+        event_hooks={"request": [metrics.on_request]} if metrics else None,
+    )
+
+    logger.info(
+        f"Created subagent HTTP client with max_connections={max_connections}, "
+        f"max_keepalive_connections={max_keepalive_connections}, http2={http2}"
+    )
+    return httpx_client
@@ -13,7 +13,8 @@
 # limitations under the License.
 
 import logging
-from typing import Optional
+from collections import Counter, OrderedDict
+from typing import Any, Optional
 from google.adk.agents.invocation_context import new_invocation_context_id
 from google.adk.events.event import Event
 from google.adk.events.event_actions import EventActions
@@ -21,44 +22,168 @@ from google.adk.sessions.base_session_service import BaseSessionService
 from google.adk.sessions.session import Session
 from google.adk.sessions.state import State
 
+DEFAULT_MAX_ROUTES_PER_SESSION = 256
+DEFAULT_MAX_SESSIONS = 1024
+
+
+class SurfaceRoutingTable:
+  """The subagent that rendered each surface of a session, bounded by LRU."""
+
+  def __init__(self, max_routes: int = DEFAULT_MAX_ROUTES_PER_SESSION):
+    self._max_routes = max_routes
+    self._routes: OrderedDict[str, str] = OrderedDict()
+    self.evictions = 0
+
+  def get(self, surface_id: str) -> Optional[str]:
+    subagent_name = self._routes.get(surface_id)
+    if subagent_name is not None:
+      self._routes.move_to_end(surface_id)
+    return subagent_name
+
+  def set(self, surface_id: str, subagent_name: str):
+    self._routes[surface_id] = subagent_name
+    self._routes.move_to_end(surface_id)
+    while len(self._routes) > self._max_routes:
+      self._routes.popitem(last=False)
+      self.evictions += 1
+
+  def delete(self, surface_id: str) -> bool:
+    return self._routes.pop(surface_id, None) is not None
+
+  def snapshot(self) -> list[list[str]]:
+    """Returns the routes from least to most recently used."""
+    return [[surface_id, subagent_name] for surface_id, subagent_name in self._routes.items()]
+
+  @classmethod
+  def from_snapshot(
+      cls, snapshot: Any, max_routes: int = DEFAULT_MAX_ROUTES_PER_SESSION
+  ) -> "SurfaceRoutingTable":
+    table = cls(max_routes)
+    for surface_id, subagent_name in snapshot or []:
+      table.set(surface_id, subagent_name)
+    return table
+
+  def __len__(self) -> int:
+    return len(self._routes)
+
 
 class SubagentRouteManager:
-  """Manages routing of tasks to sub-agents."""
+  """Manages routing of tasks to sub-agents.
+
+  Routes live in an in-memory SurfaceRoutingTable per session. When
+  snapshotting is enabled, the whole table is also written to a single
+  session state key, and a session whose table is not in memory, e.g. after
+  a restart with a persistent session service, is hydrated from it.
+  """
+
+  ROUTING_TABLE_STATE_KEY = "subagent_routing_table"
+
+  max_routes_per_session = DEFAULT_MAX_ROUTES_PER_SESSION
+  max_sessions = DEFAULT_MAX_SESSIONS
+  snapshot_to_state = True
 
-  ROUTING_KEY_PREFIX = "route_to_subagent_name_for_surface_id_"
+  _tables: OrderedDict[str, SurfaceRoutingTable] = OrderedDict()
+  _metrics: Counter[str] = Counter()
 
   @classmethod
-  def _get_routing_key(cls, surface_id: str) -> str:
-    return cls.ROUTING_KEY_PREFIX + surface_id
+  def _get_table(cls, session_id: str, state: Optional[State | dict[str, Any]]) -> SurfaceRoutingTable:
+    table = cls._tables.get(session_id)
+    if table is not None:
+      cls._tables.move_to_end(session_id)
+      return table
+
+    snapshot = state.get(cls.ROUTING_TABLE_STATE_KEY) if state is not None and cls.snapshot_to_state else None
+    table = SurfaceRoutingTable.from_snapshot(snapshot, cls.max_routes_per_session)
+    if snapshot:
+      cls._metrics["hydrations"] += 1
+    cls._tables[session_id] = table
+    while len(cls._tables) > cls.max_sessions:
+      cls._tables.popitem(last=False)
+    return table
 
   @classmethod
   async def get_route_to_subagent_name(
-      cls, surface_id: str, state: State
+      cls, surface_id: str, session_id: str, state: Optional[State] = None
   ) -> Optional[str]:
-    """Gets the subagent route for the given tool call id."""
-    subagent_name = state.get(cls._get_routing_key(surface_id), None)
-    logging.info("Got subagent route for surface_id %s to subagent_name %s", surface_id, subagent_name)    
+    """Gets the subagent route for the given surface id."""
+    subagent_name = cls._get_table(session_id, state).get(surface_id)
+    cls._metrics["lookups"] += 1
+    cls._metrics["hits" if subagent_name else "misses"] += 1
+    logging.info("Got subagent route for surface_id %s to subagent_name %s", surface_id, subagent_name)
     return subagent_name
 
   @classmethod
-  async def set_route_to_subagent_name(
-      cls,
-      surface_id: str,
-      subagent_name: str,
-      session_service: BaseSessionService,
-      session: Session,
-  ):
-    """Sets the subagent route for the given tool call id."""
-    key = cls._get_routing_key(surface_id)    
-
-    if session.state.get(key) != subagent_name:
-      await session_service.append_event(
-          session,
-          Event(
-              invocation_id=new_invocation_context_id(),
-              author="system",
-              actions=EventActions(state_delta={key: subagent_name}),
-          ),
-      )
-
-      logging.info("Set subagent route for surface_id %s to subagent_name %s", surface_id, subagent_name)
\ No newline at end of file
+  def set_route_to_subagent_name(cls, surface_id: str, subagent_name: str, session: Session):
+    """Sets the subagent route for the given surface id in memory."""
+    cls._get_table(session.id, session.state).set(surface_id, subagent_name)
+    cls._metrics["routes_set"] += 1
+
+  @classmethod
+  def delete_route(cls, surface_id: str, session: Session):
+    """Removes the route of a deleted surface."""
+    if cls._get_table(session.id, session.state).delete(surface_id):
+      cls._metrics["routes_deleted"] += 1
+      logging.info("Deleted subagent route for surface_id %s", surface_id)
+
+  @classmethod
+  async def save_snapshot(cls, session_service: BaseSessionService, session: Session):
+    """Writes the session's routing table to session state as one state delta."""
+    if not cls.snapshot_to_state:
+      return
+    snapshot = cls._get_table(session.id, session.state).snapshot()
+    if session.state.get(cls.ROUTING_TABLE_STATE_KEY) == snapshot:
+      return
+
+    await session_service.append_event(
+        session,
+        Event(
+            invocation_id=new_invocation_context_id(),
+            author="system",
+            actions=EventActions(state_delta={cls.ROUTING_TABLE_STATE_KEY: snapshot}),
+        ),
+    )
+    cls._metrics["snapshots"] += 1
+    logging.info("Saved %d subagent routes for session %s", len(snapshot), session.id)
+
+  @classmethod
+  def get_metrics(cls) -> dict[str, int]:
+    """Returns route counts and lookup counters for all sessions."""
+    return {
+        **cls._metrics,
+        "sessions": len(cls._tables),
+        "routes": sum(len(table) for table in cls._tables.values()),
+        "evictions": sum(table.evictions for table in cls._tables.values()),
+    }
+
+
+class SubagentRouteWriter:
+  """Applies the surface routes of one task and persists them in one write."""
+
+  def __init__(self, session_service: BaseSessionService, session: Session):
+    self._session_service = session_service
+    self._session = session
+    self._dirty = False
+
+  def add(self, surface_id: str, subagent_name: str):
+    """Routes a surface to a subagent, effective immediately."""
+    SubagentRouteManager.set_route_to_subagent_name(surface_id, subagent_name, self._session)
+    self._dirty = True
+
+  def delete(self, surface_id: str):
+    """Removes the route of a deleted surface, effective immediately."""
+    SubagentRouteManager.delete_route(surface_id, self._session)
+    self._dirty = True
+
+  async def flush(self):
+    """Persists the routing table snapshot if it changed.
+
+    Failures are logged rather than raised: the in-memory routes are already
+    in effect, only their persistence failed.
+    """
+    if not self._dirty:
+      return
+    self._dirty = False
+    try:
+      await SubagentRouteManager.save_snapshot(self._session_service, self._session)
+    except Exception:
+      logging.exception("Failed to persist subagent routes for session %s", self._session.id)
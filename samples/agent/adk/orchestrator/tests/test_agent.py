@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from a2a.types import AgentCapabilities, AgentCard
+from a2ui.a2ui_extension import (
+    A2UI_EXTENSION_URI,
+    AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY,
+    INLINE_CATALOGS_HASH_KEY,
+    get_a2ui_agent_extension,
+)
+
+from agent import OrchestratorAgent
+from subagent_capability_filter import SubagentCapabilityFilter
+
+
+def create_card(name: str, url: str, accepts_inline_catalogs_hash: bool) -> AgentCard:
+  return AgentCard(
+      name=name,
+      description=f"The {name}.",
+      url=url,
+      version="1.0.0",
+      default_input_modes=["text"],
+      default_output_modes=["text"],
+      capabilities=AgentCapabilities(
+          extensions=[
+              get_a2ui_agent_extension(
+                  accepts_inline_catalogs=True,
+                  accepts_inline_catalogs_hash=accepts_inline_catalogs_hash,
+              )
+          ]
+      ),
+      skills=[],
+  )
+
+
+async def build_agent_card(cards: list[AgentCard]) -> AgentCard:
+  card_loader = MagicMock()
+  card_loader.load_agent_cards = AsyncMock(return_value=cards)
+  _, agent_card = await OrchestratorAgent.build_agent(
+      base_url="http://localhost:10002",
+      subagent_urls=[card.url for card in cards],
+      card_loader=card_loader,
+      httpx_client=MagicMock(),
+  )
+  [extension] = agent_card.capabilities.extensions
+  assert extension.uri == A2UI_EXTENSION_URI
+  return agent_card
+
+
+@pytest.mark.asyncio
+async def test_agent_card_accepts_inline_catalogs_hash_of_subagents():
+  agent_card = await build_agent_card([
+      create_card("Dashboard Agent", "http://localhost:10005", True),
+      create_card("Map Agent", "http://localhost:10006", True),
+  ])
+
+  params = agent_card.capabilities.extensions[0].params
+  assert params[AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY] is True
+
+
+@pytest.mark.asyncio
+async def test_agent_card_needs_all_subagents_to_accept_inline_catalogs_hash():
+  agent_card = await build_agent_card([
+      create_card("Dashboard Agent", "http://localhost:10005", True),
+      create_card("Map Agent", "http://localhost:10006", False),
+  ])
+
+  params = agent_card.capabilities.extensions[0].params
+  assert AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY not in params
+
+
+def test_inline_catalogs_hash_client_is_compatible():
+  cards = {
+      "Dashboard_Agent": create_card("Dashboard Agent", "http://localhost:10005", True),
+      "Map_Agent": create_card("Map Agent", "http://localhost:10006", False),
+  }
+  subagents = [MagicMock(spec=["name"]) for _ in cards]
+  for subagent, name in zip(subagents, cards):
+    subagent.name = name
+  capability_filter = SubagentCapabilityFilter(subagents, cards)
+
+  assert capability_filter.get_compatible_subagent_names(
+      {INLINE_CATALOGS_HASH_KEY: "abc"}
+  ) == {"Dashboard_Agent"}
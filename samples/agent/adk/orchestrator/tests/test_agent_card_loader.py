@@ -0,0 +1,68 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import time
+
+import httpx
+import pytest
+from a2a.types import AgentCapabilities, AgentCard
+
+from agent_card_loader import AgentCardLoader, CachedAgentCard
+
+UP_URL = "http://localhost:10004"
+DOWN_URL = "http://localhost:10005"
+
+
+def create_card(url: str) -> AgentCard:
+  return AgentCard(
+      name=f"Agent at {url}",
+      description="A subagent.",
+      url=url,
+      version="1.0.0",
+      default_input_modes=["text"],
+      default_output_modes=["text"],
+      capabilities=AgentCapabilities(),
+      skills=[],
+  )
+
+
+@pytest.mark.asyncio
+async def test_reports_subagent_missing_at_startup_once_available(monkeypatch, caplog):
+  available_urls = {UP_URL}
+  fetched_urls = []
+
+  async def fetch(httpx_client, url, cached):
+    fetched_urls.append(url)
+    if url not in available_urls:
+      raise httpx.ConnectError("Connection refused")
+    return CachedAgentCard(url=url, card=create_card(url), fetched_at=time.time())
+
+  card_loader = AgentCardLoader()
+  monkeypatch.setattr(card_loader, "_fetch", fetch)
+
+  cards = await card_loader.load_agent_cards([UP_URL, DOWN_URL])
+  assert [card.url for card in cards] == [UP_URL]
+  assert card_loader.missing_urls == {DOWN_URL}
+
+  # Without a cache, only the missing subagents are fetched again.
+  fetched_urls.clear()
+  await card_loader.refresh([UP_URL, DOWN_URL])
+  assert fetched_urls == [DOWN_URL]
+  assert card_loader.missing_urls == {DOWN_URL}
+
+  available_urls.add(DOWN_URL)
+  with caplog.at_level(logging.WARNING):
+    await card_loader.refresh([UP_URL, DOWN_URL])
+  assert card_loader.missing_urls == set()
+  assert "Restart the orchestrator" in caplog.text
@@ -0,0 +1,107 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from a2a.types import AgentCapabilities, AgentCard
+from a2ui.a2ui_extension import create_a2ui_part, get_a2ui_agent_extension, is_a2ui_part
+from google.adk.events.event import Event
+from google.genai import types as genai_types
+
+import part_converters
+from agent import OrchestratorAgent
+from agent_executor import OrchestratorAgentExecutor
+
+SUBAGENT_NAME = "Dashboard_Agent"
+TASK_ID = "task-1"
+
+DATA_MODEL_UPDATE = {"dataModelUpdate": {"surfaceId": "chart", "contents": [{"key": "value", "valueNumber": 1}]}}
+DELETE_SURFACE = {"deleteSurface": {"surfaceId": "chart"}}
+
+
+async def create_executor() -> OrchestratorAgentExecutor:
+  card = AgentCard(
+      name="Dashboard Agent",
+      description="Shows dashboards.",
+      url="http://localhost:10005",
+      version="1.0.0",
+      default_input_modes=["text"],
+      default_output_modes=["text"],
+      capabilities=AgentCapabilities(extensions=[get_a2ui_agent_extension()]),
+      skills=[],
+  )
+  card_loader = MagicMock()
+  card_loader.load_agent_cards = AsyncMock(return_value=[card])
+  agent, _ = await OrchestratorAgent.build_agent(
+      base_url="http://localhost:10002",
+      subagent_urls=[card.url],
+      card_loader=card_loader,
+      httpx_client=MagicMock(),
+  )
+  return OrchestratorAgentExecutor(agent)
+
+
+def create_subagent_event(a2ui_messages: list[dict], working: bool) -> Event:
+  """Creates an event like the ones RemoteA2aAgent yields for a subagent."""
+  parts = []
+  for a2ui_message in a2ui_messages:
+    part = part_converters.convert_a2a_part_to_genai_part(create_a2ui_part(a2ui_message))
+    part.thought = working
+    parts.append(part)
+  return Event(
+      author=SUBAGENT_NAME,
+      invocation_id="invocation-1",
+      content=genai_types.Content(role="model", parts=parts),
+  )
+
+
+def convert(executor: OrchestratorAgentExecutor, event: Event) -> list[dict]:
+  invocation_context = MagicMock()
+  invocation_context.app_name = "orchestrator_agent"
+  invocation_context.user_id = "user-1"
+  invocation_context.session.id = "session-1"
+  a2a_events = executor.convert_event_to_a2a_events_and_save_surface_id_to_subagent_name(
+      event, invocation_context, TASK_ID, "context-1", part_converters.convert_genai_part_to_a2a_part
+  )
+  return [
+      part.root.data
+      for a2a_event in a2a_events
+      for part in a2a_event.status.message.parts
+      if is_a2ui_part(part)
+  ]
+
+
+@pytest.mark.asyncio
+async def test_final_result_drops_streamed_a2ui_messages():
+  executor = await create_executor()
+
+  assert convert(executor, create_subagent_event([DATA_MODEL_UPDATE], working=True)) == [DATA_MODEL_UPDATE]
+
+  assert convert(executor, create_subagent_event([DATA_MODEL_UPDATE], working=False)) == []
+
+
+@pytest.mark.asyncio
+async def test_repeated_a2ui_messages_are_relayed():
+  executor = await create_executor()
+
+  # A message sent again in a later working update, e.g. a value set back.
+  assert convert(executor, create_subagent_event([DATA_MODEL_UPDATE], working=True)) == [DATA_MODEL_UPDATE]
+  assert convert(executor, create_subagent_event([DATA_MODEL_UPDATE], working=True)) == [DATA_MODEL_UPDATE]
+  assert convert(executor, create_subagent_event([DATA_MODEL_UPDATE], working=False)) == []
+
+  # The next call of the subagent sends the same messages again.
+  assert convert(executor, create_subagent_event([DELETE_SURFACE, DATA_MODEL_UPDATE], working=False)) == [
+      DELETE_SURFACE,
+      DATA_MODEL_UPDATE,
+  ]
@@ -0,0 +1,152 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+
+from intent_router import IntentRouter
+
+# The cards of the contact_lookup and rizzcharts samples.
+CONTACT_CARD = AgentCard(
+    name="Contact Lookup Agent",
+    description="This agent helps find contact info for people in your organization.",
+    url="http://localhost:10004",
+    version="1.0.0",
+    default_input_modes=["text"],
+    default_output_modes=["text"],
+    capabilities=AgentCapabilities(),
+    skills=[
+        AgentSkill(
+            id="find_contact",
+            name="Find Contact Tool",
+            description="Helps find contact information for colleagues (e.g., email, location, team).",
+            tags=["contact", "directory", "people", "finder"],
+            examples=["Who is David Chen in marketing?", "Find Sarah Lee from engineering"],
+        )
+    ],
+)
+DASHBOARD_CARD = AgentCard(
+    name="Ecommerce Dashboard Agent",
+    description="This agent visualizes ecommerce data, showing sales breakdowns, YOY revenue performance, and regional sales outliers.",
+    url="http://localhost:10005",
+    version="1.0.0",
+    default_input_modes=["text"],
+    default_output_modes=["text"],
+    capabilities=AgentCapabilities(),
+    skills=[
+        AgentSkill(
+            id="view_sales_by_category",
+            name="View Sales by Category",
+            description="Displays a pie chart of sales broken down by product category for a given time period.",
+            tags=["sales", "breakdown", "category", "pie chart", "revenue"],
+            examples=[
+                "show my sales breakdown by product category for q3",
+                "What's the sales breakdown for last month?",
+            ],
+        ),
+        AgentSkill(
+            id="view_regional_outliers",
+            name="View Regional Sales Outliers",
+            description="Displays a map showing regional sales outliers or store-level performance.",
+            tags=["sales", "regional", "outliers", "stores", "map", "performance"],
+            examples=[
+                "interesting. were there any outlier stores",
+                "show me a map of store performance",
+            ],
+        ),
+    ],
+)
+# The card of the restaurant_finder sample.
+RESTAURANT_CARD = AgentCard(
+    name="Restaurant Agent",
+    description="This agent helps find restaurants based on user criteria.",
+    url="http://localhost:10003",
+    version="1.0.0",
+    default_input_modes=["text"],
+    default_output_modes=["text"],
+    capabilities=AgentCapabilities(),
+    skills=[
+        AgentSkill(
+            id="find_restaurants",
+            name="Find Restaurants Tool",
+            description="Helps find restaurants based on user criteria (e.g., cuisine, location).",
+            tags=["restaurant", "finder"],
+            examples=["Find me the top 10 chinese restaurants in the US"],
+        )
+    ],
+)
+SUBAGENT_CARDS = {
+    "Contact_Lookup_Agent": CONTACT_CARD,
+    "Ecommerce_Dashboard_Agent": DASHBOARD_CARD,
+}
+ALL_SUBAGENT_CARDS = {
+    "Restaurant_Agent": RESTAURANT_CARD,
+    **SUBAGENT_CARDS,
+}
+
+MULTI_INTENT_QUERY = "show me sales charts and contact the regional manager"
+
+
+def test_routes_single_intent_request():
+  router = IntentRouter(SUBAGENT_CARDS, fan_out=True)
+
+  decision = router.route("show my sales breakdown by product category")
+
+  assert decision.agent_name == "Ecommerce_Dashboard_Agent"
+  assert decision.confident
+  assert not decision.multi_intent
+
+
+def test_leaves_multi_intent_request_to_llm_with_fan_out():
+  router = IntentRouter(SUBAGENT_CARDS, fan_out=True)
+
+  decision = router.route(MULTI_INTENT_QUERY)
+
+  assert decision.multi_intent
+  assert not decision.confident
+
+
+def test_routes_multi_intent_request_without_fan_out():
+  router = IntentRouter(SUBAGENT_CARDS, fan_out=False)
+
+  decision = router.route(MULTI_INTENT_QUERY)
+
+  assert decision.agent_name == "Ecommerce_Dashboard_Agent"
+  assert decision.confident
+
+
+@pytest.mark.parametrize(
+    "query, agent_name",
+    [
+        ("Find me chinese restaurants in NYC", "Restaurant_Agent"),
+        ("find contact info for Alex Jordan", "Contact_Lookup_Agent"),
+        ("show my sales breakdown by product category", "Ecommerce_Dashboard_Agent"),
+    ],
+)
+def test_routes_single_intent_requests_sharing_terms_with_other_cards(query, agent_name):
+  router = IntentRouter(ALL_SUBAGENT_CARDS, fan_out=True)
+
+  decision = router.route(query)
+
+  assert decision.agent_name == agent_name
+  assert decision.confident
+  assert not decision.multi_intent
+
+
+def test_leaves_multi_intent_request_to_llm_with_all_cards():
+  router = IntentRouter(ALL_SUBAGENT_CARDS, fan_out=True)
+
+  decision = router.route("find restaurants near me and show my sales breakdown")
+
+  assert decision.multi_intent
+  assert not decision.confident
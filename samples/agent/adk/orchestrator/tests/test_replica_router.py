@@ -0,0 +1,128 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Optional
+
+import httpx
+import pytest
+
+from replica_router import ReplicaRouter
+
+REPLICA_URLS = ["http://replica-a:10003", "http://replica-b:10003"]
+SURFACE_ID = "contact-card"
+
+
+def create_client(router: ReplicaRouter) -> tuple[httpx.AsyncClient, str, list[str]]:
+  """Returns a client of two replicas that each answer with a new task."""
+  hosts = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    hosts.append(request.url.host)
+    task_number = len(hosts)
+    return httpx.Response(200, json={
+        "jsonrpc": "2.0",
+        "result": {
+            "kind": "status-update",
+            "contextId": f"context-{task_number}",
+            "taskId": f"task-{task_number}",
+            "status": {"message": {"parts": [
+                {"kind": "data", "data": {"beginRendering": {"surfaceId": SURFACE_ID, "root": "root"}}}
+            ]}},
+        },
+    })
+
+  router.set_transport(httpx.MockTransport(handler))
+  canonical_url = router.add_group("Contact_Lookup_Agent", REPLICA_URLS)
+  return httpx.AsyncClient(transport=router), canonical_url, hosts
+
+
+def create_request(
+    context_id: Optional[str] = None, task_id: Optional[str] = None, surface_id: Optional[str] = None
+) -> dict:
+  message = {"role": "user", "parts": [{"kind": "text", "text": "hi"}]}
+  if context_id:
+    message["contextId"] = context_id
+  if task_id:
+    message["taskId"] = task_id
+  if surface_id:
+    message["parts"] = [{"kind": "data", "data": {"userAction": {"surfaceId": surface_id, "name": "call"}}}]
+  return {"jsonrpc": "2.0", "method": "message/send", "params": {"message": message}}
+
+
+@pytest.mark.asyncio
+async def test_balances_requests_over_idle_replicas():
+  client, url, hosts = create_client(ReplicaRouter())
+
+  async with client.stream("POST", url, json=create_request()) as response:
+    await response.aread()
+    await client.post(url, json=create_request())
+
+  assert hosts == ["replica-a", "replica-b"]
+
+
+@pytest.mark.asyncio
+async def test_pins_context_to_replica_that_served_it():
+  client, url, hosts = create_client(ReplicaRouter())
+
+  async with client.stream("POST", url, json=create_request()) as response:
+    await response.aread()
+    # replica-a is busy, so the new conversation goes to replica-b.
+    await client.post(url, json=create_request())
+  await client.post(url, json=create_request(context_id="context-2"))
+
+  assert hosts == ["replica-a", "replica-b", "replica-b"]
+
+
+@pytest.mark.asyncio
+async def test_surface_ids_do_not_pin_other_conversations():
+  client, url, hosts = create_client(ReplicaRouter())
+
+  async with client.stream("POST", url, json=create_request()) as response:
+    await response.aread()
+    # Another user's conversation has a surface with the same id.
+    await client.post(url, json=create_request(context_id="context-other", surface_id=SURFACE_ID))
+
+  assert hosts == ["replica-a", "replica-b"]
+
+
+@pytest.mark.asyncio
+async def test_pins_surface_of_task_without_context_id():
+  client, url, hosts = create_client(ReplicaRouter())
+
+  async with client.stream("POST", url, json=create_request()) as response:
+    await response.aread()
+    # replica-a is busy, but holds the surface of task-1.
+    await client.post(url, json=create_request(task_id="task-1", surface_id=SURFACE_ID))
+    await client.post(url, json=create_request(task_id="task-other", surface_id=SURFACE_ID))
+
+  assert hosts == ["replica-a", "replica-a", "replica-b"]
+
+
+@pytest.mark.asyncio
+async def test_ejects_failing_replica():
+  router = ReplicaRouter(failure_threshold=1)
+  hosts = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    hosts.append(request.url.host)
+    return httpx.Response(503 if request.url.host == "replica-a" else 200, json={})
+
+  router.set_transport(httpx.MockTransport(handler))
+  url = router.add_group("Contact_Lookup_Agent", REPLICA_URLS)
+  client = httpx.AsyncClient(transport=router)
+
+  await client.post(url, json=create_request())
+  await client.post(url, json=create_request())
+  await client.post(url, json=create_request())
+
+  assert hosts == ["replica-a", "replica-b", "replica-b"]
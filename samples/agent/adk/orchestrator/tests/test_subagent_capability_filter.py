@@ -0,0 +1,93 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from a2a.types import AgentCapabilities, AgentCard
+from a2ui.a2ui_extension import SUPPORTED_CATALOG_IDS_KEY, get_a2ui_agent_extension
+from google.adk.flows.llm_flows.agent_transfer import request_processor
+from google.adk.models.llm_request import LlmRequest
+
+from agent import OrchestratorAgent
+from fan_out_agent import FAN_OUT_AGENT_NAME
+from subagent_capability_filter import COMPATIBLE_SUBAGENT_NAMES_STATE_KEY, SubagentCapabilityFilter
+
+CHARTS_CATALOG_ID = "https://example.com/charts_catalog.json"
+MAPS_CATALOG_ID = "https://example.com/maps_catalog.json"
+
+
+def create_card(name: str, url: str, catalog_id: str) -> AgentCard:
+  return AgentCard(
+      name=name,
+      description=f"The {name}.",
+      url=url,
+      version="1.0.0",
+      default_input_modes=["text"],
+      default_output_modes=["text"],
+      capabilities=AgentCapabilities(
+          extensions=[get_a2ui_agent_extension(supported_catalog_ids=[catalog_id])]
+      ),
+      skills=[],
+  )
+
+
+async def build_llm_request(agent) -> LlmRequest:
+  """Builds a request with the transfer instructions and tool ADK adds."""
+  invocation_context = MagicMock()
+  invocation_context.agent = agent
+  llm_request = LlmRequest()
+  llm_request.append_instructions([agent.instruction])
+  async for _ in request_processor.run_async(invocation_context, llm_request):
+    pass
+  return llm_request
+
+
+@pytest.mark.asyncio
+async def test_hides_incompatible_subagents_from_routing_prompt():
+  card_loader = MagicMock()
+  card_loader.load_agent_cards = AsyncMock(return_value=[
+      create_card("Charts Agent", "http://localhost:10005", CHARTS_CATALOG_ID),
+      create_card("Maps Agent", "http://localhost:10006", MAPS_CATALOG_ID),
+  ])
+  agent, _ = await OrchestratorAgent.build_agent(
+      base_url="http://localhost:10002",
+      subagent_urls=["http://localhost:10005", "http://localhost:10006"],
+      card_loader=card_loader,
+      httpx_client=MagicMock(),
+  )
+  [capability_filter] = [
+      callback.__self__ for callback in agent.before_model_callback
+      if isinstance(getattr(callback, "__self__", None), SubagentCapabilityFilter)
+  ]
+  llm_request = await build_llm_request(agent)
+  callback_context = MagicMock()
+  callback_context._invocation_context.agent = agent
+  callback_context.state = {
+      "use_ui": True,
+      "client_capabilities": {SUPPORTED_CATALOG_IDS_KEY: [CHARTS_CATALOG_ID]},
+  }
+
+  capability_filter.before_model_callback(callback_context, llm_request)
+
+  assert callback_context.state[COMPATIBLE_SUBAGENT_NAMES_STATE_KEY] == ["Charts_Agent", FAN_OUT_AGENT_NAME]
+  system_instruction = llm_request.config.system_instruction
+  assert "Maps_Agent" not in system_instruction
+  assert f"`Charts_Agent`, `{FAN_OUT_AGENT_NAME}`." in system_instruction
+  [declaration] = [
+      declaration
+      for tool in llm_request.config.tools
+      for declaration in tool.function_declarations
+      if declaration.name == "transfer_to_agent"
+  ]
+  assert declaration.parameters.properties["agent_name"].enum == ["Charts_Agent", FAN_OUT_AGENT_NAME]
@@ -24,6 +24,7 @@ from a2ui.a2ui_extension import get_a2ui_agent_extension
 from agent import RestaurantAgent
 from agent_executor import RestaurantAgentExecutor
 from dotenv import load_dotenv
+from status_update_debouncer import DEFAULT_MIN_INTERVAL_MS
 from starlette.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 
@@ -40,7 +41,13 @@ class MissingAPIKeyError(Exception):
 @click.command()
 @click.option("--host", default="localhost")
 @click.option("--port", default=10002)
-def main(host, port):
+@click.option(
+    "--status_update_interval_ms",
+    default=DEFAULT_MIN_INTERVAL_MS,
+    type=int,
+    help="Minimum interval between intermediate status updates sent per task.",
+)
+def main(host, port, status_update_interval_ms):
     try:
         # Check for API key only if Vertex AI is not configured
         if not os.getenv("GOOGLE_GENAI_USE_VERTEXAI") == "TRUE":
@@ -74,7 +81,10 @@ def main(host, port):
             skills=[skill],
         )
 
-        agent_executor = RestaurantAgentExecutor(base_url=base_url)
+        agent_executor = RestaurantAgentExecutor(
+            base_url=base_url,
+            status_update_interval_ms=status_update_interval_ms,
+        )
 
         request_handler = DefaultRequestHandler(
             agent_executor=agent_executor,
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-RESTAURANT_UI_EXAMPLES = """
+SINGLE_COLUMN_LIST_EXAMPLE = """
 ---BEGIN SINGLE_COLUMN_LIST_EXAMPLE---
 [
   {{ "beginRendering": {{ "surfaceId": "default", "root": "root-column", "styles": {{ "primaryColor": "#FF0000", "font": "Roboto" }} }} }},
@@ -60,7 +60,9 @@ RESTAURANT_UI_EXAMPLES = """
   }} }}
 ]
 ---END SINGLE_COLUMN_LIST_EXAMPLE---
+"""
 
+TWO_COLUMN_LIST_EXAMPLE = """
 ---BEGIN TWO_COLUMN_LIST_EXAMPLE---
 [
   {{ "beginRendering": {{ "surfaceId": "default", "root": "root-column", "styles": {{ "primaryColor": "#FF0000", "font": "Roboto" }} }} }},
@@ -119,7 +121,9 @@ RESTAURANT_UI_EXAMPLES = """
   }} }}
 ]
 ---END TWO_COLUMN_LIST_EXAMPLE---
+"""
 
+BOOKING_FORM_EXAMPLE = """
 ---BEGIN BOOKING_FORM_EXAMPLE---
 [
   {{ "beginRendering": {{ "surfaceId": "booking-form", "root": "booking-form-column", "styles": {{ "primaryColor": "#FF0000", "font": "Roboto" }} }} }},
@@ -152,7 +156,9 @@ RESTAURANT_UI_EXAMPLES = """
   }} }}
 ]
 ---END BOOKING_FORM_EXAMPLE---
+"""
 
+CONFIRMATION_EXAMPLE = """
 ---BEGIN CONFIRMATION_EXAMPLE---
 [
   {{ "beginRendering": {{ "surfaceId": "confirmation", "root": "confirmation-card", "styles": {{ "primaryColor": "#FF0000", "font": "Roboto" }} }} }},
@@ -184,3 +190,13 @@ RESTAURANT_UI_EXAMPLES = """
 ]
 ---END CONFIRMATION_EXAMPLE---
 """
+
+# Keyed by template name, so a prompt can include only the template a turn needs.
+RESTAURANT_UI_EXAMPLES_BY_NAME = {
+    "SINGLE_COLUMN_LIST_EXAMPLE": SINGLE_COLUMN_LIST_EXAMPLE,
+    "TWO_COLUMN_LIST_EXAMPLE": TWO_COLUMN_LIST_EXAMPLE,
+    "BOOKING_FORM_EXAMPLE": BOOKING_FORM_EXAMPLE,
+    "CONFIRMATION_EXAMPLE": CONFIRMATION_EXAMPLE,
+}
+
+RESTAURANT_UI_EXAMPLES = "\n".join(RESTAURANT_UI_EXAMPLES_BY_NAME.values())
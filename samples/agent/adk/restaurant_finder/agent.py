@@ -16,10 +16,13 @@ import json
 import logging
 import os
 from collections.abc import AsyncIterable
-from typing import Any
+from typing import Any, Optional
 
 import jsonschema
+from a2ui.a2ui_logging_utils import LazyPayload, is_request_sampled
+from a2ui.a2ui_prompt_utils import get_litellm_context_caching_args
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.artifacts import InMemoryArtifactService
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.models.lite_llm import LiteLlm
@@ -28,9 +31,10 @@ from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from prompt_builder import (
     A2UI_SCHEMA,
-    RESTAURANT_UI_EXAMPLES,
+    build_ui_prompt,
     get_text_prompt,
-    get_ui_prompt,
+    get_ui_prompts_by_example,
+    select_ui_example_name,
 )
 from tools import get_restaurants
 
@@ -96,11 +100,14 @@ class RestaurantAgent:
         LITELLM_MODEL = os.getenv("LITELLM_MODEL", "gemini/gemini-2.5-flash")
 
         if use_ui:
-            # Construct the full prompt with UI instructions, examples, and schema
-            instruction = AGENT_INSTRUCTION + get_ui_prompt(
-                self.base_url, RESTAURANT_UI_EXAMPLES
-            )
-            
+            # Precompute the full prompt with UI instructions, schema, and one
+            # example template per variant. The instruction provider picks the
+            # variant needed for each turn; all variants share a cacheable prefix.
+            ui_prompt = build_ui_prompt(AGENT_INSTRUCTION)
+            logger.info(f"UI prompt prefix hash: {ui_prompt.prefix_hash}")
+            self._ui_instructions = get_ui_prompts_by_example(ui_prompt, self.base_url)
+            instruction = self._get_ui_instruction
+
             # Save UI instruction to file for inspection
             # try:
             #     with open("ui_instruction.txt", "w", encoding="utf-8") as f:
@@ -118,13 +125,41 @@ class RestaurantAgent:
             instruction = get_text_prompt()
 
         return LlmAgent(
-            model=LiteLlm(model=LITELLM_MODEL),
+            model=LiteLlm(model=LITELLM_MODEL, **get_litellm_context_caching_args()),
             name="restaurant_agent",
             description="An agent that finds restaurants and helps book tables.",
             instruction=instruction,
             tools=[get_restaurants],
         )
 
+    def _get_ui_instruction(self, readonly_context: ReadonlyContext) -> str:
+        """Returns the precomputed UI prompt embedding only the example this turn needs."""
+        user_content = readonly_context.user_content
+        query = (
+            "".join(p.text for p in user_content.parts if p.text)
+            if user_content and user_content.parts
+            else ""
+        )
+        example_name = select_ui_example_name(
+            query, self._get_restaurant_count(readonly_context)
+        )
+        logger.info(f"Using UI example {example_name} for this turn")
+        return self._ui_instructions[example_name]
+
+    @staticmethod
+    def _get_restaurant_count(readonly_context: ReadonlyContext) -> Optional[int]:
+        """Returns the number of restaurants `get_restaurants` returned in this turn, if it ran."""
+        for event in reversed(readonly_context.session.events):
+            if event.invocation_id != readonly_context.invocation_id:
+                break
+            for function_response in event.get_function_responses():
+                if function_response.name == get_restaurants.__name__:
+                    try:
+                        return len(json.loads(function_response.response["result"]))
+                    except (KeyError, TypeError, json.JSONDecodeError):
+                        return None
+        return None
+
     async def stream(self, query, session_id) -> AsyncIterable[dict[str, Any]]:
         session_state = {"base_url": self.base_url}
 
@@ -163,6 +198,9 @@ class RestaurantAgent:
             }
             return
 
+        # Per-event payloads are only logged for sampled sessions.
+        log_details = is_request_sampled(session_id)
+
         while attempt <= max_retries:
             attempt += 1
             logger.info(
@@ -180,7 +218,8 @@ class RestaurantAgent:
                 session_id=session.id,
                 new_message=current_message,
             ):
-                logger.info(f"Event from runner: {event}")
+                if log_details:
+                    logger.debug("Event from runner: %s", LazyPayload(event))
                 if event.is_final_response():
                     if (
                         event.content
@@ -192,7 +231,6 @@ class RestaurantAgent:
                         )
                     break  # Got the final response, stop consuming events
                 else:
-                    logger.info(f"Intermediate event: {event}")
                     # Yield intermediate updates on every attempt
                     yield {
                         "is_task_complete": False,
@@ -280,7 +318,7 @@ class RestaurantAgent:
                 logger.info(
                     f"--- RestaurantAgent.stream: Response is valid. Sending final response (Attempt {attempt}). ---"
                 )
-                logger.info(f"Final response: {final_response_content}")
+                logger.debug("Final response: %s", LazyPayload(final_response_content))
                 yield {
                     "is_task_complete": True,
                     "content": final_response_content,
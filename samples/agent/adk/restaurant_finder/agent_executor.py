@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
 
@@ -33,7 +34,9 @@ from a2a.utils import (
 )
 from a2a.utils.errors import ServerError
 from a2ui.a2ui_extension import create_a2ui_part, try_activate_a2ui_extension
+from a2ui.a2ui_logging_utils import LazyPayload, is_request_sampled
 from agent import RestaurantAgent
+from status_update_debouncer import DEFAULT_MIN_INTERVAL_MS, StatusUpdateDebouncer
 
 logger = logging.getLogger(__name__)
 
@@ -41,11 +44,20 @@ logger = logging.getLogger(__name__)
 class RestaurantAgentExecutor(AgentExecutor):
     """Restaurant AgentExecutor Example."""
 
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        status_update_interval_ms: int = DEFAULT_MIN_INTERVAL_MS,
+    ):
         # Instantiate two agents: one for UI and one for text-only.
         # The appropriate one will be chosen at execution time.
         self.ui_agent = RestaurantAgent(base_url=base_url, use_ui=True)
         self.text_agent = RestaurantAgent(base_url=base_url, use_ui=False)
+        # Runner events (thinking, tool calls, ...) each produce the same
+        # "working" update, so they are coalesced before reaching the queue.
+        self._status_debouncer = StatusUpdateDebouncer(
+            min_interval_ms=status_update_interval_ms
+        )
 
     async def execute(
         self,
@@ -83,14 +95,14 @@ class RestaurantAgentExecutor(AgentExecutor):
                         logger.info(f"  Part {i}: Found a2ui UI ClientEvent payload.")
                         ui_event_part = part.root.data["userAction"]
                     else:
-                        logger.info(f"  Part {i}: DataPart (data: {part.root.data})")
+                        logger.debug("  Part %d: DataPart (data: %s)", i, LazyPayload(part.root.data))
                 elif isinstance(part.root, TextPart):
-                    logger.info(f"  Part {i}: TextPart (text: {part.root.text})")
+                    logger.debug("  Part %d: TextPart (text: %s)", i, LazyPayload(part.root.text))
                 else:
                     logger.info(f"  Part {i}: Unknown part type ({type(part.root)})")
 
         if ui_event_part:
-            logger.info(f"Received a2ui ClientEvent: {ui_event_part}")
+            logger.debug("Received a2ui ClientEvent: %s", LazyPayload(ui_event_part))
             action = ui_event_part.get("actionName")
             ctx = ui_event_part.get("context", {})
 
@@ -123,73 +135,124 @@ class RestaurantAgentExecutor(AgentExecutor):
             await event_queue.enqueue_event(task)
         updater = TaskUpdater(event_queue, task.id, task.context_id)
 
-        async for item in agent.stream(query, task.context_id):
-            is_task_complete = item["is_task_complete"]
-            if not is_task_complete:
-                await updater.update_status(
-                    TaskState.working,
-                    new_agent_text_message(item["updates"], task.context_id, task.id),
-                )
-                continue
-
-            final_state = (
-                TaskState.completed
-                if action == "submit_booking"
-                else TaskState.input_required
-            )
+        try:
+            await self._stream_to_updater(agent, query, action, task, updater)
+        finally:
+            self._status_debouncer.finish(task.id)
 
-            content = item["content"]
-            final_parts = []
-            if "---a2ui_JSON---" in content:
-                logger.info("Splitting final response into text and UI parts.")
-                text_content, json_string = content.split("---a2ui_JSON---", 1)
+    async def _stream_to_updater(
+        self,
+        agent: RestaurantAgent,
+        query: str,
+        action: str | None,
+        task: Task,
+        updater: TaskUpdater,
+    ) -> None:
+        flush_task: asyncio.Task | None = None
+        try:
+            async for item in agent.stream(query, task.context_id):
+                is_task_complete = item["is_task_complete"]
+                if not is_task_complete:
+                    if self._status_debouncer.should_send(task.id, item["updates"]):
+                        await self._send_working_update(updater, task, item["updates"])
+                    elif (flush_task is None or flush_task.done()) and (
+                        delay := self._status_debouncer.get_pending_delay_s(task.id)
+                    ) is not None:
+                        flush_task = asyncio.create_task(
+                            self._send_pending_update(updater, task, delay)
+                        )
+                    continue
 
-                if text_content.strip():
-                    final_parts.append(Part(root=TextPart(text=text_content.strip())))
+                if flush_task:
+                    flush_task.cancel()
+                if pending_text := self._status_debouncer.take_pending(task.id, force=True):
+                    await self._send_working_update(updater, task, pending_text)
+                await self._send_final_update(item["content"], action, task, updater)
+                break
+        finally:
+            if flush_task:
+                flush_task.cancel()
 
-                if json_string.strip():
-                    try:
-                        json_string_cleaned = (
-                            json_string.strip().lstrip("```json").rstrip("```").strip()
+    async def _send_working_update(
+        self, updater: TaskUpdater, task: Task, text: str
+    ) -> None:
+        await updater.update_status(
+            TaskState.working,
+            new_agent_text_message(text, task.context_id, task.id),
+        )
+
+    async def _send_pending_update(
+        self, updater: TaskUpdater, task: Task, delay: float
+    ) -> None:
+        """Sends the latest suppressed update once the interval has passed."""
+        await asyncio.sleep(delay)
+        if pending_text := self._status_debouncer.take_pending(task.id):
+            await self._send_working_update(updater, task, pending_text)
+
+    async def _send_final_update(
+        self,
+        content: str,
+        action: str | None,
+        task: Task,
+        updater: TaskUpdater,
+    ) -> None:
+        final_state = (
+            TaskState.completed
+            if action == "submit_booking"
+            else TaskState.input_required
+        )
+
+        final_parts = []
+        if "---a2ui_JSON---" in content:
+            logger.info("Splitting final response into text and UI parts.")
+            text_content, json_string = content.split("---a2ui_JSON---", 1)
+
+            if text_content.strip():
+                final_parts.append(Part(root=TextPart(text=text_content.strip())))
+
+            if json_string.strip():
+                try:
+                    json_string_cleaned = (
+                        json_string.strip().lstrip("```json").rstrip("```").strip()
+                    )
+                    # The new protocol sends a stream of JSON objects.
+                    # For this example, we'll assume they are sent as a list in the final response.
+                    json_data = json.loads(json_string_cleaned)
+
+                    if isinstance(json_data, list):
+                        logger.info(
+                            f"Found {len(json_data)} messages. Creating individual DataParts."
                         )
-                        # The new protocol sends a stream of JSON objects.
-                        # For this example, we'll assume they are sent as a list in the final response.
-                        json_data = json.loads(json_string_cleaned)
-
-                        if isinstance(json_data, list):
-                            logger.info(
-                                f"Found {len(json_data)} messages. Creating individual DataParts."
-                            )
-                            for message in json_data:
-                                final_parts.append(create_a2ui_part(message))
-                        else:
-                            # Handle the case where a single JSON object is returned
-                            logger.info(
-                                "Received a single JSON object. Creating a DataPart."
-                            )
-                            final_parts.append(create_a2ui_part(json_data))
-
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse UI JSON: {e}")
-                        final_parts.append(Part(root=TextPart(text=json_string)))
-            else:
-                final_parts.append(Part(root=TextPart(text=content.strip())))
+                        for message in json_data:
+                            final_parts.append(create_a2ui_part(message))
+                    else:
+                        # Handle the case where a single JSON object is returned
+                        logger.info(
+                            "Received a single JSON object. Creating a DataPart."
+                        )
+                        final_parts.append(create_a2ui_part(json_data))
+
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse UI JSON: {e}")
+                    final_parts.append(Part(root=TextPart(text=json_string)))
+        else:
+            final_parts.append(Part(root=TextPart(text=content.strip())))
 
-            logger.info("--- FINAL PARTS TO BE SENT ---")
+        if logger.isEnabledFor(logging.DEBUG) and is_request_sampled(task.id):
+            logger.debug("--- FINAL PARTS TO BE SENT ---")
             for i, part in enumerate(final_parts):
-                logger.info(f"  - Part {i}: Type = {type(part.root)}")
+                logger.debug("  - Part %d: Type = %s", i, type(part.root))
                 if isinstance(part.root, TextPart):
-                    logger.info(f"    - Text: {part.root.text[:200]}...")
+                    logger.debug("    - Text: %s", LazyPayload(part.root.text))
                 elif isinstance(part.root, DataPart):
-                    logger.info(f"    - Data: {str(part.root.data)[:200]}...")
-            logger.info("-----------------------------")
+                    logger.debug("    - Data: %s", LazyPayload(part.root.data))
+            logger.debug("-----------------------------")
 
-            await updater.update_status(
-                final_state,
-                new_agent_parts_message(final_parts, task.context_id, task.id),
-                final=(final_state == TaskState.completed),
-            )
-            break
+        await updater.update_status(
+            final_state,
+            new_agent_parts_message(final_parts, task.context_id, task.id),
+            final=(final_state == TaskState.completed),
+        )
 
     async def cancel(
         self, request: RequestContext, event_queue: EventQueue
@@ -12,6 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+from typing import Optional
+
+from a2ui.a2ui_prompt_utils import StablePrefixPrompt
+
 # The A2UI schema remains constant for all A2UI responses.
 A2UI_SCHEMA = r'''
 {
@@ -785,24 +790,52 @@ A2UI_SCHEMA = r'''
 }
 '''
 
-from a2ui_examples import RESTAURANT_UI_EXAMPLES
+# Whitespace-free copy of the schema for prompts. It is less than half the size
+# of the indented literal above and carries the same information for the LLM.
+COMPACT_A2UI_SCHEMA = json.dumps(json.loads(A2UI_SCHEMA), separators=(",", ":"))
 
+from a2ui_examples import RESTAURANT_UI_EXAMPLES, RESTAURANT_UI_EXAMPLES_BY_NAME
 
-def get_ui_prompt(base_url: str, examples: str) -> str:
+# Queries built by the agent executor for UI actions (see agent_executor.py).
+BOOKING_QUERY_PREFIX = "USER_WANTS_TO_BOOK"
+BOOKING_SUBMISSION_QUERY_PREFIX = "User submitted a booking"
+
+# The default `count` of the `get_restaurants` tool.
+DEFAULT_RESTAURANT_COUNT = 5
+MAX_SINGLE_COLUMN_RESTAURANTS = 5
+
+
+def select_ui_example_name(query: str, restaurant_count: Optional[int] = None) -> str:
     """
-    Constructs the full prompt with UI instructions, rules, examples, and schema.
+    Picks the single UI example template needed to answer a turn.
 
     Args:
-        base_url: The base URL for resolving static assets like logos.
-        examples: A string containing the specific UI examples for the agent's task.
+        query: The user query (or action query) that started the turn.
+        restaurant_count: The number of restaurants returned by the
+            `get_restaurants` tool in this turn, if it has been called.
 
     Returns:
-        A formatted string to be used as the system prompt for the LLM.
+        The name of the template in `RESTAURANT_UI_EXAMPLES_BY_NAME`.
     """
-    # The f-string substitution for base_url happens here, at runtime.
-    formatted_examples = examples.format(base_url=base_url)
+    # Retry queries embed the original query, so match anywhere in the text.
+    if BOOKING_QUERY_PREFIX in query:
+        return "BOOKING_FORM_EXAMPLE"
+    if BOOKING_SUBMISSION_QUERY_PREFIX in query:
+        return "CONFIRMATION_EXAMPLE"
+
+    if restaurant_count is None:
+        # The tool has not run yet, so estimate from the requested count
+        # (e.g. "top 10 chinese places").
+        restaurant_count = next(
+            (int(word) for word in query.split() if word.isdigit()),
+            DEFAULT_RESTAURANT_COUNT,
+        )
+    if restaurant_count <= MAX_SINGLE_COLUMN_RESTAURANTS:
+        return "SINGLE_COLUMN_LIST_EXAMPLE"
+    return "TWO_COLUMN_LIST_EXAMPLE"
+
 
-    return f"""
+UI_PROMPT_RULES = """
     You are a helpful restaurant finding assistant. Your final output MUST be a a2ui UI JSON response.
 
     To generate the response, you MUST follow these rules:
@@ -813,19 +846,72 @@ def get_ui_prompt(base_url: str, examples: str) -> str:
 
     --- UI TEMPLATE RULES ---
     -   If the query is for a list of restaurants, use the restaurant data you have already received from the `get_restaurants` tool to populate the `dataModelUpdate.contents` array (e.g., as a `valueMap` for the "items" key).
-    -   If the number of restaurants is 5 or fewer, you MUST use the `SINGLE_COLUMN_LIST_EXAMPLE` template.
-    -   If the number of restaurants is more than 5, you MUST use the `TWO_COLUMN_LIST_EXAMPLE` template.
-    -   If the query is to book a restaurant (e.g., "USER_WANTS_TO_BOOK..."), you MUST use the `BOOKING_FORM_EXAMPLE` template.
-    -   If the query is a booking submission (e.g., "User submitted a booking..."), you MUST use the `CONFIRMATION_EXAMPLE` template.
-
-    {formatted_examples}
+    -   You MUST use the template below, provided after the A2UI JSON SCHEMA. It was chosen for this query.
+    """
 
+A2UI_SCHEMA_SECTION = f"""
     ---BEGIN A2UI JSON SCHEMA---
-    {A2UI_SCHEMA}
+    {COMPACT_A2UI_SCHEMA}
     ---END A2UI JSON SCHEMA---
     """
 
 
+def build_ui_prompt(agent_instruction: str = "") -> StablePrefixPrompt:
+    """
+    Builds the cacheable part of the UI prompt.
+
+    The agent instruction, rules and schema never change, so they form the
+    stable prefix. Examples are rendered after it, see `get_ui_prompt`.
+
+    Args:
+        agent_instruction: Optional agent instruction to place first in the prompt.
+
+    Returns:
+        A StablePrefixPrompt whose prefix is shared by every UI prompt variant.
+    """
+    return StablePrefixPrompt(
+        static_sections=[agent_instruction, UI_PROMPT_RULES, A2UI_SCHEMA_SECTION]
+    )
+
+
+def get_ui_prompt(base_url: str, examples: str) -> str:
+    """
+    Constructs the full prompt with UI instructions, rules, schema, and examples.
+
+    Args:
+        base_url: The base URL for resolving static assets like logos.
+        examples: A string containing the specific UI examples for the agent's task.
+
+    Returns:
+        A formatted string to be used as the system prompt for the LLM.
+    """
+    # The f-string substitution for base_url happens here, at runtime.
+    return build_ui_prompt().render([examples.format(base_url=base_url)])
+
+
+def get_ui_prompts_by_example(
+    ui_prompt: StablePrefixPrompt, base_url: str
+) -> dict[str, str]:
+    """
+    Precomputes one UI prompt per example template for the given base URL.
+
+    Each prompt only embeds the template it is keyed by, so a turn that needs
+    a single template does not pay for the other ones. All variants share the
+    prefix of `ui_prompt`.
+
+    Args:
+        ui_prompt: The stable prefix built by `build_ui_prompt`.
+        base_url: The base URL for resolving static assets like logos.
+
+    Returns:
+        A dict of template name to the prompt embedding only that template.
+    """
+    return {
+        name: ui_prompt.render([example.format(base_url=base_url)])
+        for name, example in RESTAURANT_UI_EXAMPLES_BY_NAME.items()
+    }
+
+
 def get_text_prompt() -> str:
     """
     Constructs the prompt for a text-only agent.
@@ -0,0 +1,135 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_INTERVAL_MS = 1000
+
+
+@dataclass
+class _TaskStatusState:
+    last_text: str
+    last_sent_at: float
+    suppressed_count: int = 0
+    # The latest update that was suppressed by the rate limit only, sent once
+    # the interval has passed so that the client sees the latest progress.
+    pending_text: Optional[str] = None
+
+
+class StatusUpdateDebouncer:
+    """Coalesces intermediate `working` status updates per task.
+
+    An update is only sent if its text differs from the last update sent for
+    the same task and at least `min_interval_ms` has passed since then. The
+    first update for a task is always sent so the client gets a progress
+    signal right away. The latest changed update suppressed by the interval is
+    kept, and `take_pending` returns it once the interval has passed or the
+    task is about to finish.
+    """
+
+    def __init__(self, min_interval_ms: int = DEFAULT_MIN_INTERVAL_MS):
+        self._min_interval_s = min_interval_ms / 1000
+        self._tasks: dict[str, _TaskStatusState] = {}
+
+    def should_send(self, task_id: str, text: str) -> bool:
+        """Returns True if an intermediate update should be sent for the task.
+
+        Args:
+            task_id: The id of the task the update belongs to.
+            text: The text of the status update.
+
+        Returns:
+            True if the update should be enqueued, False if it is suppressed.
+        """
+        now = time.monotonic()
+        state = self._tasks.get(task_id)
+        if state is None:
+            self._tasks[task_id] = _TaskStatusState(last_text=text, last_sent_at=now)
+            return True
+
+        if text == state.last_text:
+            # The client already shows the latest progress.
+            state.pending_text = None
+            state.suppressed_count += 1
+            return False
+        if now - state.last_sent_at < self._min_interval_s:
+            state.pending_text = text
+            state.suppressed_count += 1
+            return False
+
+        self._mark_sent(state, text, now)
+        return True
+
+    def get_pending_delay_s(self, task_id: str) -> Optional[float]:
+        """Returns the seconds until the task's suppressed update is due.
+
+        Args:
+            task_id: The id of the task.
+
+        Returns:
+            The seconds to wait, or None if no update is pending.
+        """
+        state = self._tasks.get(task_id)
+        if state is None or state.pending_text is None:
+            return None
+        return max(0.0, state.last_sent_at + self._min_interval_s - time.monotonic())
+
+    def take_pending(self, task_id: str, force: bool = False) -> Optional[str]:
+        """Returns the task's latest suppressed update if it is due.
+
+        The returned update counts as sent.
+
+        Args:
+            task_id: The id of the task.
+            force: Whether to return the update before the interval has
+              passed, e.g. right before the task's final update.
+
+        Returns:
+            The text of the update to send, or None if there is none.
+        """
+        state = self._tasks.get(task_id)
+        if state is None or state.pending_text is None:
+            return None
+        now = time.monotonic()
+        if not force and now - state.last_sent_at < self._min_interval_s:
+            return None
+
+        text = state.pending_text
+        state.suppressed_count -= 1
+        self._mark_sent(state, text, now)
+        return text
+
+    @staticmethod
+    def _mark_sent(state: _TaskStatusState, text: str, now: float) -> None:
+        state.last_text = text
+        state.last_sent_at = now
+        state.pending_text = None
+
+    def finish(self, task_id: str) -> None:
+        """Releases the state kept for a task once it reaches a final update.
+
+        Args:
+            task_id: The id of the finished task.
+        """
+        if (state := self._tasks.pop(task_id, None)) and state.suppressed_count:
+            logger.info(
+                "Suppressed %d intermediate status updates for task %s",
+                state.suppressed_count,
+                task_id,
+            )
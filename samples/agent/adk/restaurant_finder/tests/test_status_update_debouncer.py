@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from a2a.types import Task, TaskState, TaskStatus
+
+import status_update_debouncer
+from agent_executor import RestaurantAgentExecutor
+from status_update_debouncer import StatusUpdateDebouncer
+
+TASK_ID = "task-1"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+  now = [100.0]
+  monkeypatch.setattr(status_update_debouncer.time, "monotonic", lambda: now[0])
+  return now
+
+
+def test_sends_first_update_and_drops_duplicates(clock):
+  debouncer = StatusUpdateDebouncer(min_interval_ms=1000)
+
+  assert debouncer.should_send(TASK_ID, "Finding restaurants...")
+  clock[0] += 5
+  assert not debouncer.should_send(TASK_ID, "Finding restaurants...")
+  assert debouncer.take_pending(TASK_ID, force=True) is None
+
+
+def test_rate_limits_changed_updates(clock):
+  debouncer = StatusUpdateDebouncer(min_interval_ms=1000)
+
+  assert debouncer.should_send(TASK_ID, "Finding restaurants...")
+  clock[0] += 0.5
+  assert not debouncer.should_send(TASK_ID, "Ranking restaurants...")
+  clock[0] += 0.6
+  assert debouncer.should_send(TASK_ID, "Building the UI...")
+  assert debouncer.take_pending(TASK_ID, force=True) is None
+
+
+def test_keeps_latest_suppressed_update_until_due(clock):
+  debouncer = StatusUpdateDebouncer(min_interval_ms=1000)
+
+  debouncer.should_send(TASK_ID, "Finding restaurants...")
+  clock[0] += 0.2
+  debouncer.should_send(TASK_ID, "Ranking restaurants...")
+  clock[0] += 0.2
+  debouncer.should_send(TASK_ID, "Building the UI...")
+
+  assert debouncer.get_pending_delay_s(TASK_ID) == pytest.approx(0.6)
+  assert debouncer.take_pending(TASK_ID) is None
+  clock[0] += 0.6
+  assert debouncer.take_pending(TASK_ID) == "Building the UI..."
+  assert debouncer.take_pending(TASK_ID, force=True) is None
+  # The flushed update counts as sent.
+  assert not debouncer.should_send(TASK_ID, "Building the UI...")
+
+
+def test_finish_releases_task_state(clock):
+  debouncer = StatusUpdateDebouncer(min_interval_ms=1000)
+
+  debouncer.should_send(TASK_ID, "Finding restaurants...")
+  debouncer.should_send(TASK_ID, "Ranking restaurants...")
+  debouncer.finish(TASK_ID)
+
+  assert debouncer.take_pending(TASK_ID, force=True) is None
+  # A finished task starts over with an immediate update.
+  assert debouncer.should_send(TASK_ID, "Ranking restaurants...")
+
+
+@pytest.mark.asyncio
+async def test_executor_flushes_suppressed_update_before_final_update():
+  async def stream(query, session_id):
+    yield {"is_task_complete": False, "updates": "Finding restaurants..."}
+    yield {"is_task_complete": False, "updates": "Ranking restaurants..."}
+    yield {"is_task_complete": True, "content": "Here are the restaurants."}
+
+  agent = MagicMock()
+  agent.stream = stream
+  updater = MagicMock()
+  updater.update_status = AsyncMock()
+  task = Task(id=TASK_ID, context_id="context-1", status=TaskStatus(state=TaskState.submitted))
+  executor = RestaurantAgentExecutor(
+      base_url="http://localhost:10003", status_update_interval_ms=60_000
+  )
+
+  await executor._stream_to_updater(agent, "chinese food", None, task, updater)
+
+  sent = [
+      (call.args[0], call.args[1].parts[0].root.text)
+      for call in updater.update_status.call_args_list
+  ]
+  assert sent == [
+      (TaskState.working, "Finding restaurants..."),
+      (TaskState.working, "Ranking restaurants..."),
+      (TaskState.input_required, "Here are the restaurants."),
+  ]
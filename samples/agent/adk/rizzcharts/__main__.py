@@ -21,7 +21,8 @@ import click
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore
-from agent_executor import RizzchartsAgentExecutor, get_a2ui_enabled, get_a2ui_schema
+from a2ui.a2ui_prompt_utils import get_litellm_context_caching_args
+from agent_executor import RizzchartsAgentExecutor, get_a2ui_enabled, get_a2ui_schema, get_a2ui_validator
 from agent import RizzchartsAgent
 from google.adk.artifacts import InMemoryArtifactService
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
@@ -29,7 +30,9 @@ from google.adk.models.lite_llm import LiteLlm
 from google.adk.runners import Runner
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
 from dotenv import load_dotenv
+from downsampling import DEFAULT_MAX_CHART_POINTS, MIN_CHART_POINTS
 from starlette.middleware.cors import CORSMiddleware
+from tools import get_sales_data_store, get_store_performance_index
 
 load_dotenv()
 
@@ -44,7 +47,13 @@ class MissingAPIKeyError(Exception):
 @click.command()
 @click.option("--host", default="localhost")
 @click.option("--port", default=10002)
-def main(host, port):
+@click.option(
+    "--max_chart_points",
+    default=DEFAULT_MAX_CHART_POINTS,
+    type=click.IntRange(min=MIN_CHART_POINTS),
+    help="Maximum number of points per chart series sent to the model.",
+)
+def main(host, port, max_chart_points):
     try:
         # Check for API key only if Vertex AI is not configured
         if not os.getenv("GOOGLE_GENAI_USE_VERTEXAI") == "TRUE":
@@ -55,9 +64,11 @@ def main(host, port):
 
         lite_llm_model = os.getenv("LITELLM_MODEL", "gemini/gemini-2.5-flash")
         agent = RizzchartsAgent(
-            model=LiteLlm(model=lite_llm_model),
+            model=LiteLlm(model=lite_llm_model, **get_litellm_context_caching_args()),
             a2ui_enabled_provider=get_a2ui_enabled,
             a2ui_schema_provider=get_a2ui_schema,
+            a2ui_validator_provider=get_a2ui_validator,
+            max_chart_points=max_chart_points,
         )
         runner = Runner(
             app_name=agent.name,
@@ -84,6 +95,11 @@ def main(host, port):
 
         logger.info(f"Loaded schema from {spec_root}")
 
+        # Build the sales rollups and store index before serving, so the first
+        # query is fast.
+        get_sales_data_store()
+        get_store_performance_index()
+
         base_url = f"http://{host}:{port}"
         agent_executor = RizzchartsAgentExecutor(
             base_url=base_url,
@@ -0,0 +1,221 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import jsonschema
+from a2ui.a2ui_schema_utils import create_a2ui_validator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Process-wide registry of the entries held by any A2uiSchemaCache, keyed by
+# fingerprint. Sessions only store the fingerprint and resolve it here, so a
+# schema and its validator live exactly as long as a cache keeps them.
+_schema_registry: "weakref.WeakValueDictionary[str, A2uiSchemaCacheEntry]" = weakref.WeakValueDictionary()
+
+
+def _read_only(*args, **kwargs):
+    raise TypeError("Cached A2UI schemas are read-only")
+
+
+class FrozenDict(dict):
+    """A dict that cannot be modified and is shared instead of copied."""
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """A list that cannot be modified and is shared instead of copied."""
+
+    __setitem__ = __delitem__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively converts dicts and lists into their read-only counterparts.
+
+    Args:
+        value: A JSON compatible value.
+
+    Returns:
+        The same value made of FrozenDict and FrozenList containers.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class A2uiSchemaCacheEntry:
+    """A merged A2UI schema shared by every session that uses the same catalog."""
+
+    key: str
+    schema: FrozenDict
+    fingerprint: str
+    size_bytes: int
+    validator: jsonschema.protocols.Validator
+
+    @classmethod
+    def create(
+        cls, key: str, schema: dict[str, Any], fingerprint: str, size_bytes: int
+    ) -> "A2uiSchemaCacheEntry":
+        """Freezes the schema and compiles a validator for A2UI message lists.
+
+        Args:
+            key: The cache key of the entry.
+            schema: The merged A2UI schema.
+            fingerprint: The fingerprint of the merged schema.
+            size_bytes: The size of the serialized schema.
+
+        Returns:
+            The cache entry.
+        """
+        frozen_schema = freeze(schema)
+        return cls(
+            key=key,
+            schema=frozen_schema,
+            fingerprint=fingerprint,
+            size_bytes=size_bytes,
+            validator=create_a2ui_validator(frozen_schema),
+        )
+
+
+class A2uiSchemaCache:
+    """An LRU cache of merged A2UI schemas bounded by entry count and size."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, A2uiSchemaCacheEntry] = OrderedDict()
+        self._total_bytes = 0
+
+    def get(self, key: str) -> Optional[A2uiSchemaCacheEntry]:
+        """Returns the entry for the key, marking it as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The cache entry or None if not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, entry: A2uiSchemaCacheEntry) -> None:
+        """Adds an entry and evicts the least recently used ones over the limits.
+
+        Entries larger than the byte limit are not cached.
+
+        Args:
+            entry: The entry to add.
+        """
+        if entry.size_bytes > self._max_bytes:
+            logger.warning(
+                f"A2UI schema {entry.key} is {entry.size_bytes} bytes, larger than the cache limit of {self._max_bytes} bytes"
+            )
+            return
+
+        if (previous := self._entries.pop(entry.key, None)) is not None:
+            self._total_bytes -= previous.size_bytes
+        self._entries[entry.key] = entry
+        self._total_bytes += entry.size_bytes
+        register_schema(entry)
+
+        while len(self._entries) > self._max_entries or self._total_bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.size_bytes
+            logger.info(f"Evicted A2UI schema {evicted.key} from cache")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """The combined size of all cached schemas."""
+        return self._total_bytes
+
+
+def register_schema(entry: A2uiSchemaCacheEntry) -> None:
+    """Makes the entry resolvable by its schema fingerprint.
+
+    Args:
+        entry: The cache entry to register.
+    """
+    _schema_registry[entry.fingerprint] = entry
+
+
+def resolve_schema_entry(fingerprint: Optional[str]) -> Optional[A2uiSchemaCacheEntry]:
+    """Returns the registered entry with the given schema fingerprint.
+
+    Args:
+        fingerprint: The fingerprint stored in the session state.
+
+    Returns:
+        The entry or None if no cache holds it anymore.
+    """
+    if not fingerprint:
+        return None
+    entry = _schema_registry.get(fingerprint)
+    if entry is None:
+        logger.warning(f"A2UI schema with fingerprint {fingerprint} is not registered")
+    return entry
+
+
+def resolve_schema(fingerprint: Optional[str]) -> Optional[FrozenDict]:
+    """Returns the registered schema with the given fingerprint.
+
+    Args:
+        fingerprint: The fingerprint stored in the session state.
+
+    Returns:
+        The schema or None if no cache holds it anymore.
+    """
+    entry = resolve_schema_entry(fingerprint)
+    return entry.schema if entry is not None else None
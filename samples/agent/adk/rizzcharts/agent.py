@@ -12,15 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import json
 import logging
 from pathlib import Path
 import pkgutil
-from typing import Any, ClassVar
+from typing import Any, ClassVar, Optional
 
 from a2ui.a2ui_extension import STANDARD_CATALOG_ID
-from a2ui.a2ui_schema_utils import wrap_as_json_array
-from a2ui.send_a2ui_to_client_toolset import SendA2uiToClientToolset, A2uiEnabledProvider, A2uiSchemaProvider
+from a2ui.a2ui_prompt_utils import StablePrefixPrompt
+from a2ui.a2ui_schema_utils import create_a2ui_validator, get_schema_fingerprint, wrap_as_json_array
+from a2ui.send_a2ui_to_client_toolset import SendA2uiToClientToolset, A2uiEnabledProvider, A2uiSchemaProvider, A2uiValidatorProvider
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.planners.built_in_planner import BuiltInPlanner
@@ -29,14 +31,80 @@ import jsonschema
 from pydantic import PrivateAttr
 
 try:
+    from .downsampling import DEFAULT_MAX_CHART_POINTS, downsample_tool_response
+    from .surface_refresh import SurfaceRefresher
     from .tools import get_sales_data, get_store_sales
 except ImportError:
+    from downsampling import DEFAULT_MAX_CHART_POINTS, downsample_tool_response
+    from surface_refresh import SurfaceRefresher
     from tools import get_sales_data, get_store_sales
 
 logger = logging.getLogger(__name__)
 
 RIZZCHARTS_CATALOG_URI = "https://github.com/google/A2UI/blob/main/samples/agent/adk/rizzcharts/rizzcharts_catalog_definition.json"
 A2UI_CATALOG_URI_STATE_KEY = "user:a2ui_catalog_uri"
+A2UI_SCHEMA_FINGERPRINT_STATE_KEY = "system:a2ui_schema_fingerprint"
+
+# Example templates shown to the model, per supported catalog.
+CATALOG_EXAMPLE_PATHS = {
+    RIZZCHARTS_CATALOG_URI: {
+        "map": "examples/rizzcharts_catalog/map.json",
+        "chart": "examples/rizzcharts_catalog/chart.json",
+    },
+    STANDARD_CATALOG_ID: {
+        "map": "examples/standard_catalog/map.json",
+        "chart": "examples/standard_catalog/chart.json",
+    },
+}
+
+SYSTEM_INSTRUCTIONS = """
+### System Instructions
+
+You are an expert A2UI Ecommerce Dashboard analyst. Your primary function is to translate user requests for ecommerce data into A2UI JSON payloads to display charts and visualizations. You MUST use the `send_a2ui_json_to_client` tool with the `a2ui_json` argument set to the A2UI JSON payload to send to the client. You should also include a brief text message with each response saying what you did and asking if you can help with anything else.
+
+**Core Objective:** To provide a dynamic and interactive dashboard by constructing UI surfaces with the appropriate visualization components based on user queries.
+
+**Key Components & Examples:**
+
+You will be provided a schema that defines the A2UI message structure and two key generic component templates for displaying data.
+
+1.  **Charts:** Used for requests about sales breakdowns, revenue performance, comparisons, or trends.
+    * **Template:** Use the JSON from `---BEGIN CHART EXAMPLE---`.
+2.  **Maps:** Used for requests about regional data, store locations, geography-based performance, or regional outliers.
+    * **Template:** Use the JSON from `---BEGIN MAP EXAMPLE---`.
+
+You will also use layout components like `Column` (as the `root`) and `Text` (to provide a title).
+
+---
+
+### Workflow and Rules
+
+Your task is to analyze the user's request, fetch the necessary data, select the correct generic template, and send the corresponding A2UI JSON payload.
+
+1.  **Analyze the Request:** Determine the user's intent (Visual Chart vs. Geospatial Map).
+    * "show my sales breakdown by product category for q3" -> **Intent:** Chart.
+    * "show revenue trends yoy by month" -> **Intent:** Chart.
+    * "were there any outlier stores in the northeast region" -> **Intent:** Map.
+
+2.  **Fetch Data:** Select and use the appropriate tool to retrieve the necessary data.
+    * Use **`get_sales_data`** for general sales, revenue, and product category trends (typically for Charts).
+    * Use **`get_store_sales`** for regional performance, store locations, and geospatial outliers (typically for Maps).
+
+3.  **Select Example:** Based on the intent, choose the correct example block to use as your template.
+    * **Intent** (Chart/Data Viz) -> Use `---BEGIN CHART EXAMPLE---`.
+    * **Intent** (Map/Geospatial) -> Use `---BEGIN MAP EXAMPLE---`.
+
+4.  **Construct the JSON Payload:**
+    * Use the **entire** JSON array from the chosen example as the base value for the `a2ui_json` argument.
+    * **Generate a new `surfaceId`:** You MUST generate a new, unique `surfaceId` for this request (e.g., `sales_breakdown_q3_surface`, `regional_outliers_northeast_surface`). This new ID must be used for the `surfaceId` in all three messages within the JSON array (`beginRendering`, `surfaceUpdate`, `dataModelUpdate`).
+    * **Update the title Text:** You MUST update the `literalString` value for the `Text` component (the component with `id: "page_header"`) to accurately reflect the specific user query. For example, if the user asks for "Q3" sales, update the generic template text to "Q3 2025 Sales by Product Category".
+    * Ensure the generated JSON perfectly matches the A2UI specification. It will be validated against the json_schema and rejected if it does not conform.  
+    * If you get an error in the tool response apologize to the user and let them know they should try again.
+
+5.  **Call the Tool:** Call the `send_a2ui_json_to_client` tool with the fully constructed `a2ui_json` payload.
+
+6.  **Follow-up Questions:** If the user asks for different data on a chart or map that is already displayed (e.g. "now for Q4", "what about the west region"), do NOT build a new surface. Call the `refresh_surface_data` tool with the existing `surfaceId`, the new `time_period` (charts) or `region` (maps), and a `title` that reflects the question. It fetches the data and updates the surface itself. Only if it returns an error, follow steps 2 to 5 instead.
+"""
 
 class RizzchartsAgent(LlmAgent):
     """An agent that runs an ecommerce dashboard"""
@@ -44,12 +112,18 @@ class RizzchartsAgent(LlmAgent):
     SUPPORTED_CONTENT_TYPES: ClassVar[list[str]] = ["text", "text/plain"]
     _a2ui_enabled_provider: A2uiEnabledProvider = PrivateAttr()
     _a2ui_schema_provider: A2uiSchemaProvider = PrivateAttr()
+    _a2ui_validator_provider: Optional[A2uiValidatorProvider] = PrivateAttr(default=None)
+    _catalog_examples: dict[str, dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _validated_examples: set[tuple[str, str]] = PrivateAttr(default_factory=set)
+    _instructions_cache: dict[tuple[str, str], str] = PrivateAttr(default_factory=dict)
 
     def __init__(
         self,
         model: Any,
         a2ui_enabled_provider: A2uiEnabledProvider,
-        a2ui_schema_provider: A2uiSchemaProvider
+        a2ui_schema_provider: A2uiSchemaProvider,
+        a2ui_validator_provider: Optional[A2uiValidatorProvider] = None,
+        max_chart_points: int = DEFAULT_MAX_CHART_POINTS,
     ):
         """Initializes the RizzchartsAgent.
 
@@ -57,15 +131,26 @@ class RizzchartsAgent(LlmAgent):
             model: The LLM model to use.
             a2ui_enabled_provider: A provider to check if A2UI is enabled.
             a2ui_schema_provider: A provider to retrieve the A2UI schema.
+            a2ui_validator_provider: An optional provider of the precompiled
+              validator for the A2UI schema, so that it is not compiled again
+              for every validation.
+            max_chart_points: The maximum number of points per chart series in
+              tool responses. Longer series are downsampled.
         """
+        surface_refresher = SurfaceRefresher(
+            a2ui_schema_provider=a2ui_schema_provider,
+            a2ui_validator_provider=a2ui_validator_provider,
+            max_chart_points=max_chart_points,
+        )
         super().__init__(
             model=model,
             name="rizzcharts_agent",
             description="An agent that lets sales managers request sales data.",
             instruction=self.get_instructions,
-            tools=[get_store_sales, get_sales_data, SendA2uiToClientToolset(
+            tools=[get_store_sales, get_sales_data, surface_refresher.refresh_surface_data, SendA2uiToClientToolset(
                 a2ui_schema=a2ui_schema_provider,
                 a2ui_enabled=a2ui_enabled_provider,
+                a2ui_validator=a2ui_validator_provider,
             )],
             planner=BuiltInPlanner(
                 thinking_config=types.ThinkingConfig(
@@ -73,10 +158,15 @@ class RizzchartsAgent(LlmAgent):
                 )
             ),
             disallow_transfer_to_peers=True,
+            after_tool_callback=[
+                surface_refresher.record_sent_surfaces,
+                functools.partial(downsample_tool_response, max_points=max_chart_points),
+            ],
         )
 
         self._a2ui_enabled_provider = a2ui_enabled_provider
         self._a2ui_schema_provider = a2ui_schema_provider
+        self._a2ui_validator_provider = a2ui_validator_provider
 
     def get_a2ui_schema(self, ctx: ReadonlyContext) -> dict[str, Any]:
         """Retrieves and wraps the A2UI schema from the session state.
@@ -90,12 +180,12 @@ class RizzchartsAgent(LlmAgent):
         a2ui_schema = self._a2ui_schema_provider(ctx)
         return wrap_as_json_array(a2ui_schema)
 
-    def load_example(self, path: str, a2ui_schema: dict[str, Any]) -> dict[str, Any]:
+    def load_example(self, path: str, a2ui_validator: jsonschema.protocols.Validator) -> dict[str, Any]:
         """Loads an example JSON file and validates it against the A2UI schema.
 
         Args:
             path: Relative path to the example JSON file.
-            a2ui_schema: The A2UI schema to validate against.
+            a2ui_validator: The validator of the wrapped A2UI schema.
 
         Returns:
             The loaded and validated JSON data.
@@ -103,8 +193,9 @@ class RizzchartsAgent(LlmAgent):
         data = None
         try:
             # Try pkgutil first (for Google3)
-            package_name = __package__ or ""
-            data = pkgutil.get_data(package_name, path)
+            # Run as top-level modules, there is no package to load from.
+            if __package__:
+                data = pkgutil.get_data(__package__, path)
         except ImportError:
             logger.info("pkgutil failed to get data, falling back to file system.")
 
@@ -116,14 +207,69 @@ class RizzchartsAgent(LlmAgent):
             example_str = full_path.read_text()
 
         example_json = json.loads(example_str)
-        jsonschema.validate(
-            instance=example_json, schema=a2ui_schema
-        )
+        a2ui_validator.validate(example_json)
         return example_json
 
+    def preload_examples(
+        self,
+        catalog_uri: str,
+        a2ui_schema: dict[str, Any],
+        a2ui_validator: Optional[jsonschema.protocols.Validator] = None,
+    ) -> None:
+        """Loads and validates the example templates for a catalog.
+
+        Meant to be called once at startup for every supported catalog, so that
+        no example is read or validated while serving requests.
+
+        Args:
+            catalog_uri: The URI of the catalog to load examples for.
+            a2ui_schema: The A2UI schema for the catalog, as stored in the session.
+            a2ui_validator: The precompiled validator of the schema, compiled
+              here if not given.
+
+        Raises:
+            ValueError: If the catalog is not supported.
+        """
+        example_paths = CATALOG_EXAMPLE_PATHS.get(catalog_uri)
+        if not example_paths:
+            raise ValueError(f"Unsupported catalog uri: {catalog_uri if catalog_uri else 'None'}")
+
+        a2ui_validator = a2ui_validator or create_a2ui_validator(a2ui_schema)
+        self._catalog_examples[catalog_uri] = {
+            name: self.load_example(path, a2ui_validator)
+            for name, path in example_paths.items()
+        }
+        self._validated_examples.add((catalog_uri, get_schema_fingerprint(a2ui_schema)))
+        logger.info(f"Preloaded examples for catalog {catalog_uri}")
+
+    def invalidate_instruction_cache(self, catalog_uri: Optional[str] = None) -> None:
+        """Drops cached examples and instructions, e.g. after a hot reload.
+
+        Args:
+            catalog_uri: The catalog to invalidate. Invalidates all catalogs if None.
+        """
+        if catalog_uri is None:
+            self._catalog_examples.clear()
+            self._validated_examples.clear()
+            self._instructions_cache.clear()
+        else:
+            self._catalog_examples.pop(catalog_uri, None)
+            self._validated_examples = {
+                key for key in self._validated_examples if key[0] != catalog_uri
+            }
+            self._instructions_cache = {
+                key: value
+                for key, value in self._instructions_cache.items()
+                if key[0] != catalog_uri
+            }
+        logger.info(f"Invalidated instruction cache for catalog {catalog_uri if catalog_uri else 'ALL'}")
+
     def get_instructions(self, readonly_context: ReadonlyContext) -> str:
         """Generates the system instructions for the agent.
 
+        Instructions are cached per catalog URI and schema fingerprint, so a
+        turn only builds them the first time a combination is seen.
+
         Args:
             readonly_context: The ReadonlyContext for resolving instructions.
 
@@ -134,63 +280,55 @@ class RizzchartsAgent(LlmAgent):
         if not use_ui:
             raise ValueError("A2UI must be enabled to run rizzcharts agent")
 
-        a2ui_schema = self.get_a2ui_schema(readonly_context)
         catalog_uri = readonly_context.state.get(A2UI_CATALOG_URI_STATE_KEY)
-        if catalog_uri == RIZZCHARTS_CATALOG_URI:
-            map_example = self.load_example("examples/rizzcharts_catalog/map.json", a2ui_schema)
-            chart_example = self.load_example("examples/rizzcharts_catalog/chart.json", a2ui_schema)
-        elif catalog_uri == STANDARD_CATALOG_ID:
-            map_example = self.load_example("examples/standard_catalog/map.json", a2ui_schema)
-            chart_example = self.load_example("examples/standard_catalog/chart.json", a2ui_schema)
-        else:
-            raise ValueError(f"Unsupported catalog uri: {catalog_uri if catalog_uri else 'None'}")
-
-        final_prompt = f"""
-### System Instructions
-
-You are an expert A2UI Ecommerce Dashboard analyst. Your primary function is to translate user requests for ecommerce data into A2UI JSON payloads to display charts and visualizations. You MUST use the `send_a2ui_json_to_client` tool with the `a2ui_json` argument set to the A2UI JSON payload to send to the client. You should also include a brief text message with each response saying what you did and asking if you can help with anything else.
-
-**Core Objective:** To provide a dynamic and interactive dashboard by constructing UI surfaces with the appropriate visualization components based on user queries.
-
-**Key Components & Examples:**
-
-You will be provided a schema that defines the A2UI message structure and two key generic component templates for displaying data.
-
-1.  **Charts:** Used for requests about sales breakdowns, revenue performance, comparisons, or trends.
-    * **Template:** Use the JSON from `---BEGIN CHART EXAMPLE---`.
-2.  **Maps:** Used for requests about regional data, store locations, geography-based performance, or regional outliers.
-    * **Template:** Use the JSON from `---BEGIN MAP EXAMPLE---`.
-
-You will also use layout components like `Column` (as the `root`) and `Text` (to provide a title).
+        schema_fingerprint = readonly_context.state.get(A2UI_SCHEMA_FINGERPRINT_STATE_KEY)
+        if final_prompt := self._instructions_cache.get((catalog_uri, schema_fingerprint)):
+            return final_prompt
 
----
+        a2ui_schema = self._a2ui_schema_provider(readonly_context)
+        if not schema_fingerprint:
+            schema_fingerprint = get_schema_fingerprint(a2ui_schema)
+        a2ui_validator = self._a2ui_validator_provider(readonly_context) if self._a2ui_validator_provider else None
+        final_prompt = self._build_instructions(catalog_uri, a2ui_schema, schema_fingerprint, a2ui_validator)
+        self._instructions_cache[(catalog_uri, schema_fingerprint)] = final_prompt
 
-### Workflow and Rules
+        logger.info(f"Generated system instructions for A2UI {'ENABLED' if use_ui else 'DISABLED'} and catalog {catalog_uri}")
 
-Your task is to analyze the user's request, fetch the necessary data, select the correct generic template, and send the corresponding A2UI JSON payload.
+        return final_prompt
 
-1.  **Analyze the Request:** Determine the user's intent (Visual Chart vs. Geospatial Map).
-    * "show my sales breakdown by product category for q3" -> **Intent:** Chart.
-    * "show revenue trends yoy by month" -> **Intent:** Chart.
-    * "were there any outlier stores in the northeast region" -> **Intent:** Map.
+    def _build_instructions(
+        self,
+        catalog_uri: Optional[str],
+        a2ui_schema: dict[str, Any],
+        schema_fingerprint: str,
+        a2ui_validator: Optional[jsonschema.protocols.Validator] = None,
+    ) -> str:
+        """Builds the system instructions for a catalog and schema.
 
-2.  **Fetch Data:** Select and use the appropriate tool to retrieve the necessary data.
-    * Use **`get_sales_data`** for general sales, revenue, and product category trends (typically for Charts).
-    * Use **`get_store_sales`** for regional performance, store locations, and geospatial outliers (typically for Maps).
+        Args:
+            catalog_uri: The URI of the catalog the client uses.
+            a2ui_schema: The A2UI schema for the catalog, as stored in the session.
+            schema_fingerprint: The fingerprint of `a2ui_schema`.
+            a2ui_validator: The precompiled validator of the schema, compiled
+              here if needed and not given.
 
-3.  **Select Example:** Based on the intent, choose the correct example block to use as your template.
-    * **Intent** (Chart/Data Viz) -> Use `---BEGIN CHART EXAMPLE---`.
-    * **Intent** (Map/Geospatial) -> Use `---BEGIN MAP EXAMPLE---`.
+        Returns:
+            The system instructions.
+        """
+        if catalog_uri not in self._catalog_examples:
+            self.preload_examples(catalog_uri, a2ui_schema, a2ui_validator)
 
-4.  **Construct the JSON Payload:**
-    * Use the **entire** JSON array from the chosen example as the base value for the `a2ui_json` argument.
-    * **Generate a new `surfaceId`:** You MUST generate a new, unique `surfaceId` for this request (e.g., `sales_breakdown_q3_surface`, `regional_outliers_northeast_surface`). This new ID must be used for the `surfaceId` in all three messages within the JSON array (`beginRendering`, `surfaceUpdate`, `dataModelUpdate`).
-    * **Update the title Text:** You MUST update the `literalString` value for the `Text` component (the component with `id: "page_header"`) to accurately reflect the specific user query. For example, if the user asks for "Q3" sales, update the generic template text to "Q3 2025 Sales by Product Category".
-    * Ensure the generated JSON perfectly matches the A2UI specification. It will be validated against the json_schema and rejected if it does not conform.  
-    * If you get an error in the tool response apologize to the user and let them know they should try again.
+        catalog_examples = self._catalog_examples[catalog_uri]
+        if (catalog_uri, schema_fingerprint) not in self._validated_examples:
+            a2ui_validator = a2ui_validator or create_a2ui_validator(a2ui_schema)
+            for example in catalog_examples.values():
+                a2ui_validator.validate(example)
+            self._validated_examples.add((catalog_uri, schema_fingerprint))
 
-5.  **Call the Tool:** Call the `send_a2ui_json_to_client` tool with the fully constructed `a2ui_json` payload.
+        map_example = catalog_examples["map"]
+        chart_example = catalog_examples["chart"]
 
+        examples = f"""
 ---BEGIN CHART EXAMPLE---
 {json.dumps(chart_example)}
 ---END CHART EXAMPLE---
@@ -199,7 +337,10 @@ Your task is to analyze the user's request, fetch the necessary data, select the
 {json.dumps(map_example)}
 ---END MAP EXAMPLE---
 """
-        
-        logger.info(f"Generated system instructions for A2UI {'ENABLED' if use_ui else 'DISABLED'} and catalog {catalog_uri}")
+        # The system instructions are identical for every catalog and turn, so
+        # they go first and the catalog specific examples are appended after.
+        final_prompt = StablePrefixPrompt(
+            static_sections=[SYSTEM_INSTRUCTIONS]
+        ).render([examples])
 
         return final_prompt
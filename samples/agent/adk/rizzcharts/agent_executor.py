@@ -17,23 +17,32 @@ from pathlib import Path
 from typing import override
 
 from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
 from a2a.types import AgentCapabilities, AgentCard, AgentExtension, AgentSkill
 from a2ui.a2ui_extension import A2UI_CLIENT_CAPABILITIES_KEY
+from a2ui.a2ui_extension import A2UI_CLIENT_CAPABILITIES_HASH_KEY
 from a2ui.a2ui_extension import A2UI_EXTENSION_URI
 from a2ui.a2ui_extension import STANDARD_CATALOG_ID
+from a2ui.a2ui_extension import SUPPORTED_CATALOG_IDS_KEY
 from a2ui.a2ui_extension import get_a2ui_agent_extension
 from a2ui.a2ui_extension import try_activate_a2ui_extension
-from a2ui.send_a2ui_to_client_toolset import convert_send_a2ui_to_client_genai_part_to_a2a_part
+from a2ui.a2ui_logging_utils import is_request_sampled, lazy_model_json
 try:
+    from .a2ui_schema_cache import A2uiSchemaCacheEntry, register_schema, resolve_schema, resolve_schema_entry  # pylint: disable=import-error
     from .agent import A2UI_CATALOG_URI_STATE_KEY  # pylint: disable=import-error
+    from .agent import A2UI_SCHEMA_FINGERPRINT_STATE_KEY  # pylint: disable=import-error
     from .agent import RIZZCHARTS_CATALOG_URI  # pylint: disable=import-error
     from .agent import RizzchartsAgent  # pylint: disable=import-error
     from .component_catalog_builder import ComponentCatalogBuilder  # pylint: disable=import-error
+    from .surface_refresh import convert_rizzcharts_genai_part_to_a2a_part  # pylint: disable=import-error
 except ImportError:
+    from a2ui_schema_cache import A2uiSchemaCacheEntry, register_schema, resolve_schema, resolve_schema_entry
     from agent import A2UI_CATALOG_URI_STATE_KEY
+    from agent import A2UI_SCHEMA_FINGERPRINT_STATE_KEY
     from agent import RIZZCHARTS_CATALOG_URI
     from agent import RizzchartsAgent
     from component_catalog_builder import ComponentCatalogBuilder
+    from surface_refresh import convert_rizzcharts_genai_part_to_a2a_part
 from google.adk.a2a.converters.request_converter import AgentRunRequest
 from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
 from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutorConfig
@@ -46,10 +55,12 @@ from google.adk.runners import Runner
 logger = logging.getLogger(__name__)
 
 _A2UI_ENABLED_KEY = "system:a2ui_enabled"
-_A2UI_SCHEMA_KEY = "system:a2ui_schema"
 
 def get_a2ui_schema(ctx: ReadonlyContext):
-    """Retrieves the A2UI schema from the session state.
+    """Resolves the A2UI schema referenced by the session state.
+
+    The session only stores the schema fingerprint; the schema itself is shared
+    by all sessions through the process-wide schema registry.
 
     Args:
         ctx: The ReadonlyContext for resolving the schema.
@@ -57,7 +68,19 @@ def get_a2ui_schema(ctx: ReadonlyContext):
     Returns:
         The A2UI schema or None if not found.
     """
-    return ctx.state.get(_A2UI_SCHEMA_KEY)
+    return resolve_schema(ctx.state.get(A2UI_SCHEMA_FINGERPRINT_STATE_KEY))
+
+def get_a2ui_validator(ctx: ReadonlyContext):
+    """Resolves the precompiled validator of the A2UI schema in the session state.
+
+    Args:
+        ctx: The ReadonlyContext for resolving the validator.
+
+    Returns:
+        The validator for lists of A2UI messages or None if not found.
+    """
+    entry = resolve_schema_entry(ctx.state.get(A2UI_SCHEMA_FINGERPRINT_STATE_KEY))
+    return entry.validator if entry is not None else None
 
 def get_a2ui_enabled(ctx: ReadonlyContext):
     """Checks if A2UI is enabled in the current session.
@@ -90,12 +113,28 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
             },
             default_catalog_uri=STANDARD_CATALOG_ID,
         )
+        self._preload_agent_examples(runner.agent)
+        # Schemas referenced by in-flight tasks, so that they stay resolvable
+        # even if the catalog builder evicts them mid-request.
+        self._in_flight_schemas: dict[str, A2uiSchemaCacheEntry] = {}
 
         config = A2aAgentExecutorConfig(
-            gen_ai_part_converter=convert_send_a2ui_to_client_genai_part_to_a2a_part
+            gen_ai_part_converter=convert_rizzcharts_genai_part_to_a2a_part
         )
         super().__init__(runner=runner, config=config)
 
+    def _preload_agent_examples(self, agent: RizzchartsAgent):
+        """Loads and validates the agent's examples for every supported catalog.
+
+        Args:
+            agent: The agent served by this executor.
+        """
+        for catalog_uri in (STANDARD_CATALOG_ID, RIZZCHARTS_CATALOG_URI):
+            a2ui_schema_entry, _ = self._component_catalog_builder.load_a2ui_schema_entry(
+                client_ui_capabilities={SUPPORTED_CATALOG_IDS_KEY: [catalog_uri]}
+            )
+            agent.preload_examples(catalog_uri, a2ui_schema_entry.schema, a2ui_schema_entry.validator)
+
     def get_agent_card(self) -> AgentCard:
         """Returns the AgentCard defining this agent's metadata and skills.
 
@@ -111,8 +150,12 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
             default_output_modes=RizzchartsAgent.SUPPORTED_CONTENT_TYPES,
             capabilities=AgentCapabilities(
                 streaming=True,
+                # Inline catalogs are remembered, so clients can send their hash
+                # instead of the full catalogs after the first request.
                 extensions=[get_a2ui_agent_extension(
-                    supported_catalog_ids=[STANDARD_CATALOG_ID, RIZZCHARTS_CATALOG_URI])],
+                    accepts_inline_catalogs=True,
+                    supported_catalog_ids=[STANDARD_CATALOG_ID, RIZZCHARTS_CATALOG_URI],
+                    accepts_inline_catalogs_hash=True)],
             ),
             skills=[
                 AgentSkill(
@@ -138,6 +181,13 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
             ],
         )
 
+    @override
+    async def execute(self, context: RequestContext, event_queue: EventQueue):
+        try:
+            await super().execute(context, event_queue)
+        finally:
+            self._in_flight_schemas.pop(context.task_id, None)
+
     @override
     async def _prepare_session(
         self,
@@ -145,7 +195,8 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
         run_request: AgentRunRequest,
         runner: Runner,
     ):
-        logger.info(f"Loading session for message {context.message}")
+        if context.message and is_request_sampled(context.task_id):
+            logger.debug("Loading session for message %s", lazy_model_json(context.message))
 
         session = await super()._prepare_session(context, run_request, runner)
 
@@ -154,11 +205,13 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
                 
         use_ui = try_activate_a2ui_extension(context)
         if use_ui:
-            a2ui_schema, catalog_uri = self._component_catalog_builder.load_a2ui_schema(
-                client_ui_capabilities=context.message.metadata.get(A2UI_CLIENT_CAPABILITIES_KEY)
-                if context.message and context.message.metadata
-                else None
+            metadata = context.message.metadata if context.message and context.message.metadata else {}
+            a2ui_schema_entry, catalog_uri = self._component_catalog_builder.load_a2ui_schema_entry(
+                client_ui_capabilities=metadata.get(A2UI_CLIENT_CAPABILITIES_KEY),
+                client_capabilities_hash=metadata.get(A2UI_CLIENT_CAPABILITIES_HASH_KEY),
             )
+            register_schema(a2ui_schema_entry)
+            self._in_flight_schemas[context.task_id] = a2ui_schema_entry
 
             await runner.session_service.append_event(
                 session,
@@ -168,7 +221,7 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
                     actions=EventActions(
                         state_delta={
                             _A2UI_ENABLED_KEY: True,
-                            _A2UI_SCHEMA_KEY: a2ui_schema,
+                            A2UI_SCHEMA_FINGERPRINT_STATE_KEY: a2ui_schema_entry.fingerprint,
                             A2UI_CATALOG_URI_STATE_KEY: catalog_uri,
                         }
                     ),
@@ -12,38 +12,94 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import json
 import logging
+from collections import OrderedDict
 from typing import Any, List, Optional
-from a2ui.a2ui_extension import INLINE_CATALOGS_KEY, SUPPORTED_CATALOG_IDS_KEY
+from a2ui.a2ui_extension import INLINE_CATALOGS_HASH_KEY, INLINE_CATALOGS_KEY, SUPPORTED_CATALOG_IDS_KEY, InlineCatalogsStore, get_client_capabilities_hash
+from a2ui.a2ui_schema_utils import get_schema_fingerprint
 try:
+    from .a2ui_schema_cache import A2uiSchemaCache, A2uiSchemaCacheEntry, DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES
     from .agent import RIZZCHARTS_CATALOG_URI, STANDARD_CATALOG_ID
 except ImportError:
+    from a2ui_schema_cache import A2uiSchemaCache, A2uiSchemaCacheEntry, DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES
     from agent import RIZZCHARTS_CATALOG_URI, STANDARD_CATALOG_ID
 
 logger = logging.getLogger(__name__)
 
+MAX_RESOLVED_CAPABILITIES = 1024
+
 
 class ComponentCatalogBuilder:
     def __init__(self,
         a2ui_schema_content: str,
         uri_to_local_catalog_content: dict[str, str],
         default_catalog_uri: Optional[str],
+        max_cached_schemas: int = DEFAULT_MAX_ENTRIES,
+        max_cached_schema_bytes: int = DEFAULT_MAX_BYTES,
     ):
-        self._a2ui_schema_content = a2ui_schema_content
+        # The base schema is parsed once; merged schemas are memoized per catalog.
+        self._a2ui_schema_json = json.loads(a2ui_schema_content)
         self._uri_to_local_catalog_content = uri_to_local_catalog_content
+        self._local_catalog_components = {
+            uri: self._get_component_names(json.loads(content))
+            for uri, content in uri_to_local_catalog_content.items()
+        }
         self._default_catalog_uri = default_catalog_uri
+        self._schema_cache = A2uiSchemaCache(
+            max_entries=max_cached_schemas, max_bytes=max_cached_schema_bytes
+        )
+        self._inline_catalogs_store = InlineCatalogsStore()
+        # Cache key and catalog uri of each client capabilities hash.
+        self._resolved_capabilities: OrderedDict[str, tuple[str, Optional[str]]] = OrderedDict()
 
     def load_a2ui_schema(self, client_ui_capabilities: Optional[dict[str, Any]]) -> tuple[dict[str, Any], Optional[str]]:
         """
         Returns:
-            A tuple of the a2ui_schema and the catalog uri
+            A tuple of the a2ui_schema and the catalog uri. The schema is shared
+            and read-only.
+        """
+        entry, catalog_uri = self.load_a2ui_schema_entry(client_ui_capabilities)
+        return entry.schema, catalog_uri
+
+    def load_a2ui_schema_entry(
+        self,
+        client_ui_capabilities: Optional[dict[str, Any]],
+        client_capabilities_hash: Optional[str] = None,
+    ) -> tuple[A2uiSchemaCacheEntry, Optional[str]]:
         """
+        Args:
+            client_ui_capabilities: The client's a2uiClientCapabilities.
+            client_capabilities_hash: The a2uiClientCapabilitiesHash sent with
+              them, used to skip resolving capabilities seen before.
+
+        Returns:
+            A tuple of the cached a2ui_schema entry and the catalog uri. For
+            inline catalogs, the uri is the local catalog whose examples
+            they can render.
+        """
+        if client_capabilities_hash and (resolved := self._resolved_capabilities.get(client_capabilities_hash)):
+            cache_key, catalog_uri = resolved
+            if entry := self._schema_cache.get(cache_key):
+                self._resolved_capabilities.move_to_end(client_capabilities_hash)
+                return entry, catalog_uri
+
+        entry, catalog_uri = self._resolve_a2ui_schema_entry(client_ui_capabilities)
+
+        # The hash comes from the caller, so it is only trusted once verified.
+        if client_capabilities_hash and get_client_capabilities_hash(client_ui_capabilities) == client_capabilities_hash:
+            self._resolved_capabilities[client_capabilities_hash] = (entry.key, catalog_uri)
+            while len(self._resolved_capabilities) > MAX_RESOLVED_CAPABILITIES:
+                self._resolved_capabilities.popitem(last=False)
+        return entry, catalog_uri
+
+    def _resolve_a2ui_schema_entry(self, client_ui_capabilities: Optional[dict[str, Any]]) -> tuple[A2uiSchemaCacheEntry, Optional[str]]:
         try: 
             logger.info(f"Loading A2UI client capabilities {client_ui_capabilities}")
                  
             if client_ui_capabilities:                                
-                supported_catalog_uris: List[str] = client_ui_capabilities.get(SUPPORTED_CATALOG_IDS_KEY)
+                supported_catalog_uris: List[str] = client_ui_capabilities.get(SUPPORTED_CATALOG_IDS_KEY) or []
                 if RIZZCHARTS_CATALOG_URI in supported_catalog_uris:
                     catalog_uri = RIZZCHARTS_CATALOG_URI
                 elif STANDARD_CATALOG_ID in supported_catalog_uris:
@@ -52,34 +108,105 @@ class ComponentCatalogBuilder:
                     catalog_uri = None
 
                 inline_catalog_str = client_ui_capabilities.get(INLINE_CATALOGS_KEY)
+                inline_catalogs_hash = client_ui_capabilities.get(INLINE_CATALOGS_HASH_KEY)
             elif self._default_catalog_uri:
                 logger.info(f"Using default catalog {self._default_catalog_uri} since client UI capabilities not found")
                 catalog_uri = self._default_catalog_uri
                 inline_catalog_str = None
+                inline_catalogs_hash = None
             else:
                 raise ValueError("Client UI capabilities not provided")
             
-            if catalog_uri and inline_catalog_str:
+            if catalog_uri and (inline_catalog_str or inline_catalogs_hash):
                 raise ValueError(f"Cannot set both {SUPPORTED_CATALOG_IDS_KEY} and {INLINE_CATALOGS_KEY} in ClientUiCapabilities: {client_ui_capabilities}")    
             elif catalog_uri:
-                if catalog_str := self._uri_to_local_catalog_content.get(catalog_uri):
-                    logger.info(f"Loading local component catalog with uri {catalog_uri}")
-                    catalog_json = json.loads(catalog_str)
-                else:
+                if catalog_uri not in self._uri_to_local_catalog_content:
                     raise ValueError(f"Local component catalog with URI {catalog_uri} not found")
+                cache_key = catalog_uri
+                catalog_str = self._uri_to_local_catalog_content[catalog_uri]
             elif inline_catalog_str:
-                logger.info(f"Loading inline component catalog {inline_catalog_str[:200]}")
-                catalog_json = json.loads(inline_catalog_str)
+                # Remember the catalog so the client can send only its hash next time.
+                cache_key = "inline:" + self._inline_catalogs_store.put(inline_catalog_str)
+                catalog_str = inline_catalog_str
+            elif inline_catalogs_hash:
+                cache_key = "inline:" + inline_catalogs_hash
+                catalog_str = None
             else:
                 raise ValueError("No supported catalogs found in client UI capabilities")
 
-            logger.info("Loading A2UI schema")
-            a2ui_schema_json = json.loads(self._a2ui_schema_content)
+            if not (entry := self._schema_cache.get(cache_key)):
+                if catalog_str is None:
+                    catalog_str = self._inline_catalogs_store.get(inline_catalogs_hash)
 
-            a2ui_schema_json["properties"]["surfaceUpdate"]["properties"]["components"]["items"]["properties"]["component"]["properties"] = catalog_json
+                logger.info(f"Loading component catalog {cache_key} {catalog_str[:200] if not catalog_uri else ''}")
+                entry = self._merge_catalog(cache_key, json.loads(catalog_str))
+                self._schema_cache.put(entry)
 
-            return a2ui_schema_json, catalog_uri
+            if not catalog_uri:
+                catalog_uri = self._get_inline_example_catalog_uri(entry)
+            return entry, catalog_uri
 
         except Exception as e:
             logger.error(f"Failed to a2ui schema with client ui capabilities {client_ui_capabilities}: {e}")
             raise e
+
+    def _get_inline_example_catalog_uri(self, entry: A2uiSchemaCacheEntry) -> str:
+        """Picks the local catalog whose examples an inline catalog can render.
+
+        Inline catalogs come without examples, so prompts use the examples of
+        the local catalog with the most components that the inline catalog
+        fully includes.
+
+        Args:
+            entry: The cache entry of the schema merged with the inline catalog.
+
+        Returns:
+            The URI of the local catalog.
+
+        Raises:
+            ValueError: If the inline catalog includes no local catalog.
+        """
+        inline_components = self._get_component_names(
+            entry.schema["properties"]["surfaceUpdate"]["properties"]["components"]["items"]["properties"]["component"]["properties"]
+        )
+        local_catalogs = [
+            (len(components), uri)
+            for uri, components in self._local_catalog_components.items()
+            if components <= inline_components
+        ]
+        if not local_catalogs:
+            raise ValueError("Inline catalogs must include all components of a supported catalog")
+        return max(local_catalogs)[1]
+
+    def _get_component_names(self, catalog_json: dict[str, Any]) -> frozenset[str]:
+        """Returns the components of a catalog, including those of a local catalog it references."""
+        components = catalog_json.get("components") or {}
+        names = frozenset(name for name in components if name != "$ref")
+        if ref := components.get("$ref"):
+            ref_file = ref.split("#")[0].rsplit("/", 1)[-1]
+            for uri, content in self._uri_to_local_catalog_content.items():
+                if uri.rsplit("/", 1)[-1] == ref_file:
+                    names |= self._get_component_names(json.loads(content))
+        return names
+
+    def _merge_catalog(self, cache_key: str, catalog_json: dict[str, Any]) -> A2uiSchemaCacheEntry:
+        """Splices a component catalog into a copy of the base A2UI schema.
+
+        Args:
+            cache_key: The cache key of the catalog.
+            catalog_json: The parsed component catalog.
+
+        Returns:
+            The cache entry holding the merged schema.
+        """
+        logger.info("Loading A2UI schema")
+        a2ui_schema_json = copy.deepcopy(self._a2ui_schema_json)
+
+        a2ui_schema_json["properties"]["surfaceUpdate"]["properties"]["components"]["items"]["properties"]["component"]["properties"] = catalog_json
+
+        return A2uiSchemaCacheEntry.create(
+            key=cache_key,
+            schema=a2ui_schema_json,
+            fingerprint=get_schema_fingerprint(a2ui_schema_json),
+            size_bytes=len(json.dumps(a2ui_schema_json, separators=(",", ":"))),
+        )
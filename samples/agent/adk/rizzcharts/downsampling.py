@@ -0,0 +1,202 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from numbers import Number
+from typing import Any, Optional
+
+import numpy as np
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHART_POINTS = 200
+# The minimum and maximum of a series are always kept.
+MIN_CHART_POINTS = 2
+VALUE_KEY = "value"
+# Keys of the x coordinate of time series points, as numbers or ISO 8601
+# strings. Lists of points without one, like the slices of a pie chart, have
+# no order and are never downsampled.
+X_KEYS = ("timestamp", "date")
+
+
+def lttb_indices(y: np.ndarray, n_out: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+    """Selects points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are split
+    into `n_out - 2` buckets, and from each bucket the point forming the largest
+    triangle with the previously selected point and the next bucket's average
+    is kept. The triangle areas of a bucket are computed in one NumPy
+    operation.
+
+    Args:
+        y: The values of the series.
+        n_out: The number of points to select.
+        x: The x coordinates of the series. Defaults to the point indices.
+
+    Returns:
+        The sorted indices of the selected points.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1])[:n_out]
+
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    # Bucket boundaries over the interior points [1, n - 1).
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Averages of every bucket, used as the third vertex of the triangles.
+    bucket_sizes = np.diff(edges)
+    x_means = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / bucket_sizes
+    y_means = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / bucket_sizes
+    x_means = np.append(x_means, x[-1])
+    y_means = np.append(y_means, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = x_means[bucket + 1], y_means[bucket + 1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_indices(y: np.ndarray, max_points: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+    """Selects at most `max_points` points, always keeping the extremes.
+
+    Args:
+        y: The values of the series.
+        max_points: The maximum number of points to keep.
+        x: The x coordinates of the series. Defaults to the point indices.
+
+    Returns:
+        The sorted indices of the selected points.
+
+    Raises:
+        ValueError: If `max_points` is less than `MIN_CHART_POINTS`.
+    """
+    if max_points < MIN_CHART_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_CHART_POINTS} to keep the extremes, got {max_points}")
+    if len(y) <= max_points:
+        return np.arange(len(y))
+    # Leave room for the minimum and maximum, which LTTB may skip.
+    selected = lttb_indices(y, max_points - 2, x)
+    return np.union1d(selected, [np.argmin(y), np.argmax(y)])
+
+
+def _get_series_x(value: Any) -> Optional[np.ndarray]:
+    """Returns the x coordinates if `value` is a time series, otherwise None.
+
+    A time series is a list of `{"value": ...}` points that all have the same
+    x key, in ascending order.
+    """
+    if not isinstance(value, list) or not value:
+        return None
+    if not all(isinstance(point, dict) and isinstance(point.get(VALUE_KEY), Number) for point in value):
+        return None
+    x_key = next((key for key in X_KEYS if key in value[0]), None)
+    if x_key is None or not all(x_key in point for point in value):
+        return None
+    x_values = [point[x_key] for point in value]
+    try:
+        if all(isinstance(x_value, Number) for x_value in x_values):
+            x = np.array(x_values, dtype=np.float64)
+        else:
+            x = np.array(x_values, dtype="datetime64[ms]").astype(np.float64)
+    except (TypeError, ValueError):
+        return None
+    if np.any(np.diff(x) < 0):
+        return None
+    return x
+
+
+def downsample_series(value: Any, max_points: int) -> tuple[Any, int]:
+    """Downsamples every time series in a tool response.
+
+    Time series are lists of `{"value": ...}` points ordered by one of
+    `X_KEYS`. Other lists, such as the categories of a pie chart, are kept
+    as they are.
+
+    Args:
+        value: A JSON compatible tool response.
+        max_points: The maximum number of points per series.
+
+    Returns:
+        A tuple of the downsampled response and the number of points dropped.
+    """
+    if (x := _get_series_x(value)) is not None:
+        dropped = 0
+        if len(value) > max_points:
+            keep = downsample_indices(np.array([point[VALUE_KEY] for point in value], dtype=np.float64), max_points, x)
+            dropped = len(value) - len(keep)
+            value = [value[i] for i in keep.tolist()]
+        points = []
+        for point in value:
+            point, point_dropped = downsample_series(point, max_points)
+            dropped += point_dropped
+            points.append(point)
+        return points, dropped
+    if isinstance(value, dict):
+        dropped = 0
+        result = {}
+        for key, item in value.items():
+            result[key], item_dropped = downsample_series(item, max_points)
+            dropped += item_dropped
+        return result, dropped
+    if isinstance(value, list):
+        dropped = 0
+        result = []
+        for item in value:
+            item, item_dropped = downsample_series(item, max_points)
+            dropped += item_dropped
+            result.append(item)
+        return result, dropped
+    return value, 0
+
+
+def downsample_tool_response(
+    tool: BaseTool,
+    args: dict[str, Any],
+    tool_context: ToolContext,
+    tool_response: Any,
+    max_points: int = DEFAULT_MAX_CHART_POINTS,
+) -> Optional[dict[str, Any]]:
+    """After tool callback that caps chart series before the model sees them.
+
+    Args:
+        tool: The tool that was called.
+        args: The arguments of the call.
+        tool_context: The context of the call.
+        tool_response: The response of the tool.
+        max_points: The maximum number of points per series.
+
+    Returns:
+        The downsampled response, or None to keep the original response.
+    """
+    if not isinstance(tool_response, dict):
+        return None
+    downsampled, dropped = downsample_series(tool_response, max_points)
+    if not dropped:
+        return None
+    logger.info(f"Downsampled {tool.name} response, dropped {dropped} chart points")
+    return downsampled
@@ -0,0 +1,266 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Columns expected in the order rows file.
+ORDER_DATE_COLUMN = "order_date"
+CATEGORY_COLUMN = "category"
+SUBCATEGORY_COLUMN = "subcategory"
+AMOUNT_COLUMN = "amount"
+
+MONTH_ABBREVIATIONS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+
+_MONTH_PATTERN = re.compile(r"\b(" + "|".join(MONTH_ABBREVIATIONS) + r")[a-z]*\b")
+_QUARTER_PATTERN = re.compile(r"\bq([1-4])\b")
+_YEAR_PATTERN = re.compile(r"\b(\d{4})\b")
+_RELATIVE_PATTERN = re.compile(r"\b(this|current|last|previous)\s+(month|quarter|year)\b")
+
+
+@dataclass(frozen=True)
+class TimePeriod:
+    """A parsed `time_period` argument, as months of a single year."""
+
+    year: int
+    months: tuple[int, ...]
+    year_over_year: bool = False
+
+
+class SalesDataStore:
+    """A columnar store of order rows with precomputed sales rollups.
+
+    Rows are encoded once into integer columns and reduced with `np.bincount`
+    into a dense (year, month, subcategory) cube. Queries only aggregate that
+    cube, so their cost does not depend on the number of orders.
+    """
+
+    def __init__(
+        self,
+        order_dates: np.ndarray,
+        categories: np.ndarray,
+        subcategories: np.ndarray,
+        amounts: np.ndarray,
+    ):
+        """Initializes the SalesDataStore from its columns.
+
+        Args:
+            order_dates: The order dates, as `datetime64` values.
+            categories: The product category of each order.
+            subcategories: The product subcategory of each order.
+            amounts: The sales amount of each order.
+        """
+        order_months = order_dates.astype("datetime64[M]").astype(np.int64)
+        years = order_months // 12 + 1970
+        months = order_months % 12
+
+        # Subcategories are grouped per category, so the same label can be used
+        # in two categories.
+        pairs, subcategory_codes = np.unique(
+            np.char.add(np.char.add(categories.astype(str), "\x1f"), subcategories.astype(str)),
+            return_inverse=True,
+        )
+        split_pairs = np.char.partition(pairs, "\x1f")
+        self._category_labels, self._subcategory_category = np.unique(
+            split_pairs[:, 0], return_inverse=True
+        )
+        self._subcategory_labels = split_pairs[:, 2]
+
+        # Relative periods such as 'last month' count back from the latest
+        # month with orders, in months since 1970.
+        self._last_order_month = int(order_months.max())
+        self._first_year = int(years.min())
+        self._years = np.arange(self._first_year, int(years.max()) + 1)
+        year_codes = years - self._first_year
+
+        n_subcategories = len(self._subcategory_labels)
+        cube_index = (year_codes * 12 + months) * n_subcategories + subcategory_codes
+        self._cube = np.bincount(
+            cube_index,
+            weights=amounts.astype(np.float64),
+            minlength=len(self._years) * 12 * n_subcategories,
+        ).reshape(len(self._years), 12, n_subcategories)
+
+        logger.info(
+            f"Loaded {len(amounts)} orders across {len(self._years)} years, "
+            f"{len(self._category_labels)} categories and {n_subcategories} subcategories"
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "SalesDataStore":
+        """Loads order rows from a CSV or Parquet file.
+
+        The file must have `order_date`, `category`, `subcategory` and `amount`
+        columns. Parquet files require `pyarrow`.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            The loaded SalesDataStore.
+        """
+        if Path(path).suffix.lower() == ".parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ValueError("Loading Parquet sales data requires pyarrow") from e
+            table = pq.read_table(
+                path, columns=[ORDER_DATE_COLUMN, CATEGORY_COLUMN, SUBCATEGORY_COLUMN, AMOUNT_COLUMN]
+            )
+            columns = {name: table.column(name).to_numpy() for name in table.column_names}
+        else:
+            with open(path, newline="") as f:
+                rows = list(csv.reader(f))
+            header, rows = rows[0], rows[1:]
+            values = list(zip(*rows)) if rows else [()] * len(header)
+            columns = {name: np.asarray(column) for name, column in zip(header, values)}
+
+        return cls(
+            order_dates=np.asarray(columns[ORDER_DATE_COLUMN], dtype="datetime64[D]"),
+            categories=columns[CATEGORY_COLUMN],
+            subcategories=columns[SUBCATEGORY_COLUMN],
+            amounts=np.asarray(columns[AMOUNT_COLUMN], dtype=np.float64),
+        )
+
+    def parse_time_period(self, time_period: str) -> TimePeriod:
+        """Parses a time period such as 'Q3', 'march 2024', '2024', 'year', 'yoy' or 'last month'.
+
+        Periods without a year refer to the latest year with data. Relative
+        periods ('this', 'current', 'last' or 'previous' month, quarter or
+        year) count back from the latest month with data.
+
+        Args:
+            time_period: The time period requested by the model.
+
+        Returns:
+            The parsed TimePeriod.
+
+        Raises:
+            ValueError: If the time period is not recognized.
+        """
+        text = time_period.strip().lower()
+        year_match = _YEAR_PATTERN.search(text)
+        year = int(year_match.group(1)) if year_match else int(self._years[-1])
+
+        year_over_year = "yoy" in text or "year over year" in text
+        if relative_match := _RELATIVE_PATTERN.search(text):
+            year, months = self._parse_relative_period(*relative_match.groups())
+        elif quarter_match := _QUARTER_PATTERN.search(text):
+            quarter = int(quarter_match.group(1))
+            months = tuple(range((quarter - 1) * 3, quarter * 3))
+        elif month_match := _MONTH_PATTERN.search(text):
+            months = (MONTH_ABBREVIATIONS.index(month_match.group(1)),)
+        elif year_match or year_over_year or "year" in text or text in ("all", ""):
+            months = tuple(range(12))
+        else:
+            raise ValueError(f"Unsupported time period: {time_period}")
+
+        if year not in self._years:
+            raise ValueError(f"No sales data for {year}")
+        return TimePeriod(year=year, months=months, year_over_year=year_over_year)
+
+    def _parse_relative_period(self, anchor: str, unit: str) -> tuple[int, tuple[int, ...]]:
+        """Returns the year and months of a period relative to the latest month with data."""
+        offset = 0 if anchor in ("this", "current") else 1
+        if unit == "month":
+            month = self._last_order_month - offset
+            return month // 12 + 1970, (month % 12,)
+        if unit == "quarter":
+            quarter = self._last_order_month // 3 - offset
+            return quarter // 4 + 1970, tuple(range(quarter % 4 * 3, quarter % 4 * 3 + 3))
+        return self._last_order_month // 12 + 1970 - offset, tuple(range(12))
+
+    def get_sales_breakdown(self, time_period: str) -> dict[str, Any]:
+        """Returns the sales breakdown by category, drilled down by subcategory.
+
+        Values are percentages: of total sales for categories, and of the
+        category's sales for subcategories. Year over year periods add a
+        `yoyChange` percentage to every entry.
+
+        Args:
+            time_period: The time period to get sales data for.
+
+        Returns:
+            A dict in the `sales_data`/`drillDown` shape used by the chart example.
+        """
+        period = self.parse_time_period(time_period)
+        subcategory_sales = self._get_subcategory_sales(period.year, period.months)
+        previous_sales = None
+        if period.year_over_year:
+            previous_sales = self._get_subcategory_sales(period.year - 1, period.months)
+
+        category_sales = np.bincount(
+            self._subcategory_category, weights=subcategory_sales, minlength=len(self._category_labels)
+        )
+        previous_category_sales = None
+        if previous_sales is not None:
+            previous_category_sales = np.bincount(
+                self._subcategory_category, weights=previous_sales, minlength=len(self._category_labels)
+            )
+
+        total = category_sales.sum()
+        sales_data = []
+        for category in np.argsort(-category_sales, kind="stable"):
+            if category_sales[category] <= 0:
+                continue
+            item = {
+                "label": str(self._category_labels[category]),
+                "value": _percentage(category_sales[category], total),
+            }
+            if previous_category_sales is not None:
+                item["yoyChange"] = _change(category_sales[category], previous_category_sales[category])
+
+            subcategories = np.flatnonzero(self._subcategory_category == category)
+            subcategories = subcategories[np.argsort(-subcategory_sales[subcategories], kind="stable")]
+            drill_down = [
+                {
+                    "label": str(self._subcategory_labels[subcategory]),
+                    "value": _percentage(subcategory_sales[subcategory], category_sales[category]),
+                    **(
+                        {"yoyChange": _change(subcategory_sales[subcategory], previous_sales[subcategory])}
+                        if previous_sales is not None
+                        else {}
+                    ),
+                }
+                for subcategory in subcategories
+                if subcategory_sales[subcategory] > 0
+            ]
+            if len(drill_down) > 1:
+                item["drillDown"] = drill_down
+            sales_data.append(item)
+
+        return {"sales_data": sales_data}
+
+    def _get_subcategory_sales(self, year: int, months: tuple[int, ...]) -> np.ndarray:
+        """Returns the sales per subcategory for months of a year."""
+        year_code = year - self._first_year
+        if not 0 <= year_code < len(self._years):
+            return np.zeros(len(self._subcategory_labels))
+        return self._cube[year_code, list(months)].sum(axis=0)
+
+
+def _percentage(value: float, total: float) -> float:
+    return round(float(value / total * 100), 1) if total else 0.0
+
+
+def _change(value: float, previous: float) -> Optional[float]:
+    return round(float((value - previous) / previous * 100), 1) if previous else None
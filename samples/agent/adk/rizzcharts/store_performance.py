@@ -0,0 +1,341 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import logging
+import math
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Columns expected in the stores file. `baseline_sales` is optional.
+NAME_COLUMN = "name"
+LAT_COLUMN = "lat"
+LNG_COLUMN = "lng"
+SALES_COLUMN = "sales"
+BASELINE_SALES_COLUMN = "baseline_sales"
+
+# Bounding boxes (min_lat, min_lng, max_lat, max_lng) of the supported regions.
+REGION_BOUNDS = {
+    "northeast": (38.5, -80.6, 47.5, -66.9),
+    "southeast": (24.4, -92.0, 38.5, -75.2),
+    "midwest": (36.0, -104.1, 49.4, -80.5),
+    "southwest": (25.8, -115.0, 37.0, -93.5),
+    "west": (31.3, -125.0, 49.0, -102.0),
+}
+
+DEFAULT_GRID_CELL_DEGREES = 1.0
+DEFAULT_OUTLIER_Z_SCORE = 2.0
+# Upper bounds on the markers returned, whatever the number of stores.
+DEFAULT_MAX_MARKERS = 200
+DEFAULT_MAX_OUTLIER_PINS = 50
+# Cluster grid cells per 256px map tile width at the requested zoom.
+CLUSTER_CELLS_PER_TILE = 8
+MIN_ZOOM = 2
+MAX_ZOOM = 15
+
+OUTLIER_MARKER_STYLE = {
+    "background": "#4285F4",
+    "borderColor": "#FFFFFF",
+    "glyphColor": "#FFFFFF",
+}
+
+
+class StorePerformanceIndex:
+    """Store locations and sales in arrays, bucketed in a lat/lng grid.
+
+    Stores are sorted by grid cell so that a region query only touches the
+    cells overlapping its bounding box, and outliers are found with a
+    vectorized z-score over the stores in the region.
+    """
+
+    def __init__(
+        self,
+        names: np.ndarray,
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        sales: np.ndarray,
+        baseline_sales: Optional[np.ndarray] = None,
+        grid_cell_degrees: float = DEFAULT_GRID_CELL_DEGREES,
+    ):
+        """Initializes the StorePerformanceIndex from its columns.
+
+        Args:
+            names: The name of each store.
+            lats: The latitude of each store.
+            lngs: The longitude of each store.
+            sales: The sales of each store.
+            baseline_sales: The expected sales of each store. If omitted,
+              outliers are relative to the other stores in the region.
+            grid_cell_degrees: The size of the grid cells, in degrees.
+        """
+        self._grid_cell_degrees = grid_cell_degrees
+        self._n_lng_cells = math.ceil(360 / grid_cell_degrees)
+
+        cells = self._get_cells(np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64))
+        order = np.argsort(cells, kind="stable")
+        self._cells = cells[order]
+        self._names = np.asarray(names)[order]
+        self._lats = np.asarray(lats, dtype=np.float64)[order]
+        self._lngs = np.asarray(lngs, dtype=np.float64)[order]
+        self._sales = np.asarray(sales, dtype=np.float64)[order]
+        self._baseline_sales = (
+            np.asarray(baseline_sales, dtype=np.float64)[order] if baseline_sales is not None else None
+        )
+        logger.info(f"Indexed {len(self._names)} stores in {len(np.unique(self._cells))} grid cells")
+
+    @classmethod
+    def from_file(cls, path: str) -> "StorePerformanceIndex":
+        """Loads stores from a CSV or Parquet file.
+
+        The file must have `name`, `lat`, `lng` and `sales` columns, and may
+        have a `baseline_sales` column. Parquet files require `pyarrow`.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            The loaded StorePerformanceIndex.
+        """
+        if Path(path).suffix.lower() == ".parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ValueError("Loading Parquet store data requires pyarrow") from e
+            table = pq.read_table(path)
+            columns = {name: table.column(name).to_numpy() for name in table.column_names}
+        else:
+            with open(path, newline="") as f:
+                rows = list(csv.reader(f))
+            header, rows = rows[0], rows[1:]
+            values = list(zip(*rows)) if rows else [()] * len(header)
+            columns = {name: np.asarray(column) for name, column in zip(header, values)}
+
+        baseline_sales = columns.get(BASELINE_SALES_COLUMN)
+        return cls(
+            names=columns[NAME_COLUMN],
+            lats=np.asarray(columns[LAT_COLUMN], dtype=np.float64),
+            lngs=np.asarray(columns[LNG_COLUMN], dtype=np.float64),
+            sales=np.asarray(columns[SALES_COLUMN], dtype=np.float64),
+            baseline_sales=np.asarray(baseline_sales, dtype=np.float64) if baseline_sales is not None else None,
+        )
+
+    def get_store_sales(
+        self,
+        region: str = "all",
+        outlier_z_score: float = DEFAULT_OUTLIER_Z_SCORE,
+        max_markers: int = DEFAULT_MAX_MARKERS,
+        max_outlier_pins: int = DEFAULT_MAX_OUTLIER_PINS,
+    ) -> dict[str, Any]:
+        """Returns the stores of a region with outliers highlighted.
+
+        If the region has more stores than `max_markers`, stores are grouped
+        into cluster markers for the map zoom. Outliers are always kept as
+        individual pins, up to `max_outlier_pins` of the strongest ones.
+
+        Args:
+            region: A region name from REGION_BOUNDS, or 'all'.
+            outlier_z_score: The z-score above which a store is an outlier.
+            max_markers: The maximum number of locations returned.
+            max_outlier_pins: The maximum number of outliers shown as pins.
+
+        Returns:
+            A dict with the map `center`, `zoom` and `locations`, in the shape
+            used by the map example, and the `total_stores` and
+            `outlier_stores` counts.
+
+        Raises:
+            ValueError: If the region is not supported.
+        """
+        indices = self._get_region_indices(region)
+        if len(indices) == 0:
+            return {"center": None, "zoom": MIN_ZOOM, "locations": [], "total_stores": 0, "outlier_stores": 0}
+
+        lats = self._lats[indices]
+        lngs = self._lngs[indices]
+        scores, performance = self._get_scores(indices)
+        outliers = np.flatnonzero(np.abs(scores) > outlier_z_score)
+        center, zoom = get_center_and_zoom(lats, lngs)
+
+        # Strongest outliers first, so capping keeps the most relevant ones.
+        pinned = outliers[np.argsort(-np.abs(scores[outliers]), kind="stable")][:min(max_outlier_pins, max_markers)]
+        locations = [
+            {
+                "lat": float(lats[i]),
+                "lng": float(lngs[i]),
+                "name": str(self._names[indices[i]]),
+                "outlier_reason": self._get_outlier_reason(scores[i], performance[i]),
+                **OUTLIER_MARKER_STYLE,
+            }
+            for i in pinned.tolist()
+        ]
+
+        others = np.ones(len(indices), dtype=bool)
+        others[pinned] = False
+        others = np.flatnonzero(others)
+        max_other_markers = max_markers - len(locations)
+        if len(others) <= max_other_markers:
+            locations.extend(
+                {"lat": lat, "lng": lng, "name": name}
+                for lat, lng, name in zip(
+                    lats[others].tolist(), lngs[others].tolist(), self._names[indices[others]].tolist()
+                )
+            )
+        elif max_other_markers > 0:
+            locations.extend(self._get_cluster_locations(indices[others], zoom, max_other_markers))
+
+        return {
+            "center": center,
+            "zoom": zoom,
+            "locations": locations,
+            "total_stores": len(indices),
+            "outlier_stores": len(outliers),
+        }
+
+    def _get_cluster_locations(self, indices: np.ndarray, zoom: int, max_clusters: int) -> list[dict[str, Any]]:
+        """Groups stores into at most `max_clusters` markers."""
+        cluster_lats, cluster_lngs, counts, members = cluster_coordinates(
+            self._lats[indices], self._lngs[indices], zoom, max_clusters
+        )
+        locations = []
+        for lat, lng, count, member in zip(cluster_lats.tolist(), cluster_lngs.tolist(), counts.tolist(), members.tolist()):
+            if count == 1:
+                index = indices[member]
+                locations.append({"lat": float(self._lats[index]), "lng": float(self._lngs[index]), "name": str(self._names[index])})
+            else:
+                locations.append(
+                    {"lat": lat, "lng": lng, "name": f"{count} stores", "description": f"Cluster of {count} stores", "count": count}
+                )
+        return locations
+
+    def _get_cells(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Returns the grid cell id of each coordinate."""
+        lat_cells = np.floor((lats + 90) / self._grid_cell_degrees).astype(np.int64)
+        lng_cells = np.floor((lngs + 180) / self._grid_cell_degrees).astype(np.int64)
+        return lat_cells * self._n_lng_cells + lng_cells
+
+    def _get_region_indices(self, region: str) -> np.ndarray:
+        """Returns the indices of the stores inside the region's bounding box."""
+        region = region.strip().lower()
+        if region in ("", "all"):
+            return np.arange(len(self._names))
+        if region not in REGION_BOUNDS:
+            raise ValueError(f"Unsupported region: {region}. Supported regions: all, {', '.join(REGION_BOUNDS)}")
+
+        min_lat, min_lng, max_lat, max_lng = REGION_BOUNDS[region]
+        min_cell_lat, min_cell_lng = divmod(int(self._get_cells(np.array([min_lat]), np.array([min_lng]))[0]), self._n_lng_cells)
+        max_cell_lat, max_cell_lng = divmod(int(self._get_cells(np.array([max_lat]), np.array([max_lng]))[0]), self._n_lng_cells)
+
+        # Each row of cells is contiguous in the sorted cell ids.
+        row_starts = np.arange(min_cell_lat, max_cell_lat + 1) * self._n_lng_cells
+        starts = np.searchsorted(self._cells, row_starts + min_cell_lng, side="left")
+        ends = np.searchsorted(self._cells, row_starts + max_cell_lng, side="right")
+        candidates = np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+
+        in_bounds = (
+            (self._lats[candidates] >= min_lat)
+            & (self._lats[candidates] <= max_lat)
+            & (self._lngs[candidates] >= min_lng)
+            & (self._lngs[candidates] <= max_lng)
+        )
+        return candidates[in_bounds]
+
+    def _get_scores(self, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the z-score and performance of each store.
+
+        Performance is the relative difference to the baseline if there is one,
+        and the sales otherwise.
+        """
+        if self._baseline_sales is not None:
+            baseline = self._baseline_sales[indices]
+            performance = np.divide(
+                self._sales[indices] - baseline, baseline, out=np.zeros(len(indices)), where=baseline > 0
+            )
+        else:
+            performance = self._sales[indices]
+
+        std = performance.std()
+        if std == 0:
+            return np.zeros(len(indices)), performance
+        return (performance - performance.mean()) / std, performance
+
+    def _get_outlier_reason(self, score: float, performance: float) -> str:
+        """Returns the text shown for an outlier store."""
+        if self._baseline_sales is not None:
+            direction = "over" if performance > 0 else "under"
+            return f"Yes, {abs(performance) * 100:.0f}% sales {direction} baseline"
+        direction = "above" if score > 0 else "below"
+        return f"Yes, sales {abs(score):.1f} standard deviations {direction} the regional average"
+
+
+def get_center_and_zoom(lats: np.ndarray, lngs: np.ndarray) -> tuple[dict[str, float], int]:
+    """Returns the map center and zoom level that fit the coordinates.
+
+    Args:
+        lats: The latitudes to fit.
+        lngs: The longitudes to fit.
+
+    Returns:
+        A tuple of the center as a `lat`/`lng` dict and the zoom level.
+    """
+    min_lat, max_lat = float(lats.min()), float(lats.max())
+    min_lng, max_lng = float(lngs.min()), float(lngs.max())
+    center = {"lat": (min_lat + max_lat) / 2, "lng": (min_lng + max_lng) / 2}
+
+    # Each zoom level halves the span of degrees shown by a web mercator tile.
+    span = max(max_lng - min_lng, (max_lat - min_lat) * 2)
+    if span <= 0:
+        return center, MAX_ZOOM
+    zoom = int(math.floor(math.log2(360 / span)))
+    return center, max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+
+
+def cluster_coordinates(
+    lats: np.ndarray, lngs: np.ndarray, zoom: int, max_clusters: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Groups coordinates into grid clusters sized for the map zoom.
+
+    The grid starts at a few cells per map tile at `zoom` and is coarsened
+    until there are at most `max_clusters` clusters.
+
+    Args:
+        lats: The latitudes to cluster.
+        lngs: The longitudes to cluster.
+        zoom: The zoom level the map is shown at.
+        max_clusters: The maximum number of clusters.
+
+    Returns:
+        A tuple of the centroid latitudes, centroid longitudes, member counts,
+        and the index of one member of each cluster.
+    """
+    cell_degrees = 360 / (2**zoom) / CLUSTER_CELLS_PER_TILE
+    while True:
+        n_lng_cells = math.ceil(360 / cell_degrees) + 1
+        cells = (
+            np.floor((lats + 90) / cell_degrees).astype(np.int64) * n_lng_cells
+            + np.floor((lngs + 180) / cell_degrees).astype(np.int64)
+        )
+        clusters, members_cluster, counts = np.unique(cells, return_inverse=True, return_counts=True)
+        if len(clusters) <= max_clusters or cell_degrees >= 360:
+            break
+        cell_degrees *= 2
+
+    cluster_lats = np.bincount(members_cluster, weights=lats) / counts
+    cluster_lngs = np.bincount(members_cluster, weights=lngs) / counts
+    members = np.empty(len(clusters), dtype=np.int64)
+    members[members_cluster] = np.arange(len(lats))
+    return cluster_lats, cluster_lngs, counts, members
@@ -0,0 +1,389 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import inspect
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from numbers import Number
+from typing import Any, Optional
+
+import jsonschema
+from a2a import types as a2a_types
+from a2ui.a2ui_extension import create_a2ui_part
+from a2ui.a2ui_schema_utils import create_a2ui_validator
+from a2ui.send_a2ui_to_client_toolset import (
+    A2uiSchemaProvider,
+    A2uiValidatorProvider,
+    SendA2uiToClientToolset,
+    convert_send_a2ui_to_client_genai_part_to_a2a_part,
+)
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types as genai_types
+
+try:
+    from .downsampling import DEFAULT_MAX_CHART_POINTS, downsample_series
+    from .tools import get_sales_data, get_store_sales
+except ImportError:
+    from downsampling import DEFAULT_MAX_CHART_POINTS, downsample_series
+    from tools import get_sales_data, get_store_sales
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SURFACES = 256
+REFRESH_TOOL_NAME = "refresh_surface_data"
+
+_SEND_A2UI_TOOL = SendA2uiToClientToolset._SendA2uiJsonToClientTool
+_TITLE_USAGE_HINTS = ("h1", "h2")
+
+
+@dataclass
+class SurfaceRecord:
+    """The component tree and data model of a surface rendered to a client."""
+
+    surface_id: str
+    components: dict[str, dict[str, Any]] = field(default_factory=dict)
+    contents: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def get_binding(self, component_type: str, prop: str) -> Optional[str]:
+        """Returns the data path bound to a property of a component type."""
+        for component in self.components.values():
+            value = component.get("component", {}).get(component_type, {}).get(prop)
+            if isinstance(value, dict) and "path" in value:
+                return value["path"].lstrip("/")
+        return None
+
+    @property
+    def items_path(self) -> Optional[str]:
+        """The data path of the chart items or map locations of the surface."""
+        for component_type, prop in (("Chart", "chartData"), ("GoogleMap", "pins")):
+            if path := self.get_binding(component_type, prop):
+                return path
+        for component in self.components.values():
+            template = component.get("component", {}).get("List", {}).get("children", {}).get("template")
+            if template and template.get("dataBinding"):
+                return template["dataBinding"].lstrip("/")
+        return None
+
+    @property
+    def is_map(self) -> bool:
+        """Whether the surface shows store locations rather than a chart."""
+        if self.get_binding("GoogleMap", "pins"):
+            return True
+        if self.get_binding("Chart", "chartData"):
+            return False
+        # Chart items always have a value, store locations never do.
+        return f"{self.items_path}[0].value" not in self.contents
+
+    def get_title_component(self) -> Optional[dict[str, Any]]:
+        """Returns the heading Text component of the surface, if any."""
+        for component in self.components.values():
+            text = component.get("component", {}).get("Text")
+            if text and text.get("usageHint") in _TITLE_USAGE_HINTS:
+                return component
+        return None
+
+
+class SurfaceCache:
+    """An LRU cache of the surfaces rendered in each session."""
+
+    def __init__(self, max_surfaces: int = DEFAULT_MAX_SURFACES):
+        self._max_surfaces = max_surfaces
+        self._surfaces: OrderedDict[tuple[str, str], SurfaceRecord] = OrderedDict()
+
+    def get(self, session_id: str, surface_id: str) -> Optional[SurfaceRecord]:
+        """Returns the record of a surface, marking it as recently used.
+
+        Args:
+            session_id: The id of the session that rendered the surface.
+            surface_id: The id of the surface.
+
+        Returns:
+            The surface record or None if not cached.
+        """
+        record = self._surfaces.get((session_id, surface_id))
+        if record is not None:
+            self._surfaces.move_to_end((session_id, surface_id))
+        return record
+
+    def apply(self, session_id: str, messages: list[dict[str, Any]]) -> None:
+        """Applies A2UI messages sent to a client to the cached surfaces.
+
+        Args:
+            session_id: The id of the session the messages were sent in.
+            messages: The validated A2UI messages.
+        """
+        for message in messages:
+            if "deleteSurface" in message:
+                self._surfaces.pop((session_id, message["deleteSurface"].get("surfaceId")), None)
+                continue
+
+            for message_type in ("beginRendering", "surfaceUpdate", "dataModelUpdate"):
+                if message_type in message:
+                    break
+            else:
+                continue
+
+            body = message[message_type]
+            record = self.get(session_id, body.get("surfaceId"))
+            if record is None:
+                record = SurfaceRecord(surface_id=body.get("surfaceId"))
+                self._surfaces[(session_id, record.surface_id)] = record
+
+            if message_type == "surfaceUpdate":
+                for component in body.get("components", []):
+                    record.components[component["id"]] = component
+            elif message_type == "dataModelUpdate":
+                prefix = body.get("path", "/").strip("/")
+                if not prefix:
+                    record.contents.clear()
+                for entry in body.get("contents", []):
+                    key = f"{prefix}.{entry['key']}" if prefix else entry["key"]
+                    record.contents[key] = {**entry, "key": key}
+
+        while len(self._surfaces) > self._max_surfaces:
+            (_, surface_id), _ = self._surfaces.popitem(last=False)
+            logger.info(f"Evicted surface {surface_id} from cache")
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+
+def to_data_model_contents(key: str, value: Any) -> list[dict[str, Any]]:
+    """Flattens a JSON value into dataModelUpdate entries under a key.
+
+    Args:
+        key: The data model key of the value, e.g. `chart.items`.
+        value: A JSON compatible value. None values are skipped.
+
+    Returns:
+        The dataModelUpdate entries, e.g. `chart.items[0].label`.
+    """
+    if isinstance(value, dict):
+        return [entry for name, item in value.items() for entry in to_data_model_contents(f"{key}.{name}", item)]
+    if isinstance(value, list):
+        return [entry for i, item in enumerate(value) for entry in to_data_model_contents(f"{key}[{i}]", item)]
+    if isinstance(value, bool):
+        return [{"key": key, "valueBoolean": value}]
+    if isinstance(value, Number):
+        return [{"key": key, "valueNumber": value}]
+    if isinstance(value, str):
+        return [{"key": key, "valueString": value}]
+    return []
+
+
+def _is_under(key: str, path: str) -> bool:
+    return key == path or key.startswith(f"{path}.") or key.startswith(f"{path}[")
+
+
+class SurfaceRefresher:
+    """Refreshes the data of surfaces already rendered to the client.
+
+    The component tree of every surface sent with `send_a2ui_json_to_client`
+    is cached when it is sent. A follow-up question on the same surface then
+    only needs the model to pick a data query: the refresh tool runs it and
+    sends a single `dataModelUpdate` for the existing surface id.
+    """
+
+    def __init__(
+        self,
+        a2ui_schema_provider: A2uiSchemaProvider,
+        a2ui_validator_provider: Optional[A2uiValidatorProvider] = None,
+        max_chart_points: int = DEFAULT_MAX_CHART_POINTS,
+        surface_cache: Optional[SurfaceCache] = None,
+    ):
+        """Initializes the SurfaceRefresher.
+
+        Args:
+            a2ui_schema_provider: A provider to retrieve the A2UI schema to
+              validate refresh messages against.
+            a2ui_validator_provider: An optional provider of the precompiled
+              validator for the A2UI schema. Without it, the schema is
+              compiled for every refresh.
+            max_chart_points: The maximum number of points per chart series.
+            surface_cache: The cache of rendered surfaces.
+        """
+        self._a2ui_schema_provider = a2ui_schema_provider
+        self._a2ui_validator_provider = a2ui_validator_provider
+        self._max_chart_points = max_chart_points
+        self._surface_cache = surface_cache or SurfaceCache()
+
+    def record_sent_surfaces(
+        self,
+        tool: BaseTool,
+        args: dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> Optional[dict[str, Any]]:
+        """After tool callback that caches the surfaces sent to the client.
+
+        Args:
+            tool: The tool that was called.
+            args: The arguments of the call.
+            tool_context: The context of the call.
+            tool_response: The response of the tool.
+
+        Returns:
+            None, the response is never modified.
+        """
+        if tool.name != _SEND_A2UI_TOOL.TOOL_NAME or not isinstance(tool_response, dict):
+            return None
+        if messages := tool_response.get(_SEND_A2UI_TOOL.VALIDATED_A2UI_JSON_KEY):
+            self._surface_cache.apply(tool_context.session.id, messages)
+        return None
+
+    async def refresh_surface_data(
+        self,
+        surface_id: str,
+        tool_context: ToolContext,
+        time_period: str = "",
+        region: str = "",
+        title: str = "",
+    ) -> dict[str, Any]:
+        """Updates the data of a chart or map surface already shown to the user.
+
+        Use this instead of sending a new surface when the user asks a follow-up
+        about a surface that is already displayed, e.g. "now for Q4" or "what
+        about the west region".
+
+        Args:
+            surface_id: The surfaceId of the existing surface to update.
+            time_period: For chart surfaces, the time period to get sales data for (e.g. 'Q4', 'year', 'last month').
+            region: For map surfaces, the region to get store sales for (e.g. 'west', 'all').
+            title: An optional new title reflecting the follow-up question.
+
+        Returns:
+            The A2UI messages sent to the client, or an error.
+        """
+        record = self._surface_cache.get(tool_context.session.id, surface_id)
+        if record is None or not record.items_path:
+            return {
+                _SEND_A2UI_TOOL.TOOL_ERROR_KEY: (
+                    f"Surface {surface_id} is not known or has no chart or map data."
+                    f" Send a new surface with {_SEND_A2UI_TOOL.TOOL_NAME} instead."
+                )
+            }
+
+        if record.is_map:
+            data = get_store_sales(region=region or "all")
+        else:
+            data = get_sales_data(time_period=time_period or "year")
+        if _SEND_A2UI_TOOL.TOOL_ERROR_KEY in data:
+            return data
+        data, _ = downsample_series(data, self._max_chart_points)
+
+        messages = self._build_refresh_messages(record, data, title)
+        try:
+            a2ui_validator = await self._get_a2ui_validator(tool_context)
+            a2ui_validator.validate(messages)
+        except jsonschema.ValidationError as e:
+            err = f"Failed to refresh surface {surface_id}: {e.message}"
+            logger.error(err)
+            return {_SEND_A2UI_TOOL.TOOL_ERROR_KEY: err}
+
+        self._surface_cache.apply(tool_context.session.id, messages)
+        logger.info(f"Refreshed data of surface {surface_id}")
+
+        # Like send_a2ui_json_to_client, the messages go straight to the client.
+        tool_context.actions.skip_summarization = True
+        return {_SEND_A2UI_TOOL.VALIDATED_A2UI_JSON_KEY: messages}
+
+    async def _get_a2ui_validator(self, tool_context: ToolContext) -> jsonschema.protocols.Validator:
+        """Returns the precompiled validator of the session's A2UI schema, or compiles one."""
+        if self._a2ui_validator_provider is not None:
+            a2ui_validator = self._a2ui_validator_provider(tool_context)
+            if inspect.isawaitable(a2ui_validator):
+                a2ui_validator = await a2ui_validator
+            if a2ui_validator is not None:
+                return a2ui_validator
+
+        a2ui_schema = self._a2ui_schema_provider(tool_context)
+        if inspect.isawaitable(a2ui_schema):
+            a2ui_schema = await a2ui_schema
+        return create_a2ui_validator(a2ui_schema)
+
+    def _build_refresh_messages(
+        self, record: SurfaceRecord, data: dict[str, Any], title: str
+    ) -> list[dict[str, Any]]:
+        """Builds the messages that replace the data of a surface.
+
+        Args:
+            record: The cached surface.
+            data: The response of the data query.
+            title: The new title, or an empty string to keep the current one.
+
+        Returns:
+            The A2UI messages to send.
+        """
+        items_path = record.items_path
+        if record.is_map:
+            replaced = {items_path: data.get("locations", [])}
+            parent_path = items_path.rpartition(".")[0]
+            for name in ("center", "zoom"):
+                path = record.get_binding("GoogleMap", name) or ".".join(filter(None, (parent_path, name)))
+                if name in data and any(_is_under(key, path) for key in record.contents):
+                    replaced[path] = data[name]
+        else:
+            replaced = {items_path: data.get("sales_data", [])}
+
+        messages = []
+        title_component = record.get_title_component()
+        title_path = record.get_binding("Chart", "title")
+        if title and title_component and not title_path:
+            text = title_component["component"]["Text"]["text"]
+            if "path" in text:
+                title_path = text["path"].lstrip("/")
+            else:
+                updated_component = copy.deepcopy(title_component)
+                updated_component["component"]["Text"]["text"] = {"literalString": title}
+                messages.append({"surfaceUpdate": {"surfaceId": record.surface_id, "components": [updated_component]}})
+        if title and title_path:
+            replaced[title_path] = title
+
+        # Keep every entry that is not replaced, e.g. the title or styles.
+        contents = [
+            entry
+            for key, entry in record.contents.items()
+            if not any(_is_under(key, path) for path in replaced)
+        ]
+        for path, value in replaced.items():
+            contents.extend(to_data_model_contents(path, value))
+
+        messages.append({"dataModelUpdate": {"surfaceId": record.surface_id, "path": "/", "contents": contents}})
+        return messages
+
+
+def convert_rizzcharts_genai_part_to_a2a_part(part: genai_types.Part) -> list[a2a_types.Part]:
+    """Converts parts like the A2UI converter, including surface refreshes.
+
+    Args:
+        part: The GenAI part to convert.
+
+    Returns:
+        The A2A parts to send to the client.
+    """
+    if (function_response := part.function_response) and function_response.name == REFRESH_TOOL_NAME:
+        response = function_response.response or {}
+        if _SEND_A2UI_TOOL.TOOL_ERROR_KEY in response:
+            logger.warning(f"Surface refresh failed: {response[_SEND_A2UI_TOOL.TOOL_ERROR_KEY]}")
+            return []
+        return [create_a2ui_part(message) for message in response.get(_SEND_A2UI_TOOL.VALIDATED_A2UI_JSON_KEY, [])]
+
+    # Don't send the refresh tool call to the client
+    if (function_call := part.function_call) and function_call.name == REFRESH_TOOL_NAME:
+        return []
+
+    return convert_send_a2ui_to_client_genai_part_to_a2a_part(part)
@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import pytest
+
+from downsampling import downsample_indices, downsample_series
+from tools import get_sales_data
+
+
+@pytest.mark.parametrize("max_points", [2, 3, 4, 5, 50])
+def test_downsample_indices_keeps_extremes_within_limit(max_points):
+  y = np.sin(np.linspace(0, 20, 500)) * np.linspace(1, 2, 500)
+
+  selected = downsample_indices(y, max_points)
+
+  assert len(selected) <= max_points
+  assert np.argmin(y) in selected
+  assert np.argmax(y) in selected
+
+
+@pytest.mark.parametrize("max_points", [-1, 0, 1])
+def test_downsample_indices_rejects_too_few_points(max_points):
+  with pytest.raises(ValueError, match="at least 2"):
+    downsample_indices(np.arange(10, dtype=np.float64), max_points)
+
+
+def test_downsample_series_downsamples_time_series():
+  series = [
+      {"date": str(np.datetime64("2024-01-01") + day), "value": float(value)}
+      for day, value in enumerate(np.sin(np.linspace(0, 20, 500)))
+  ]
+
+  downsampled, dropped = downsample_series({"revenue": series}, 50)
+
+  assert len(downsampled["revenue"]) <= 50
+  assert dropped == 500 - len(downsampled["revenue"])
+  assert downsampled["revenue"][0] == series[0]
+  assert downsampled["revenue"][-1] == series[-1]
+
+
+def test_downsample_series_keeps_categorical_data():
+  slices = [
+      {"label": f"Category {i}", "value": i, "drillDown": [{"label": f"Item {j}", "value": j} for j in range(10)]}
+      for i in range(10)
+  ]
+  response = {"sales_data": slices}
+
+  downsampled, dropped = downsample_series(response, 5)
+
+  assert downsampled == response
+  assert dropped == 0
+
+
+def test_downsample_series_keeps_unordered_series():
+  points = [{"timestamp": timestamp, "value": 1.0} for timestamp in [3, 1, 2, 5, 4]]
+
+  downsampled, dropped = downsample_series(points, 3)
+
+  assert downsampled == points
+  assert dropped == 0
+
+
+def test_downsample_series_keeps_get_sales_data_response():
+  response = get_sales_data("year")
+
+  downsampled, dropped = downsample_series(response, 2)
+
+  assert downsampled == response
+  assert dropped == 0
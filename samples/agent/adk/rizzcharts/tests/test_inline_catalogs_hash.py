@@ -0,0 +1,211 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+from pathlib import Path
+from typing import AsyncGenerator
+from unittest.mock import MagicMock
+
+import pytest
+from a2a.server.agent_execution import RequestContext
+from a2a.server.context import ServerCallContext
+from a2a.server.events import EventQueue
+from a2a.types import Message, MessageSendParams, Part, Role, TaskState, TaskStatusUpdateEvent, TextPart
+from a2ui.a2ui_extension import (
+    A2UI_CLIENT_CAPABILITIES_KEY,
+    A2UI_EXTENSION_URI,
+    AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY,
+    AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY,
+    INLINE_CATALOGS_HASH_KEY,
+    INLINE_CATALOGS_KEY,
+    STANDARD_CATALOG_ID,
+    UnknownInlineCatalogsHashError,
+    get_inline_catalogs_hash,
+)
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.genai import types as genai_types
+
+from agent import RIZZCHARTS_CATALOG_URI, RizzchartsAgent
+from agent_executor import RizzchartsAgentExecutor, get_a2ui_enabled, get_a2ui_schema, get_a2ui_validator
+from component_catalog_builder import ComponentCatalogBuilder
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent
+SPEC_DIR = SAMPLE_DIR / "../../../../specification/v0_8/json"
+
+A2UI_SCHEMA_CONTENT = (SPEC_DIR / "server_to_client.json").read_text()
+STANDARD_CATALOG_CONTENT = (SPEC_DIR / "standard_catalog_definition.json").read_text()
+RIZZCHARTS_CATALOG_CONTENT = (SAMPLE_DIR / "rizzcharts_catalog_definition.json").read_text()
+
+# A client sending its own catalog instead of referencing a known one.
+INLINE_CATALOGS = RIZZCHARTS_CATALOG_CONTENT
+INLINE_CATALOGS_HASH = get_inline_catalogs_hash(INLINE_CATALOGS)
+
+
+def create_component_catalog_builder() -> ComponentCatalogBuilder:
+  return ComponentCatalogBuilder(
+      a2ui_schema_content=A2UI_SCHEMA_CONTENT,
+      uri_to_local_catalog_content={
+          STANDARD_CATALOG_ID: STANDARD_CATALOG_CONTENT,
+          RIZZCHARTS_CATALOG_URI: RIZZCHARTS_CATALOG_CONTENT,
+      },
+      default_catalog_uri=STANDARD_CATALOG_ID,
+  )
+
+
+class FakeLlm(BaseLlm):
+  """Answers with a fixed text and records the system instructions it got."""
+
+  model: str = "fake"
+  system_instructions: list[str] = []
+
+  async def generate_content_async(
+      self, llm_request: LlmRequest, stream: bool = False
+  ) -> AsyncGenerator[LlmResponse, None]:
+    self.system_instructions.append(llm_request.config.system_instruction)
+    yield LlmResponse(
+        content=genai_types.Content(
+            role="model", parts=[genai_types.Part(text="Here is your dashboard.")]
+        )
+    )
+
+
+def create_executor(llm: FakeLlm) -> RizzchartsAgentExecutor:
+  agent = RizzchartsAgent(
+      model=llm,
+      a2ui_enabled_provider=get_a2ui_enabled,
+      a2ui_schema_provider=get_a2ui_schema,
+      a2ui_validator_provider=get_a2ui_validator,
+  )
+  runner = Runner(
+      app_name=agent.name,
+      agent=agent,
+      session_service=InMemorySessionService(),
+  )
+  return RizzchartsAgentExecutor(
+      base_url="http://localhost:10002",
+      runner=runner,
+      a2ui_schema_content=A2UI_SCHEMA_CONTENT,
+      standard_catalog_content=STANDARD_CATALOG_CONTENT,
+      rizzcharts_catalog_content=RIZZCHARTS_CATALOG_CONTENT,
+  )
+
+
+async def run_turn(executor: RizzchartsAgentExecutor, client_capabilities: dict) -> TaskState:
+  message = Message(
+      message_id="message-1",
+      role=Role.user,
+      parts=[Part(root=TextPart(text="show my sales breakdown by product category for q3"))],
+      metadata={A2UI_CLIENT_CAPABILITIES_KEY: client_capabilities},
+  )
+  context = RequestContext(
+      request=MessageSendParams(message=message),
+      task_id="task-1",
+      context_id="context-1",
+      call_context=ServerCallContext(requested_extensions={A2UI_EXTENSION_URI}),
+  )
+  event_queue = EventQueue()
+  await executor.execute(context, event_queue)
+
+  states = []
+  while not event_queue.queue.empty():
+    event = await event_queue.dequeue_event(no_wait=True)
+    if isinstance(event, TaskStatusUpdateEvent):
+      states.append(event.status.state)
+  return states[-1]
+
+
+def test_agent_card_accepts_inline_catalogs_hash():
+  runner = MagicMock()
+  runner.agent.preload_examples = MagicMock()
+  executor = RizzchartsAgentExecutor(
+      base_url="http://localhost:10002",
+      runner=runner,
+      a2ui_schema_content=A2UI_SCHEMA_CONTENT,
+      standard_catalog_content=STANDARD_CATALOG_CONTENT,
+      rizzcharts_catalog_content=RIZZCHARTS_CATALOG_CONTENT,
+  )
+
+  [extension] = [
+      extension
+      for extension in executor.get_agent_card().capabilities.extensions
+      if extension.uri == A2UI_EXTENSION_URI
+  ]
+  assert extension.params[AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_KEY] is True
+  assert extension.params[AGENT_EXTENSION_ACCEPTS_INLINE_CATALOGS_HASH_KEY] is True
+
+
+def test_inline_catalogs_hash_handshake():
+  builder = create_component_catalog_builder()
+
+  # The first request sends the full catalogs, which the agent remembers.
+  entry, catalog_uri = builder.load_a2ui_schema_entry(
+      {INLINE_CATALOGS_KEY: INLINE_CATALOGS}
+  )
+  assert catalog_uri == RIZZCHARTS_CATALOG_URI
+
+  # Later requests only send their hash.
+  hash_entry, hash_catalog_uri = builder.load_a2ui_schema_entry(
+      {INLINE_CATALOGS_HASH_KEY: INLINE_CATALOGS_HASH}
+  )
+  assert hash_entry.fingerprint == entry.fingerprint
+  assert hash_catalog_uri == RIZZCHARTS_CATALOG_URI
+
+  # An agent that has not seen the catalogs, e.g. after a restart, asks the
+  # client to resend them.
+  with pytest.raises(UnknownInlineCatalogsHashError, match="Resend"):
+    create_component_catalog_builder().load_a2ui_schema_entry(
+        {INLINE_CATALOGS_HASH_KEY: INLINE_CATALOGS_HASH}
+    )
+
+
+@pytest.mark.asyncio
+async def test_inline_catalogs_turn_uses_included_catalog_examples():
+  llm = FakeLlm(system_instructions=[])
+  executor = create_executor(llm)
+
+  assert await run_turn(executor, {INLINE_CATALOGS_KEY: INLINE_CATALOGS}) == TaskState.completed
+  [system_instruction] = llm.system_instructions
+  chart_example = json.loads(
+      (SAMPLE_DIR / "examples/rizzcharts_catalog/chart.json").read_text()
+  )
+  assert json.dumps(chart_example) in system_instruction
+
+  # A later turn that only sends the hash builds the same instructions.
+  assert await run_turn(executor, {INLINE_CATALOGS_HASH_KEY: INLINE_CATALOGS_HASH}) == TaskState.completed
+  assert llm.system_instructions[1] == system_instruction
+
+
+@pytest.mark.asyncio
+async def test_inline_standard_catalog_turn_uses_standard_examples():
+  llm = FakeLlm(system_instructions=[])
+  executor = create_executor(llm)
+
+  assert await run_turn(executor, {INLINE_CATALOGS_KEY: STANDARD_CATALOG_CONTENT}) == TaskState.completed
+  [system_instruction] = llm.system_instructions
+  chart_example = json.loads(
+      (SAMPLE_DIR / "examples/standard_catalog/chart.json").read_text()
+  )
+  assert json.dumps(chart_example) in system_instruction
+
+
+def test_inline_catalogs_without_a_supported_catalog():
+  builder = create_component_catalog_builder()
+
+  with pytest.raises(ValueError, match="must include all components"):
+    builder.load_a2ui_schema_entry(
+        {INLINE_CATALOGS_KEY: '{"components": {"Text": {}}}'}
+    )
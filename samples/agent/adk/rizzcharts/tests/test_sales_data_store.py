@@ -0,0 +1,57 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import pytest
+
+from sales_data_store import SalesDataStore, TimePeriod
+
+
+def create_store(order_dates: list[str]) -> SalesDataStore:
+  return SalesDataStore(
+      order_dates=np.asarray(order_dates, dtype="datetime64[D]"),
+      categories=np.asarray(["Apparel"] * len(order_dates)),
+      subcategories=np.asarray(["Tops"] * len(order_dates)),
+      amounts=np.ones(len(order_dates)),
+  )
+
+
+@pytest.mark.parametrize(
+    "time_period, expected",
+    [
+        ("last month", TimePeriod(year=2025, months=(1,))),
+        ("this month", TimePeriod(year=2025, months=(2,))),
+        ("previous quarter", TimePeriod(year=2024, months=(9, 10, 11))),
+        ("current quarter", TimePeriod(year=2025, months=(0, 1, 2))),
+        ("last year", TimePeriod(year=2024, months=tuple(range(12)))),
+        ("this year", TimePeriod(year=2025, months=tuple(range(12)))),
+        ("last month yoy", TimePeriod(year=2025, months=(1,), year_over_year=True)),
+    ],
+)
+def test_parse_relative_time_period(time_period, expected):
+  store = create_store(["2024-06-15", "2025-03-02"])
+
+  assert store.parse_time_period(time_period) == expected
+
+
+def test_parse_relative_time_period_across_years():
+  store = create_store(["2024-06-15", "2025-01-20"])
+
+  assert store.parse_time_period("last month") == TimePeriod(year=2024, months=(11,))
+
+
+def test_parse_relative_time_period_without_data():
+  store = create_store(["2025-03-02"])
+
+  with pytest.raises(ValueError, match="No sales data for 2024"):
+    store.parse_time_period("last year")
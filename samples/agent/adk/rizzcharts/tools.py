@@ -12,25 +12,75 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import logging
-from typing import Any
+import os
+from typing import Any, Optional
+
+try:
+    from .sales_data_store import SalesDataStore
+    from .store_performance import StorePerformanceIndex
+except ImportError:
+    from sales_data_store import SalesDataStore
+    from store_performance import StorePerformanceIndex
 
 logger = logging.getLogger(__name__)
 
+# Path of a CSV or Parquet file of order rows. Sample data is used if unset.
+SALES_DATA_PATH_ENV_VAR = "RIZZCHARTS_SALES_DATA_PATH"
+# Path of a CSV or Parquet file of store locations and sales. Sample data is used if unset.
+STORE_DATA_PATH_ENV_VAR = "RIZZCHARTS_STORE_DATA_PATH"
+
+
+@functools.cache
+def get_sales_data_store() -> Optional[SalesDataStore]:
+    """Returns the sales data store, loading it on first use.
+
+    Returns:
+        The store loaded from `RIZZCHARTS_SALES_DATA_PATH`, or None if unset.
+    """
+    path = os.getenv(SALES_DATA_PATH_ENV_VAR)
+    if not path:
+        return None
+    logger.info(f"Loading sales data from {path}")
+    return SalesDataStore.from_file(path)
+
+
+@functools.cache
+def get_store_performance_index() -> Optional[StorePerformanceIndex]:
+    """Returns the store performance index, loading it on first use.
+
+    Returns:
+        The index loaded from `RIZZCHARTS_STORE_DATA_PATH`, or None if unset.
+    """
+    path = os.getenv(STORE_DATA_PATH_ENV_VAR)
+    if not path:
+        return None
+    logger.info(f"Loading store data from {path}")
+    return StorePerformanceIndex.from_file(path)
+
 
 def get_store_sales(region: str = "all", **kwargs: Any) -> dict[str, Any]:
     """
     Gets individual store sales
 
     Args:
-        region: The region to get store sales for.
+        region: The region to get store sales for: 'all', 'northeast', 'southeast', 'midwest', 'southwest' or 'west'.
         **kwargs: Additional arguments.
 
     Returns:
-        A dict containing the stores with locations and their sales, and with outlier stores highlighted
+        A dict containing the stores with locations and their sales, and with outlier stores highlighted.
+        Large sets of stores are grouped into cluster markers that have a `count` of stores.
     """
     logger.info("get_store_sales called with region=%s, kwargs=%s", region, kwargs)
 
+    if index := get_store_performance_index():
+        try:
+            return index.get_store_sales(region)
+        except ValueError as e:
+            logger.warning(f"Failed to get store sales for {region}: {e}")
+            return {"error": str(e)}
+
     return {
         "center": {"lat": 34, "lng": -118.2437},
         "zoom": 10,
@@ -59,7 +109,7 @@ def get_sales_data(time_period: str = "year", **kwargs: Any) -> dict[str, Any]:
     Gets the sales data.
 
     Args:
-        time_period: The time period to get sales data for (e.g. 'Q1', 'year'). Defaults to 'year'.
+        time_period: The time period to get sales data for (e.g. 'Q1', 'year', 'last month', 'last year'). Defaults to 'year'.
         **kwargs: Additional arguments.
 
     Returns:
@@ -69,6 +119,13 @@ def get_sales_data(time_period: str = "year", **kwargs: Any) -> dict[str, Any]:
         "get_sales_data called with time_period=%s, kwargs=%s", time_period, kwargs
     )
 
+    if store := get_sales_data_store():
+        try:
+            return store.get_sales_breakdown(time_period)
+        except ValueError as e:
+            logger.warning(f"Failed to get sales data for {time_period}: {e}")
+            return {"error": str(e)}
+
     return {
         "sales_data": [
             {